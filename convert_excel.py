@@ -1,16 +1,13 @@
 #!/usr/bin/env python3
-import openpyxl
-import json
-import re
-
-def clean_name(name):
-    """区市町村名をクリーンアップ"""
-    if not name:
-        return None
-    name = str(name).strip()
-    # 先頭のスペースや記号を除去
-    name = re.sub(r'^[\s★☆　]+', '', name)
-    return name
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from cell_decode import clean_name  # noqa: E402
+from json_output import write_json  # noqa: E402
+from paths import input_root, output_path  # noqa: E402
+from profiling import Profiler  # noqa: E402
+from workbook_session import WorkbookSession  # noqa: E402
 
 def get_type(name):
     """区部/市部を判定"""
@@ -20,16 +17,20 @@ def get_type(name):
         return '市部'
     return None
 
-def convert_hirei_2024():
+def convert_hirei_2024(session):
     """2024年比例代表データを変換"""
-    wb = openpyxl.load_workbook('hirei_2024_votes.xlsx')
+    wb = session.open('hirei_2024_votes.xlsx')
     ws = wb.active
 
+    # 1パスで読み込み (先頭に None を足して 1-indexed の列番号でアクセス)
+    rows = [(None,) + row for row in ws.iter_rows(values_only=True, max_col=14)]
+
     # 政党名（6行目）
     parties = []
     party_cols = {}
+    header = rows[5]
     for col in range(3, 14):  # C列からM列
-        party_name = ws.cell(row=6, column=col).value
+        party_name = header[col]
         if party_name:
             parties.append(party_name)
             party_cols[party_name] = col
@@ -40,8 +41,8 @@ def convert_hirei_2024():
     municipalities = []
     total = {}
 
-    for row in range(9, ws.max_row + 1):
-        name_raw = ws.cell(row=row, column=1).value
+    for row in rows[8:]:
+        name_raw = row[1]
         name = clean_name(name_raw)
 
         if not name:
@@ -50,10 +51,9 @@ def convert_hirei_2024():
         # 合計行
         if '都計' in name:
             for party in parties:
-                col = party_cols[party]
-                val = ws.cell(row=row, column=col).value
+                val = row[party_cols[party]]
                 total[party] = int(float(val)) if val else 0
-            total['合計'] = int(float(ws.cell(row=row, column=14).value))
+            total['合計'] = int(float(row[14]))
             continue
 
         # 区部計・市部計はスキップ
@@ -67,13 +67,12 @@ def convert_hirei_2024():
         votes = {}
         row_total = 0
         for party in parties:
-            col = party_cols[party]
-            val = ws.cell(row=row, column=col).value
+            val = row[party_cols[party]]
             votes[party] = int(float(val)) if val else 0
             row_total += votes[party]
 
         # 合計列から取得
-        total_val = ws.cell(row=row, column=14).value
+        total_val = row[14]
         if total_val:
             row_total = int(float(total_val))
 
@@ -94,10 +93,10 @@ def convert_hirei_2024():
 
     return result
 
-def convert_syosenkyoku_2024():
+def convert_syosenkyoku_2024(session):
     """2024年小選挙区データを変換"""
     # 得票率ファイルから読み込み
-    wb = openpyxl.load_workbook('shou_2024_rate.xlsx')
+    wb = session.open('shou_2024_rate.xlsx')
     ws = wb.active
 
     print(f"小選挙区: Sheet names: {wb.sheetnames}")
@@ -110,9 +109,9 @@ def convert_syosenkyoku_2024():
 
     return None
 
-def convert_syosenkyoku_breakdown_2024():
+def convert_syosenkyoku_breakdown_2024(session):
     """2024年小選挙区 開票結果内訳を変換"""
-    wb = openpyxl.load_workbook('shou_2024_breakdown.xlsx')
+    wb = session.open('shou_2024_breakdown.xlsx')
     ws = wb.active
 
     print(f"小選挙区内訳: Max row: {ws.max_row}, Max col: {ws.max_column}")
@@ -124,9 +123,9 @@ def convert_syosenkyoku_breakdown_2024():
 
     return None
 
-def convert_syosenkyoku_seats_2024():
+def convert_syosenkyoku_seats_2024(session):
     """2024年小選挙区 当選人数を変換"""
-    wb = openpyxl.load_workbook('shou_2024_seats.xlsx')
+    wb = session.open('shou_2024_seats.xlsx')
     ws = wb.active
 
     print(f"当選人数: Max row: {ws.max_row}, Max col: {ws.max_column}")
@@ -139,21 +138,24 @@ def convert_syosenkyoku_seats_2024():
     return None
 
 if __name__ == '__main__':
-    import os
-    os.chdir('/Users/tamata78/work/election-viewer/temp_excel')
+    session = WorkbookSession(input_root())
+    prof = Profiler('convert_excel')
 
     print("=== 2024年比例代表 ===")
-    hirei_2024 = convert_hirei_2024()
+    hirei_2024 = prof.run('convert_hirei_2024', convert_hirei_2024, session)
 
-    with open('../public/data/tokyo-hirei-2024.json', 'w', encoding='utf-8') as f:
-        json.dump(hirei_2024, f, ensure_ascii=False, indent=2)
+    write_json(output_path('tokyo-hirei-2024.json'), hirei_2024)
     print(f"Saved: tokyo-hirei-2024.json ({len(hirei_2024['municipalities'])} municipalities)")
 
     print("\n=== 2024年小選挙区（得票率）===")
-    convert_syosenkyoku_2024()
+    prof.run('convert_syosenkyoku_2024', convert_syosenkyoku_2024, session)
 
     print("\n=== 2024年小選挙区（内訳）===")
-    convert_syosenkyoku_breakdown_2024()
+    prof.run('convert_syosenkyoku_breakdown_2024', convert_syosenkyoku_breakdown_2024, session)
 
     print("\n=== 2024年小選挙区（当選人数）===")
-    convert_syosenkyoku_seats_2024()
+    prof.run('convert_syosenkyoku_seats_2024', convert_syosenkyoku_seats_2024, session)
+
+    session.close()
+    session.report()
+    prof.finish()
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+変換スクリプトのベンチマーク
+
+実ファイルと同じレイアウトの合成ワークブックを 1x / 10x / 100x の規模で生成し、
+各 extract_* (Tokyo は convert_*) 関数の処理時間を計測して JSON に保存する。
+
+  tokyo    区市町村別 得票率・当選人数・比例得票数シート (.xlsx)
+           → 選挙区・区市町村の行数がそのまま規模倍になる
+  national 'Table N' 形式の全国集計ブック (Table 17/24/28 等, .xlsx)
+           → 47都道府県の後に開票区単位の明細行を (規模-1)×47 行追加
+           + 小選挙区の候補者別得票数ブック (candidates.xlsx、1x で 282区 × 4人、
+             規模倍で区数が増える)
+           + 比例名簿 (ブロック × 政党ごとに名簿単独2人 + 重複立候補者)
+  sangiin  複数セクション形式の .xls (000825826 / 834 / 839 と同じ構造)
+           → 各セクションに開票区明細行を追加 (xlwt が必要)
+
+計測は2種類:
+  cold  新しい WorkbookSession (ディスクキャッシュなし) で実行 = パース込み
+  warm  同じセッションで2回目を実行 = 抽出処理のみ
+
+scaling は大きい方の2規模間の log-log 傾き (1.0 で線形)。1x は固定費が
+支配的なため、漸近的な増え方を見るには上位2規模で比べる。
+
+使い方:
+  python scripts/benchmark.py                         # 全スイート 1x/10x/100x
+  python scripts/benchmark.py tokyo --scales 1 10     # スイート・規模を指定
+  python scripts/benchmark.py --compare .build/benchmarks/previous.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import openpyxl
+
+from dimensions import BLOCK_NAMES, BLOCK_PREFECTURES, PREFECTURE_NAMES, SANGIIN_DISTRICTS
+from hirei_revival import DistrictResults, compute_revival, stream_hirei_lists
+from paths import REPO_ROOT
+from shou_candidates import stream_shou_districts
+from workbook_session import WorkbookSession
+
+sys.path.insert(0, REPO_ROOT)
+
+import convert_excel  # noqa: E402
+import convert_national_2024  # noqa: E402
+import convert_national_2026  # noqa: E402
+import convert_sangiin_2022  # noqa: E402
+import convert_sangiin_2025  # noqa: E402
+import convert_syosenkyoku  # noqa: E402
+
+RESULTS_DIR = os.path.join(REPO_ROOT, '.build', 'benchmarks')
+DEFAULT_SCALES = [1, 10, 100]
+
+TOKYO_PARTIES = [
+    '自由民主党', '立憲民主党', '公明党', '日本維新の会', '日本共産党',
+    '参政党', '国民民主党', 'みんなでつくる党', 'れいわ新選組', '本人届出',
+]
+NATIONAL_PARTIES = convert_national_2024.KNOWN_PARTIES
+REVIVAL_PARTIES = NATIONAL_PARTIES[:4]   # 候補者表の党派 (k = 0..3)
+TOKYO_DISTRICTS = 30      # 1x の小選挙区数
+TOKYO_MUNIS = 2           # 1選挙区あたりの区市町村数
+
+
+def _votes(rng, n=1, lo=1000, hi=2_000_000):
+    return rng.integers(lo, hi, size=n).tolist()
+
+
+def _xlsx(path, sheets):
+    """sheets: {シート名: 行リスト}"""
+    wb = openpyxl.Workbook(write_only=True)
+    for name, rows in sheets.items():
+        ws = wb.create_sheet(name)
+        for row in rows:
+            ws.append(row)
+    wb.save(path)
+
+
+def _xls(path, sheet_name, rows):
+    import xlwt  # 合成 .xls の生成のみで使用
+    wb = xlwt.Workbook(encoding='utf-8')
+    ws = wb.add_sheet(sheet_name)
+    for r, row in enumerate(rows):
+        for c, v in enumerate(row):
+            if v not in (None, ''):
+                ws.write(r, c, v)
+    wb.save(path)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 合成ワークブック
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def make_tokyo(work, scale, rng):
+    """shou_2024_rate / shou_2024_seats / hirei_2024_votes と同じレイアウト"""
+    parties = TOKYO_PARTIES
+    districts = TOKYO_DISTRICTS * scale
+    title = [['令和6年10月27日 執行'], [None, '得票率'], [], ['確定']]
+
+    # 得票率: 5行目に政党 (D列から票数・率の2列ずつ)、7行目から都計・選挙区・区市町村
+    header = [None, '全党派計', None]
+    for p in parties:
+        header += [p, None]
+    rate_rows = title + [header, [None, '票    数', '率'] + ['票    数', '率'] * len(parties)]
+
+    def rate_row(name):
+        votes = _votes(rng, len(parties), 100, 200_000)
+        total = sum(votes)
+        row = [name, total, 100]
+        for v in votes:
+            row += [v, v * 100 / total]
+        return row
+
+    rate_rows.append(rate_row('　★都計'))
+    for d in range(1, districts + 1):
+        rate_rows.append(rate_row(f'　　☆{d}区'))
+        for m in range(TOKYO_MUNIS):
+            rate_rows.append(rate_row(f'　　　第{d}-{m}市'))
+
+    # 当選人数: 7行目から ☆選挙区行と空行の組、各政党の計は col 10 + 4k (1-indexed)
+    width = 10 + 4 * len(parties)
+    seat_rows = title + [['選挙区名', '定数', '全党派計'], [None, None, '新', '前', '元', '計']]
+    for d in range(1, districts + 1):
+        row = [f'☆{d}区', '1'] + [''] * (width - 2)
+        row[9 + 4 * int(rng.integers(len(parties)))] = 1
+        seat_rows += [row, [None, None] + [0] * (width - 2)]
+
+    # 比例得票数: 6行目に政党 (C〜M列)、9行目から区市町村、N列が合計
+    hirei_parties = parties + ['日本保守党']
+    hirei_rows = title + [['開票区名', None] + list(range(1, 12)), [None, None] + hirei_parties, [], []]
+
+    def hirei_row(name):
+        votes = _votes(rng, len(hirei_parties), 10, 50_000)
+        return [name, '確'] + votes + [sum(votes)]
+
+    hirei_rows.append(hirei_row('　★都計'))
+    for d in range(1, districts * TOKYO_MUNIS + 1):
+        hirei_rows.append(hirei_row(f'　　第{d}区'))
+
+    _xlsx(os.path.join(work, 'shou_2024_rate.xlsx'), {'Sheet1': rate_rows})
+    _xlsx(os.path.join(work, 'shou_2024_seats.xlsx'), {'Sheet1': seat_rows})
+    _xlsx(os.path.join(work, 'hirei_2024_votes.xlsx'), {'Sheet1': hirei_rows})
+    return districts * (1 + TOKYO_MUNIS)
+
+
+def make_national(work, scale, rng):
+    """'Table 1' 〜 'Table 74': 2行の見出し + 47都道府県 + 開票区明細"""
+    sheets = {}
+    width = 40
+    for t in range(1, 75):
+        head = ['区分', None, None] + [NATIONAL_PARTIES[k % len(NATIONAL_PARTIES)] for k in range(width - 3)]
+        rows = [head, ['', '', '', '計'] + [f'{k % 3 + 1}人' for k in range(width - 4)]]
+        for i, pref in enumerate(PREFECTURE_NAMES):
+            rows.append([pref, None, None, 2] + [f'{(i + k) % 3}' if k < 10 else v
+                                                 for k, v in enumerate(_votes(rng, width - 4))])
+        for n in range((scale - 1) * len(PREFECTURE_NAMES)):
+            rows.append([f'開票区{n}', None, None, 0] + _votes(rng, width - 4, 10, 50_000))
+        sheets[f'Table {t}'] = rows
+    sheets['Table 75'] = _list_rows(scale)
+    _xlsx(os.path.join(work, 'national.xlsx'), sheets)
+    _xlsx(os.path.join(work, 'candidates.xlsx'), {'Table 1': _candidate_rows(scale, rng)})
+    return len(PREFECTURE_NAMES) * scale
+
+
+def _candidate_rows(scale, rng):
+    """小選挙区 候補者別得票数: 都道府県見出し + 選挙区 (結合セル) ごとに4人 + 計"""
+    rows = [['小選挙区 候補者別得票数'], [],
+            ['選挙区', '候補者名', '年齢', '党派', '新旧', '得票数', '得票率', '当落', '重複']]
+    for pref in PREFECTURE_NAMES:
+        rows.append([pref])
+        for d in range(1, 6 * scale + 1):
+            votes = _votes(rng, 4, 5_000, 150_000)
+            for k, v in enumerate(votes):
+                rows.append([f'{pref}第{d}区' if k == 0 else None, f'候補者{pref}{d}-{k}', 50,
+                             NATIONAL_PARTIES[k], '新', v, None,
+                             '当' if v == max(votes) else '', '○' if k % 2 else ''])
+            rows.append([None, '計', None, None, None, sum(votes)])
+    return rows
+
+
+def _list_rows(scale):
+    """比例名簿: 政党ごとに 1位 = 名簿単独2人、2位 = 重複立候補者 (候補者表の k が奇数の党)"""
+    rows = [['比例代表 名簿登載者'], ['ブロック', '党派', '名簿順位', '候補者名', '年齢', '重複']]
+    for block in BLOCK_NAMES:
+        for k, party in enumerate(REVIVAL_PARTIES):
+            rows += [[block, party, 1, f'名簿{block}{k}-{n}', 60, ''] for n in range(2)]
+            if k % 2:
+                rows += [[block, party, 2, f'候補者{pref}{d}-{k}', 50, f'{pref}第{d}区']
+                         for pref in BLOCK_PREFECTURES[block] for d in range(1, 6 * scale + 1)]
+    return rows
+
+
+def _revival_blocks():
+    return [{'name': block, 'totalSeats': 4 * len(REVIVAL_PARTIES),
+             'parties': [{'party': p, 'seats': 4} for p in REVIVAL_PARTIES]} for block in BLOCK_NAMES]
+
+
+def _revival(wb, candidates):
+    results = DistrictResults()
+    for _ in results.tap(stream_shou_districts(candidates)):
+        pass
+    return compute_revival(_revival_blocks(), stream_hirei_lists(wb), results)
+
+
+def _xls_detail_rows(scale, width, rng):
+    return [[f'第{n}開票区'] + [f'{v:,}    ' for v in _votes(rng, width - 1, 10, 50_000)]
+            for n in range((scale - 1) * len(PREFECTURE_NAMES))]
+
+
+def make_sangiin(work, scale, rng):
+    """000825826 (当選人数, 3セクション) / 834 (得票数, 8セクション) / 839 (有効投票数)"""
+    # 826: 各セクション 45選挙区、col1=定数 '4(1)'、政党 k の計 = col 5+4k
+    rows = [['(2) 都道府県別党派別新現元別当選人数（選挙区）']]
+    for parties in convert_sangiin_2022.SENKYOKU_SEATS_SECTIONS:
+        width = 6 + 4 * len(parties)
+        head = ['', '定']
+        for p in parties:
+            head += [p, '', '', '']
+        rows += [[], head, ['区分'], ['', '数'] + ['新', '現', '元', '計'] * len(parties)]
+        for pref in SANGIIN_DISTRICTS:
+            row = [pref, f'{int(rng.integers(1, 5))}(1)'] + [''] * (width - 2)
+            row[5 + 4 * int(rng.integers(len(parties)))] = '1'
+            rows.append(row)
+        rows += _xls_detail_rows(scale, width, rng)
+    _xls(os.path.join(work, 'sangiin26_000825826.xls'), '518', rows)
+
+    # 834: 各セクション 2党 × (男, 女, 計)、47都道府県 + 計 + (再掲) 合区
+    rows = [['', '', '', '（６）　都道府県別党派別得票数（選挙区）']]
+    for p1, p2 in convert_sangiin_2022.SENKYOKU_VOTES_SECTIONS:
+        rows += [[], ['区分', '', p1, '', '', p2, ''], [], ['', '男', '女', '計', '男', '女', '計']]
+        for pref in PREFECTURE_NAMES:
+            m1, f1, m2, f2 = _votes(rng, 4)
+            rows.append([pref] + [f'{v:,}    ' for v in (m1, f1, m1 + f1, m2, f2, m2 + f2)])
+        rows += _xls_detail_rows(scale, 7, rng)
+        rows += [['計', '1.0', '', '1.0', '', '', ''], [], ['(再掲)'],
+                 ['鳥取県・島根県', '1,000    ', '', '1,000    '],
+                 ['徳島県・高知県', '1,000    ', '', '1,000    ']]
+    _xls(os.path.join(work, 'sangiin26_000825834.xls'), '5116', rows)
+
+    # 839: col2=有効投票数、47都道府県 + (再掲) 合区
+    rows = [['', '（８）　都道府県別投票総数､ 有効投票数､ 無効投票数（選挙区）'], [],
+            ['区　分', '投票総数', '有効投票数', '無効投票数', '無効投票率'], []]
+    for pref in PREFECTURE_NAMES:
+        total, valid = 2_000_000.0, float(_votes(rng)[0])
+        rows.append([pref, total, valid, total - valid, 2.5])
+    rows += [[f'第{n}開票区', 100.0, 90.0, 10.0, 10.0] for n in range((scale - 1) * len(PREFECTURE_NAMES))]
+    rows += [['計', 1.0, 1.0, 0.0, 0.0], [], ['(再掲)'],
+             ['鳥取県・島根県', 1.0, 500_000.0, 0.0, 0.0], ['徳島県・高知県', 1.0, 600_000.0, 0.0, 0.0]]
+    _xls(os.path.join(work, 'sangiin26_000825839.xls'), '5117', rows)
+    return len(PREFECTURE_NAMES) * scale
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 計測対象
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def _national_targets(work):
+    path = os.path.join(work, 'national.xlsx')
+    candidates = os.path.join(work, 'candidates.xlsx')
+    convert_national_2024.EXCEL_FILE = convert_sangiin_2025.EXCEL_FILE = path
+    convert_national_2026.SHOU_FILE = convert_national_2026.HIREI_FILE = path
+    convert_national_2024.CANDIDATE_FILE = convert_national_2026.CANDIDATE_FILE = candidates
+    return [
+        ('national_2024.extract_shou_data', lambda s: convert_national_2024.extract_shou_data(s.open(path))),
+        ('national_2024.extract_hirei_data', lambda s: convert_national_2024.extract_hirei_data(s.open(path))),
+        ('shou_candidates.stream_shou_districts', lambda s: sum(1 for _ in stream_shou_districts(s.open(candidates)))),
+        ('hirei_revival.compute_revival', lambda s: _revival(s.open(path), s.open(candidates))),
+        ('national_2026.extract_shou_data', convert_national_2026.extract_shou_data),
+        ('national_2026.extract_hirei_data', convert_national_2026.extract_hirei_data),
+        ('sangiin_2025.extract_senkyoku_data', lambda s: convert_sangiin_2025.extract_senkyoku_data(s.open(path))),
+        ('sangiin_2025.extract_hirei_data', lambda s: convert_sangiin_2025.extract_hirei_data(s.open(path))),
+    ]
+
+
+SUITES = {
+    'tokyo': (make_tokyo, lambda work: [
+        ('syosenkyoku.convert_syosenkyoku_2024', convert_syosenkyoku.convert_syosenkyoku_2024),
+        ('excel.convert_hirei_2024', convert_excel.convert_hirei_2024),
+    ]),
+    'national': (make_national, _national_targets),
+    'sangiin': (make_sangiin, lambda work: [
+        ('sangiin_2022.extract_senkyoku_seats', convert_sangiin_2022.extract_senkyoku_seats),
+        ('sangiin_2022.extract_senkyoku_votes', convert_sangiin_2022.extract_senkyoku_votes),
+        ('sangiin_2022.extract_valid_votes', convert_sangiin_2022.extract_valid_votes),
+    ]),
+}
+
+
+def _quiet(fn, *args):
+    """変換関数の print を抑制して実行"""
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        return fn(*args)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+def time_target(fn, work, repeat, slow=5.0):
+    """(cold 秒, warm 秒) の最小値。1回で slow 秒を超える場合は繰り返さない"""
+    cold, warm = [], []
+    for _ in range(repeat):
+        session = WorkbookSession(work, cache=False)
+        start = time.perf_counter()
+        _quiet(fn, session)
+        cold.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        _quiet(fn, session)
+        warm.append(time.perf_counter() - start)
+        session.close()
+        if cold[-1] > slow:
+            break
+    return min(cold), min(warm)
+
+
+def run_suite(name, scales, repeat, seed=0):
+    make, targets = SUITES[name]
+    results = []
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix=f'bench-{name}-{scale}x-') as work:
+            start = time.perf_counter()
+            rows = make(work, scale, np.random.default_rng(seed))
+            gen = time.perf_counter() - start
+            size = sum(os.path.getsize(os.path.join(work, f)) for f in os.listdir(work))
+            print(f'[{name} {scale}x] {rows} data rows, {size / 1024:.0f} KB (generated in {gen:.1f}s)')
+            for target, fn in targets(work):
+                entry = {'suite': name, 'target': target, 'scale': scale, 'rows': rows, 'bytes': size}
+                try:
+                    cold, warm = time_target(fn, work, repeat)
+                    entry.update(coldMs=round(cold * 1000, 3), warmMs=round(warm * 1000, 3))
+                    print(f'  {target:40s} cold {cold * 1000:9.1f} ms  warm {warm * 1000:9.1f} ms')
+                except Exception as e:  # 合成データで落ちる抽出器も結果に残す
+                    entry['error'] = f'{type(e).__name__}: {e}'
+                    print(f'  {target:40s} ERROR {entry["error"]}')
+                results.append(entry)
+    return results
+
+
+def scaling_summary(results):
+    """抽出器ごとの規模に対する増加率 (log-log の傾き、1.0 で線形)"""
+    by_target = {}
+    for r in results:
+        if 'error' not in r:
+            by_target.setdefault(r['target'], []).append(r)
+    summary = {}
+    for target, rs in by_target.items():
+        rs.sort(key=lambda r: r['scale'])
+        if len(rs) < 2:
+            continue
+        lo, hi = rs[-2], rs[-1]
+        span = math.log(hi['scale'] / lo['scale'])
+        entry = {}
+        for kind in ('coldMs', 'warmMs'):
+            if lo[kind] > 0 and hi[kind] > 0:
+                entry[kind.replace('Ms', 'Exponent')] = round(math.log(hi[kind] / lo[kind]) / span, 3)
+        exp = entry.get('coldExponent')
+        if exp is not None:
+            entry['class'] = 'sublinear' if exp < 0.85 else 'linear' if exp <= 1.15 else 'superlinear'
+        summary[target] = entry
+    return summary
+
+
+def compare(current, previous_path):
+    with open(previous_path, encoding='utf-8') as f:
+        previous = json.load(f)
+    prev = {(r['target'], r['scale']): r for r in previous['results'] if 'error' not in r}
+    print(f'\n--- vs {os.path.basename(previous_path)} (cold, ratio >1 = slower) ---')
+    for r in current['results']:
+        p = prev.get((r['target'], r['scale']))
+        if p and 'error' not in r:
+            print(f"  {r['target']:40s} {r['scale']:>4}x  {r['coldMs']:9.1f} ms  x{r['coldMs'] / p['coldMs']:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='変換スクリプトのベンチマーク')
+    parser.add_argument('suites', nargs='*', metavar='suite',
+                        help=f'実行するスイート ({", ".join(SUITES)}、省略時は全部)')
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES)
+    parser.add_argument('--repeat', type=int, default=3, help='計測回数 (最小値を採用)')
+    parser.add_argument('-o', '--output', help='結果 JSON (既定: .build/benchmarks/bench-<日時>.json)')
+    parser.add_argument('--compare', help='比較する過去の結果 JSON')
+    args = parser.parse_args()
+    for name in args.suites:
+        if name not in SUITES:
+            parser.error(f'unknown suite: {name}')
+
+    results = []
+    for name in args.suites or list(SUITES):
+        results += run_suite(name, sorted(args.scales), args.repeat)
+
+    report = {
+        'createdAt': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'scales': sorted(args.scales),
+        'repeat': args.repeat,
+        'results': results,
+        'scaling': scaling_summary(results),
+    }
+
+    print('\n--- Scaling (cold, 1.0 = linear) ---')
+    for target, s in report['scaling'].items():
+        print(f"  {target:40s} {s.get('coldExponent', float('nan')):6.2f}  {s.get('class', '')}")
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'\nSaved: {output}')
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    main()
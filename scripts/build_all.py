@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+全選挙データ一括ビルド
+
+リポジトリ直下と scripts/ 配下の convert_*.py をすべて検出し、
+ProcessPoolExecutor で並列に実行する。各変換スクリプトは独立しているため
+順序依存はない。入力 Excel・変換コードが前回ビルドから変わっていない
+ジョブはスキップする (build_manifest.py 参照、--force で全件実行)。
+実行後に次元レジストリ (elections/dimensions.json) と得票率推移
+(elections/national_party_trends.json、変わった選挙だけ集計し直す) を書き出し、
+出力を SQLite (.build/results.sqlite、results_db.py) と分析用キューブ
+(.build/cube/、election_cube.py) に読み込み、
+出力データの整合性をチェックし (validate_outputs.py、変わったファイルだけ)、
+出力ルートの JSON/CSV を事前圧縮し (json_output.py)、サイズ予算を
+チェックする (size_report.py)。整合性チェックの error と予算超過はビルド失敗扱い。
+
+使い方:
+  python scripts/build_all.py -j 4
+  python scripts/build_all.py --input-root ~/Downloads --output-root /tmp/data
+  python scripts/build_all.py convert_sangiin_2022 convert_syosenkyoku
+  python scripts/build_all.py --profile --force -v
+"""
+import argparse
+import contextlib
+import glob
+import io
+import os
+import runpy
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from build_manifest import job_fingerprint, load_manifest, save_manifest, stale_reason
+from dimensions import write_dimensions
+from election_cube import CUBE_DIR, build_cube
+from json_output import compress_tree
+from party_trends import build_trends
+from paths import REPO_ROOT, output_root
+from results_db import DB_FILE, build_db
+from size_report import build_report, load_budgets, print_report, save_report
+from validate_outputs import print_report as print_validation, save_report as save_validation, validate
+
+
+def discover_converters():
+    """convert_*.py を検出 → {ジョブ名: パス}"""
+    found = {}
+    for pattern in ('convert_*.py', os.path.join('scripts', 'convert_*.py')):
+        for path in sorted(glob.glob(os.path.join(REPO_ROOT, pattern))):
+            name = os.path.splitext(os.path.basename(path))[0]
+            found[name] = path
+    return found
+
+
+def run_converter(name, path):
+    """子プロセスで変換スクリプトを __main__ として実行し、ログと所要時間を返す"""
+    log = io.StringIO()
+    cwd = os.getcwd()
+    start = time.perf_counter()
+    ok = True
+    try:
+        with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            runpy.run_path(path, run_name='__main__')
+    except SystemExit as e:
+        ok = e.code in (None, 0)
+    except Exception:
+        ok = False
+        log.write(traceback.format_exc())
+    finally:
+        os.chdir(cwd)
+    return {
+        'name': name,
+        'ok': ok,
+        'seconds': time.perf_counter() - start,
+        'log': log.getvalue(),
+    }
+
+
+def print_summary(results, wall):
+    print('\n--- Build summary ---')
+    for r in sorted(results, key=lambda x: -x['seconds']):
+        status = 'OK  ' if r['ok'] else 'FAIL'
+        print(f"  {status} {r['seconds']:8.2f} s  {r['name']}")
+    total = sum(r['seconds'] for r in results)
+    print(f'  wall {wall:.2f} s / cpu-sum {total:.2f} s ({len(results)} jobs)')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='全変換スクリプトを並列実行')
+    parser.add_argument('jobs', nargs='*', help='実行するジョブ名 (省略時は全件)')
+    parser.add_argument('-j', '--jobs-count', dest='workers', type=int, default=os.cpu_count(),
+                        help='並列数 (既定: CPU 数)')
+    parser.add_argument('--input-root', help='ソース Excel のディレクトリ')
+    parser.add_argument('--output-root', help='JSON 出力先ディレクトリ')
+    parser.add_argument('--force', action='store_true', help='変更がなくても全ジョブを再実行')
+    parser.add_argument('--budgets', help='サイズ予算ファイル (既定: scripts/size_budgets.json)')
+    parser.add_argument('--no-size-check', action='store_true', help='事前圧縮とサイズ予算チェックを省略')
+    parser.add_argument('--no-validate', action='store_true', help='出力データの整合性チェックを省略')
+    parser.add_argument('--list', action='store_true', help='検出したジョブを表示して終了')
+    parser.add_argument('--profile', action='store_true',
+                        help='各変換スクリプトをステージ別に計測 (.build/profile/ に保存、-v で表示)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='全ジョブのログを表示')
+    args = parser.parse_args(argv)
+
+    converters = discover_converters()
+    if args.list:
+        for name, path in converters.items():
+            print(f'{name}\t{os.path.relpath(path, REPO_ROOT)}')
+        return 0
+
+    unknown = [j for j in args.jobs if j not in converters]
+    if unknown:
+        parser.error(f"unknown job(s): {', '.join(unknown)}")
+    selected = {n: p for n, p in converters.items() if not args.jobs or n in args.jobs}
+
+    # 子プロセスは環境変数を継承する (paths.py が参照)
+    if args.input_root:
+        os.environ['ELECTION_INPUT_ROOT'] = os.path.abspath(os.path.expanduser(args.input_root))
+    if args.output_root:
+        os.environ['ELECTION_OUTPUT_ROOT'] = os.path.abspath(os.path.expanduser(args.output_root))
+    if args.profile:
+        os.environ['ELECTION_PROFILE'] = '1'
+
+    manifest = load_manifest()
+    fingerprints = {}
+    for name, path in list(selected.items()):
+        fingerprints[name] = job_fingerprint(name, path)
+        reason = 'forced' if args.force else stale_reason(name, fingerprints[name], manifest)
+        if reason is None:
+            print(f'[skip] {name} (up to date)')
+            del selected[name]
+        else:
+            print(f'[run ] {name} ({reason})')
+
+    if not selected:
+        print('Nothing to rebuild.')
+        return 0
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = [pool.submit(run_converter, n, p) for n, p in selected.items()]
+        for fut in as_completed(futures):
+            r = fut.result()
+            results.append(r)
+            print(f"[{'done' if r['ok'] else 'FAIL'}] {r['name']} ({r['seconds']:.2f} s)")
+            if args.verbose or not r['ok']:
+                print(r['log'])
+            if r['ok']:
+                manifest[r['name']] = fingerprints[r['name']]
+    save_manifest(manifest)
+    print_summary(results, time.perf_counter() - start)
+
+    ok = all(r['ok'] for r in results)
+    write_dimensions()
+    build_trends()
+    db = build_db()
+    print(f'{os.path.relpath(DB_FILE, REPO_ROOT)}: {len(db.results)} results, {len(db.elections)} elections')
+    cube = build_cube(db=db)
+    print(f"{os.path.relpath(CUBE_DIR, REPO_ROOT)}: {' × '.join(map(str, cube['shape']))}")
+    if not args.no_validate:
+        validation = validate(workers=args.workers)
+        print_validation(validation)
+        save_validation(validation)
+        ok = ok and validation['ok']
+    if not args.no_size_check:
+        compress_tree(output_root())
+        report = build_report(output_root(), load_budgets(args.budgets) if args.budgets else None)
+        print_report(report)
+        save_report(report)
+        ok = ok and report['ok']
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+インクリメンタルビルド用マニフェスト
+
+ジョブ (変換スクリプト) ごとに入力 Excel・出力 JSON を宣言し、
+入力ファイルと変換コードの内容ハッシュを .build/manifest.json に記録する。
+前回ビルド時とハッシュが一致し、出力がすべて存在するジョブはスキップできる。
+"""
+import hashlib
+import json
+import os
+
+from paths import REPO_ROOT, input_path, input_root, output_path, output_root
+
+MANIFEST_FILE = os.path.join(REPO_ROOT, '.build', 'manifest.json')
+
+# 全変換スクリプトが共有するモジュール (変更時は全ジョブを再ビルド)
+SHARED_MODULES = [
+    'scripts/cell_decode.py',
+    'scripts/dhondt.py',
+    'scripts/dimensions.py',
+    'scripts/election_shards.py',
+    'scripts/hirei_revival.py',
+    'scripts/json_output.py',
+    'scripts/label_index.py',
+    'scripts/matrix_encoding.py',
+    'scripts/paths.py',
+    'scripts/profiling.py',
+    'scripts/shou_candidates.py',
+    'scripts/table_layout.py',
+    'scripts/workbook_cache.py',
+    'scripts/workbook_session.py',
+]
+
+# ジョブ名 → 入力 (input root 相対) / 出力 (output root 相対)
+JOBS = {
+    'convert_excel': {
+        'inputs': [
+            'hirei_2024_votes.xlsx',
+            'shou_2024_rate.xlsx',
+            'shou_2024_breakdown.xlsx',
+            'shou_2024_seats.xlsx',
+        ],
+        'outputs': ['tokyo-hirei-2024.json'],
+    },
+    'convert_syosenkyoku': {
+        'inputs': [
+            'shou_2024_rate.xlsx',
+            'shou_2024_seats.xlsx',
+            'shou_2026_rate.xlsx',
+            'shou_2026_seats_new.xlsx',
+        ],
+        'outputs': [
+            'tokyo-syosenkyoku-2024.json', 'tokyo-syosenkyoku-2026.json',
+            'tokyo-syosenkyoku-2024.matrix.json', 'tokyo-syosenkyoku-2026.matrix.json',
+        ],
+    },
+    'convert_national_2024': {
+        'inputs': ['2024_衆議員選_小選挙区_比例区.xlsx', '2024_衆議員選_小選挙区_候補者別得票数.xlsx'],
+        'outputs': ['elections/shugiin_2024.json', 'elections/shugiin_2024/index.json'],
+    },
+    'convert_national_2026': {
+        'inputs': [
+            '2026_都道府県別党派別新前元別当選人数（小選挙区）.xlsx',
+            '2026_比例代表当選人数.xlsx',
+            '2026_候補者別得票数（小選挙区）.xlsx',
+        ],
+        'outputs': ['elections/shugiin_2026.json', 'elections/shugiin_2026/index.json'],
+    },
+    'convert_sangiin_2022': {
+        'inputs': [
+            'sangiin26_000825825.xls',
+            'sangiin26_000825826.xls',
+            'sangiin26_000825827.xls',
+            'sangiin26_000825834.xls',
+            'sangiin26_000825839.xls',
+        ],
+        'outputs': ['elections/sangiin_2022.json', 'elections/sangiin_2022/index.json'],
+    },
+    'convert_sangiin_2025': {
+        'inputs': ['2025_参議委員選挙_小選挙区_比例区.xlsx'],
+        'outputs': ['elections/sangiin_2025.json', 'elections/sangiin_2025/index.json'],
+    },
+    'convert_csv_summary': {
+        'inputs': ['2026-ota.csv', '2026-meguro.csv', 'tokyo-summary.csv'],
+        'outputs': ['csv-summary.json'],
+    },
+}
+
+
+def file_hash(path):
+    """sha256 (存在しない場合は None)"""
+    if not os.path.exists(path):
+        return None
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def job_fingerprint(name, script_path, hasher=file_hash):
+    """ジョブの入力・コードのハッシュ一覧"""
+    spec = JOBS.get(name, {'inputs': [], 'outputs': []})
+    code = [os.path.relpath(script_path, REPO_ROOT)] + SHARED_MODULES
+    return {
+        'inputRoot': input_root(),
+        'outputRoot': output_root(),
+        'inputs': {f: hasher(input_path(f)) for f in spec['inputs']},
+        'code': {f: hasher(os.path.join(REPO_ROOT, f)) for f in code},
+    }
+
+
+def load_manifest(path=MANIFEST_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def stale_reason(name, fingerprint, manifest):
+    """再ビルドが必要な理由 (不要なら None)"""
+    if name not in JOBS:
+        return 'no dependency spec'
+    prev = manifest.get(name)
+    if prev is None:
+        return 'never built'
+    for f in JOBS[name]['outputs']:
+        if not os.path.exists(output_path(f)):
+            return f'missing output {f}'
+    if prev.get('inputRoot') != fingerprint['inputRoot'] or prev.get('outputRoot') != fingerprint['outputRoot']:
+        return 'roots changed'
+    for kind in ('inputs', 'code'):
+        for f, h in fingerprint[kind].items():
+            if h is None or prev.get(kind, {}).get(f) != h:
+                return f'{f} changed'
+    return None
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+セル値デコード (全変換スクリプト共通)
+
+総務省の Excel に出てくるセル値を数値・名前に変換する関数群。
+どの選挙のファイルでも同じセルは同じ値にデコードされる。
+
+  safe_int        小さな整数 (当選者数など): 最初の数値
+  parse_count     結合セル '2        1        3' の最後の数値 (計)
+  parse_teisuu    定数 '6(1)' → 7 (数値部分の合計)
+  safe_num        得票数 (カンマ・空白・記号を除去して四捨五入)
+  safe_votes      得票数 (数値セルのピリオドを千区切りとして扱う)
+  safe_rate       得票率 (小数2桁)
+  clean_name      区市町村名 (先頭の ★☆ 空白を除去)
+  clean_party     政党名 (※1 等の注記を除去)
+  normalize_party 政党名 (NFKC 正規化)
+
+文字列セルは同じ値が何度も現れる (結合セルの '1     1' 等) ため、
+文字列のデコード結果を LRU でメモ化する。decode_column() は列全体を
+NumPy int64 配列に一括変換する (数値セルはベクトル演算、文字列セルは
+ユニーク値ごとに1回だけデコード)。
+"""
+import math
+import re
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+
+MEMO_SIZE = 1 << 16
+
+_NUMBER = re.compile(r'\d+')
+_SEPARATORS = re.compile(r'[, 　票]+')
+_NON_NUMERIC = re.compile(r'[^\d.\-]')
+_PARTY_NOTE = re.compile(r'\s*※\d+.*$')
+_NAME_PREFIX = re.compile(r'^[\s★☆　]+')
+
+
+# ── 文字列デコード (メモ化) ─────────────────────────────────────
+@lru_cache(maxsize=MEMO_SIZE)
+def _str_first_int(s):
+    m = _NUMBER.search(_SEPARATORS.sub('', s))
+    return int(m.group(0)) if m else 0
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _str_last_int(s):
+    nums = _NUMBER.findall(s)
+    return int(nums[-1]) if nums else 0
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _str_sum_ints(s):
+    return sum(int(n) for n in _NUMBER.findall(s))
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _str_num(s):
+    s = _NON_NUMERIC.sub('', s.replace(',', '').replace('　', '').strip())
+    if not s:
+        return 0
+    try:
+        return int(round(float(s)))
+    except ValueError:
+        return 0
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _str_votes(s):
+    try:
+        return int(round(float(s.replace(',', '').replace(' ', '').replace('　', ''))))
+    except ValueError:
+        return 0
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _str_rate(s):
+    try:
+        return round(float(s.strip()), 2)
+    except ValueError:
+        return 0.0
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _str_clean_name(s):
+    return _NAME_PREFIX.sub('', s.strip())
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _str_clean_party(s):
+    return _PARTY_NOTE.sub('', s).strip()
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _str_normalize_party(s):
+    return unicodedata.normalize('NFKC', s).strip()
+
+
+# ── セル単位 ──────────────────────────────────────────────────
+def safe_int(val):
+    """小さな整数値 (当選者数など) を安全にパース"""
+    if val is None:
+        return 0
+    if isinstance(val, (int, float)):
+        return int(val)
+    return _str_first_int(str(val))
+
+
+def parse_count(val):
+    """結合セル '2        1        3' から最後の数値 (計) を取得"""
+    if val is None:
+        return 0
+    if isinstance(val, (int, float)):
+        return int(val)
+    return _str_last_int(str(val))
+
+
+def parse_teisuu(val):
+    """定数 '6(1)' → 7 (本来の定数+補欠の合計)"""
+    if val is None:
+        return 0
+    return _str_sum_ints(str(val))
+
+
+def safe_num(val):
+    """セル値を数値に変換 (カンマ・全角スペース・空白除去)"""
+    if val is None or val == '':
+        return 0
+    if isinstance(val, (int, float)):
+        return int(round(val)) if abs(val - round(val)) < 0.5 else val
+    return _str_num(str(val))
+
+
+def safe_votes(val):
+    """得票数をパース。
+
+    数値セルではピリオドが千区切りとして使われているファイルがある:
+    879.676 (float) → 879,676票
+    文字列は通常のカンマ区切り: '14,470,016.925' → 14470017
+    """
+    if val is None:
+        return 0
+    if isinstance(val, str):
+        return _str_votes(val)
+    if isinstance(val, int):
+        return val
+    if isinstance(val, float):
+        return int(f'{round(val, 3):.3f}'.replace('.', ''))
+    return 0
+
+
+def safe_rate(val):
+    """得票率 (小数2桁)"""
+    if val is None or val == '':
+        return 0.0
+    if type(val) in (int, float):  # bool は文字列として扱う ('True' → 0.0)
+        return round(float(val), 2)
+    return _str_rate(str(val))
+
+
+def clean_name(name):
+    """区市町村名をクリーンアップ"""
+    if not name:
+        return None
+    return _str_clean_name(str(name))
+
+
+def clean_party(name):
+    """政党名から注記 (※1 等) を除去"""
+    return _str_clean_party(str(name))
+
+
+def normalize_party(name):
+    """全角→半角変換等"""
+    return _str_normalize_party(name)
+
+
+# ── 列単位 ────────────────────────────────────────────────────
+def _trunc(x):
+    return np.trunc(x)
+
+
+def _round_num(x):
+    # safe_num: 端数がちょうど 0.5 のときは float のまま返る → int64 化で切り捨て
+    r = np.rint(x)
+    return np.where(np.abs(x - r) < 0.5, r, np.trunc(x))
+
+
+def _votes_thousands(x):
+    return np.rint(np.round(x, 3) * 1000)
+
+
+# 数値セル (float) のベクトル版。int セルはどの関数でもそのまま
+_FLOAT_KERNELS = {
+    safe_int: _trunc,
+    parse_count: _trunc,
+    safe_num: _round_num,
+    safe_votes: _votes_thousands,
+}
+
+
+def decode_column(values, decode=safe_int, dtype='int64'):
+    """セル値の配列を decode して dtype の NumPy 配列にする (形状は維持)
+
+    decode が _FLOAT_KERNELS にあれば float セルはベクトル演算、
+    それ以外のセルはユニーク値ごとに decode を1回だけ呼ぶ。
+    """
+    arr = np.asarray(values, dtype=object)
+    flat = arr.ravel()
+    kernel = _FLOAT_KERNELS.get(decode) if np.dtype(dtype) == np.int64 else None
+
+    out = np.empty(flat.shape, dtype=object if kernel is None else np.int64)
+    float_idx, memo = [], {}
+    for i, v in enumerate(flat):
+        t = type(v)
+        if kernel is not None and t is float and math.isfinite(v):
+            float_idx.append(i)
+            continue
+        if kernel is not None and t is int:
+            out[i] = v
+            continue
+        key = (t, v)
+        try:
+            out[i] = memo[key]
+        except KeyError:
+            out[i] = memo[key] = decode(v)
+        except TypeError:  # unhashable
+            out[i] = decode(v)
+
+    if float_idx:
+        idx = np.asarray(float_idx, dtype=np.intp)
+        out[idx] = kernel(flat[idx].astype(np.float64)).astype(np.int64)
+    return out.astype(dtype).reshape(arr.shape)
+
+
+def decode_stats():
+    """文字列メモのヒット数・デコード数 (正規表現の実行回数)"""
+    stats = {}
+    for name, fn in (('first_int', _str_first_int), ('last_int', _str_last_int),
+                     ('sum_ints', _str_sum_ints), ('num', _str_num),
+                     ('votes', _str_votes), ('rate', _str_rate),
+                     ('clean_name', _str_clean_name), ('clean_party', _str_clean_party),
+                     ('normalize_party', _str_normalize_party)):
+        info = fn.cache_info()
+        stats[name] = {'hits': info.hits, 'decodes': info.misses}
+    return stats
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+区市町村別 CSV の集計済みデータ変換スクリプト
+2026-ota.csv / 2026-meguro.csv / tokyo-summary.csv → csv-summary.json
+
+CSV は1行 = 年 × 区市町村 × 選挙区 × 候補者 (csv-parser.ts と同じ列)。
+入力ルート (temp_excel/) の CSV を1行ずつ読み、data-processor.ts がブラウザで
+行う選挙区・区市町村・政党別の集計を年ごとに作っておく。public/data/ の同名の
+CSV はブラウザが読むコピー。
+
+  years[年].districts  区市町村 × 選挙区 (キー '大田区-東京4区'、groupByDistrict と同じ)
+                        候補者別の得票・得票率・当落、投票率 (DistrictSummary)
+  years[年].wards      区市町村ごとの政党別得票・得票率・議席、投票率 (WardSummary)
+  years[年].parties    政党別合計 (PartyResult)
+
+当選者は選挙区全体 (区市町村をまたいで合計した得票) の最多得票者。議席は
+当選者の政党で数える (区市町村は区域に含む選挙区の分)。
+同じ (年, 区市町村, 選挙区, 候補者) の行が複数の CSV にあるときは先に読んだ
+CSV の行を使う (区の CSV を tokyo-summary.csv より優先)。
+"""
+import csv
+from collections import defaultdict
+
+from cell_decode import safe_int
+from json_output import write_json
+from paths import input_path, output_path
+from profiling import Profiler
+
+# 読む順 (先の CSV が優先)
+SOURCES = ['2026-ota.csv', '2026-meguro.csv', 'tokyo-summary.csv']
+FORMAT = 'csv-summary/v1'
+
+SHARE_DIGITS = 2
+
+
+def iter_rows(paths):
+    """CSV の行を ElectionResult (csv-parser.ts と同じキー) として1行ずつ返す"""
+    for path in paths:
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            reader = csv.reader(f)
+            header = [h.strip().lower() for h in next(reader, [])]
+            for values in reader:
+                if not any(v.strip() for v in values):
+                    continue
+                row = dict(zip(header, values))
+                yield {
+                    'year': safe_int(row.get('year')),
+                    'regionType': row.get('region_type', ''),
+                    'regionName': row.get('region_name', ''),
+                    'district': row.get('district', ''),
+                    'partyName': row.get('party_name', ''),
+                    'candidateName': row.get('candidate_name', ''),
+                    'votes': safe_int(row.get('votes')),
+                    'eligibleVoters': safe_int(row.get('eligible_voters')),
+                }
+
+
+def share(votes, total):
+    return round(votes / total * 100, SHARE_DIGITS) if total else 0
+
+
+class YearSummary:
+    """1年分の区市町村 × 選挙区ごとの候補者を1行ずつ受け取り、集計する"""
+
+    def __init__(self):
+        # '区市町村-選挙区' → {regionType, regionName, district, eligibleVoters, candidates}
+        self.portions = {}
+        self.duplicates = 0
+
+    def add(self, row):
+        key = f"{row['regionName']}-{row['district']}"
+        portion = self.portions.get(key)
+        if portion is None:
+            portion = self.portions[key] = {
+                'regionType': row['regionType'],
+                'regionName': row['regionName'],
+                'district': row['district'],
+                'eligibleVoters': row['eligibleVoters'],
+                'candidates': {},
+            }
+        if row['candidateName'] in portion['candidates']:
+            self.duplicates += 1
+            return
+        portion['candidates'][row['candidateName']] = (row['partyName'], row['votes'])
+
+    def winners(self):
+        """選挙区 → (当選者名, 政党)。区市町村をまたいで合計した得票の最多 (同数は先に出た候補者)"""
+        totals = defaultdict(dict)
+        for p in self.portions.values():
+            for name, (party, votes) in p['candidates'].items():
+                prev = totals[p['district']].get(name, (party, 0))
+                totals[p['district']][name] = (prev[0], prev[1] + votes)
+        out = {}
+        for district, cands in totals.items():
+            name, (party, _) = max(cands.items(), key=lambda kv: kv[1][1])
+            out[district] = (name, party)
+        return out
+
+    def districts(self, winners):
+        out = {}
+        for key, p in self.portions.items():
+            total = sum(v for _, v in p['candidates'].values())
+            winner = winners.get(p['district'], (None,))[0]
+            results = [
+                {'candidateName': name, 'partyName': party, 'votes': votes,
+                 'voteShare': share(votes, total), 'isWinner': name == winner}
+                for name, (party, votes) in p['candidates'].items()
+            ]
+            results.sort(key=lambda r: -r['votes'])
+            out[key] = {
+                'district': p['district'],
+                'regionName': p['regionName'],
+                'regionType': p['regionType'],
+                'totalVotes': total,
+                'eligibleVoters': p['eligibleVoters'],
+                'turnoutRate': share(total, p['eligibleVoters']),
+                'results': results,
+            }
+        return out
+
+    @staticmethod
+    def _party_results(portions, winners):
+        """区市町村 × 選挙区のリスト → (政党別の行, 得票合計)"""
+        votes = {}
+        for p in portions:
+            for party, v in p['candidates'].values():
+                votes[party] = votes.get(party, 0) + v
+        seats = defaultdict(int)
+        for district in dict.fromkeys(p['district'] for p in portions):
+            if district in winners:
+                seats[winners[district][1]] += 1
+        total = sum(votes.values())
+        rows = [{'partyName': party, 'votes': v, 'voteShare': share(v, total), 'seats': seats[party]}
+                for party, v in votes.items()]
+        rows.sort(key=lambda r: -r['votes'])
+        return rows, total
+
+    def wards(self, winners):
+        by_ward = defaultdict(list)
+        for p in self.portions.values():
+            by_ward[p['regionName']].append(p)
+        out = {}
+        for ward, portions in by_ward.items():
+            rows, total = self._party_results(portions, winners)
+            eligible = sum(p['eligibleVoters'] for p in portions)
+            out[ward] = {
+                'wardName': ward,
+                'totalVotes': total,
+                'eligibleVoters': eligible,
+                'turnoutRate': share(total, eligible),
+                'partyResults': rows,
+                'seats': sum(r['seats'] for r in rows),
+            }
+        return out
+
+    def to_json(self):
+        winners = self.winners()
+        parties, _ = self._party_results(list(self.portions.values()), winners)
+        return {
+            'districts': self.districts(winners),
+            'wards': self.wards(winners),
+            'parties': parties,
+        }
+
+
+def summarize(rows):
+    """行のイテラブル → ({年: YearSummary}, 行数)"""
+    years = {}
+    count = 0
+    for row in rows:
+        count += 1
+        years.setdefault(row['year'], YearSummary()).add(row)
+    return years, count
+
+
+def main():
+    prof = Profiler('convert_csv_summary')
+    output = output_path('csv-summary.json')
+    paths = [input_path(name) for name in SOURCES]
+    years, count = prof.run('summarize', summarize, iter_rows(paths))
+    data = {
+        'format': FORMAT,
+        'sources': SOURCES,
+        'years': {str(y): years[y].to_json() for y in sorted(years)},
+    }
+    write_json(output, data)
+
+    print(f'Output: {output}')
+    print(f'{count} rows from {len(SOURCES)} CSV files')
+    for y in sorted(years):
+        s = data['years'][str(y)]
+        print(f"  {y}: {len(s['districts'])} 区市町村×選挙区, {len(s['wards'])} 区市町村, {len(s['parties'])} 政党")
+
+    print('\n--- Validation ---')
+    for y in sorted(years):
+        if years[y].duplicates:
+            print(f'  WARN {y}: {years[y].duplicates} rows duplicated across CSV files (first file used)')
+    ok = True
+    for y, s in data['years'].items():
+        seats = sum(p['seats'] for p in s['parties'])
+        districts = len({d['district'] for d in s['districts'].values()})
+        if seats != districts:
+            print(f'  WARN {y}: seats={seats} != districts={districts}')
+            ok = False
+    if ok:
+        print('  議席: 1選挙区1議席 OK')
+    prof.finish()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,32 +3,26 @@
 2024年衆議院選挙 全国データ変換スクリプト
 Excel → NationalElectionData JSON
 """
-import json
+import os
 import re
-import openpyxl
-
-EXCEL_FILE = '/Users/tamata78/Downloads/2024_衆議員選_小選挙区_比例区.xlsx'
-OUTPUT = '/Users/tamata78/work/election-viewer/public/data/elections/shugiin_2024.json'
-
-PREFECTURES = [
-    '北海道', '青森県', '岩手県', '宮城県', '秋田県', '山形県', '福島県',
-    '茨城県', '栃木県', '群馬県', '埼玉県', '千葉県', '東京都', '神奈川県',
-    '新潟県', '富山県', '石川県', '福井県', '山梨県', '長野県',
-    '岐阜県', '静岡県', '愛知県', '三重県',
-    '滋賀県', '京都府', '大阪府', '兵庫県', '奈良県', '和歌山県',
-    '鳥取県', '島根県', '岡山県', '広島県', '山口県',
-    '徳島県', '香川県', '愛媛県', '高知県',
-    '福岡県', '佐賀県', '長崎県', '熊本県', '大分県', '宮崎県', '鹿児島県', '沖縄県'
-]
-
-BLOCK_ORDER = ['北海道', '東北', '北関東', '南関東', '東京都', '北陸信越', '東海', '近畿', '中国', '四国', '九州']
 
-# 2024 block seats (derived from actual elected counts in Excel)
-BLOCK_SEATS = {
-    '北海道': 8, '東北': 12, '北関東': 19, '南関東': 23,
-    '東京都': 19, '北陸信越': 10, '東海': 21, '近畿': 28,
-    '中国': 10, '四国': 6, '九州': 20,
-}
+from cell_decode import parse_count, safe_int
+from dhondt import print_check
+from dimensions import BLOCK_NAMES, BLOCK_SEATS, PREFECTURE_NAMES
+from election_shards import write_shards
+from hirei_revival import print_report, stream_hirei_lists
+from json_output import write_json
+from label_index import PatternMatcher
+from paths import input_path, output_path
+from profiling import Profiler
+from shou_candidates import stream_shou_districts
+from table_layout import extract, table
+from workbook_session import WorkbookSession
+
+EXCEL_FILE = input_path('2024_衆議員選_小選挙区_比例区.xlsx')
+# 小選挙区の候補者別得票数 (集計表には候補者がないため別ファイル、なければ候補者なしで出力)
+CANDIDATE_FILE = input_path('2024_衆議員選_小選挙区_候補者別得票数.xlsx')
+OUTPUT = output_path('elections', 'shugiin_2024.json')
 
 # Hirei party tables → block mapping
 HIREI_TABLE_MAP = {
@@ -56,28 +50,7 @@ KNOWN_PARTIES = [
     '自由民主党', '立憲民主党', '日本維新の会', '公明党', '日本共産党', '国民民主党',
     'れいわ新選組', '社会民主党', '参政党', 'みんなでつくる党', '安楽死制度を考える会', '日本保守党',
 ]
-
-
-def safe_int(val):
-    if val is None:
-        return 0
-    if isinstance(val, (int, float)):
-        return int(val)
-    s = str(val).replace(',', '').replace(' ', '').replace('\u3000', '').replace('票', '')
-    m = re.search(r'\d+', s)
-    return int(m.group(0)) if m else 0
-
-
-def parse_count(val):
-    if val is None:
-        return 0
-    if isinstance(val, (int, float)):
-        return int(val)
-    s = str(val).strip()
-    nums = re.findall(r'\d+', s)
-    if nums:
-        return int(nums[-1])
-    return 0
+PARTY_MATCHER = PatternMatcher(KNOWN_PARTIES)
 
 
 def last_nonzero_in_range(row, start, end):
@@ -90,6 +63,26 @@ def last_nonzero_in_range(row, start, end):
     return 0
 
 
+# 小選挙区 得票数 (Tables 21-24 の計の列) と有効投票数 (Table 28)、47都道府県
+SHOU_VOTES_LAYOUT = {
+    'votes21': table(sheet='Table 21', anchor=2, rows=PREFECTURE_NAMES,
+                     columns={'自由民主党': 5, '立憲民主党': 8, '日本維新の会': 11, '公明党': 14},
+                     decode=safe_int, dtype='int64'),
+    'votes22': table(sheet='Table 22', anchor=2, rows=PREFECTURE_NAMES,
+                     columns={'日本共産党': 5, '国民民主党': 8, 'れいわ新選組': 11, '社会民主党': 14},
+                     decode=safe_int, dtype='int64'),
+    # Table 23: 参政, みんなでつくる (参政のみ使用)
+    'votes23': table(sheet='Table 23', anchor=2, rows=PREFECTURE_NAMES, columns={'参政党': 5},
+                     decode=safe_int, dtype='int64'),
+    # Table 24: 諸派, 無所属, 合計 (無所属のみ使用)
+    'votes24': table(sheet='Table 24', anchor=2, rows=PREFECTURE_NAMES, columns={'無所属': 8},
+                     decode=safe_int, dtype='int64'),
+    # Table 28: 有効投票数は col 5、空なら col 4
+    'valid': table(sheet='Table 28', anchor=1, rows=PREFECTURE_NAMES, columns={'有効投票数': 5, '予備': 4},
+                   decode=safe_int, dtype='int64'),
+}
+
+
 def extract_shou_data(wb):
     """Extract 小選挙区 data."""
     # Table 14: elected counts for major parties
@@ -100,17 +93,11 @@ def extract_shou_data(wb):
     # Table 16: independents
     rows16 = list(wb['Table 16'].iter_rows(min_row=4, max_row=50, values_only=True))
 
-    # Table 21-24: votes
-    rows21 = list(wb['Table 21'].iter_rows(min_row=3, max_row=49, values_only=True))
-    rows22 = list(wb['Table 22'].iter_rows(min_row=3, max_row=49, values_only=True))
-    rows23 = list(wb['Table 23'].iter_rows(min_row=3, max_row=49, values_only=True))
-    rows24 = list(wb['Table 24'].iter_rows(min_row=3, max_row=49, values_only=True))
-
-    # Table 28: total valid votes
-    rows28 = list(wb['Table 28'].iter_rows(min_row=2, max_row=48, values_only=True))
+    # Table 21-24: votes, Table 28: total valid votes
+    votes_data = extract(SHOU_VOTES_LAYOUT, wb)
 
     prefectures = []
-    for i, pref_name in enumerate(PREFECTURES):
+    for i, pref_name in enumerate(PREFECTURE_NAMES):
         r14 = rows14[i]
         total_districts = safe_int(r14[3])
 
@@ -135,35 +122,16 @@ def extract_shou_data(wb):
         musozoku = last_nonzero_in_range(r16, 9, 13)
         elected['無所属'] = suisen + musozoku
 
-        # Votes from Table 21 (LDP, CDP, 維新, 公明) - 計 cols: 5, 8, 11, 14
-        r21 = rows21[i]
-        votes = {
-            '自由民主党': safe_int(r21[5]),
-            '立憲民主党': safe_int(r21[8]),
-            '日本維新の会': safe_int(r21[11]),
-            '公明党': safe_int(r21[14]),
-        }
-
-        # Votes from Table 22 (共産, 国民, れいわ, 社民) - 計 cols: 5, 8, 11, 14
-        r22 = rows22[i]
-        votes['日本共産党'] = safe_int(r22[5])
-        votes['国民民主党'] = safe_int(r22[8])
-        votes['れいわ新選組'] = safe_int(r22[11])
-        votes['社会民主党'] = safe_int(r22[14])
-
-        # Votes from Table 23 (参政, みんなでつくる) - 計 cols: 5, 8
-        r23 = rows23[i]
-        votes['参政党'] = safe_int(r23[5])
-
-        # Votes from Table 24 (諸派, 無所属, 合計) - 計 cols: 5, 8, 11
-        r24 = rows24[i]
-        votes['無所属'] = safe_int(r24[8])
+        # Votes from Tables 21-24
+        votes = {}
+        for t in ('votes21', 'votes22', 'votes23', 'votes24'):
+            votes.update(votes_data[t][pref_name])
 
         # Total valid votes from Table 28
-        r28 = rows28[i]
-        total_votes_pref = safe_int(r28[5])  # col varies; try 5 (有効投票数)
+        valid = votes_data['valid'][pref_name]
+        total_votes_pref = valid['有効投票数']  # col varies; try 5 (有効投票数)
         if total_votes_pref == 0:
-            total_votes_pref = safe_int(r28[4])
+            total_votes_pref = valid['予備']
         if total_votes_pref == 0:
             total_votes_pref = sum(votes.values())
 
@@ -200,7 +168,7 @@ def extract_hirei_data(wb):
     """Extract 比例代表 data."""
     blocks = []
 
-    for block_name in BLOCK_ORDER:
+    for block_name in BLOCK_NAMES:
         # Get party votes from ranking table (Tables 30-40)
         rank_table = HIREI_RANK_TABLE[block_name]
         ws_rank = wb[f'Table {rank_table}']
@@ -223,30 +191,29 @@ def extract_hirei_data(wb):
 
         for tnum in table_nums:
             ws = wb[f'Table {tnum}']
-            rows = list(ws.iter_rows(min_row=1, max_row=min(3, ws.max_row), values_only=False))
+            rows = list(ws.iter_rows(min_row=1, max_row=min(3, ws.max_row), values_only=True))
             if len(rows) < 3:
                 continue
 
-            row1 = [(c.value, c.column) for c in rows[0]]
-            row3 = [(c.value, c.column) for c in rows[2]]
+            row1 = [(v, c) for c, v in enumerate(rows[0], start=1)]
+            row3 = [(v, c) for c, v in enumerate(rows[2], start=1)]
 
             for val, col in row1:
                 if not val:
                     continue
-                for p in KNOWN_PARTIES:
-                    if p in str(val):
-                        seats = 0
-                        for v3, c3 in row3:
-                            if v3 and c3 >= col and c3 < col + 10:
-                                m = re.search(r'(\d+)\s*人', str(v3))
-                                if m:
-                                    seats = int(m.group(1))
-                                    break
-                        if p not in party_seats:
-                            party_seats[p] = seats
-                        elif seats > 0:
-                            party_seats[p] = seats
-                        break
+                p = PARTY_MATCHER.best(val)
+                if p:
+                    seats = 0
+                    for v3, c3 in row3:
+                        if v3 and c3 >= col and c3 < col + 10:
+                            m = re.search(r'(\d+)\s*人', str(v3))
+                            if m:
+                                seats = int(m.group(1))
+                                break
+                    if p not in party_seats:
+                        party_seats[p] = seats
+                    elif seats > 0:
+                        party_seats[p] = seats
 
         # Build hirei parties
         hirei_parties = []
@@ -274,38 +241,52 @@ def extract_hirei_data(wb):
 
 
 def main():
-    print('Loading Excel file...')
-    wb = openpyxl.load_workbook(EXCEL_FILE)
-
-    print('Extracting 小選挙区 data...')
-    prefectures = extract_shou_data(wb)
-
-    print('Extracting 比例代表 data...')
-    hirei_blocks = extract_hirei_data(wb)
-
-    total_shou_seats = sum(p['totalDistricts'] for p in prefectures)
-    total_hirei_seats = sum(b['totalSeats'] for b in hirei_blocks)
-
-    data = {
-        'year': 2024,
-        'electionDate': '2024-10-27',
-        'hirei': {
-            'totalSeats': total_hirei_seats,
-            'blocks': hirei_blocks,
-        },
-        'shou': {
-            'totalSeats': total_shou_seats,
-            'prefectures': prefectures,
-            'districts': [],
-        },
-    }
-
-    with open(OUTPUT, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    prof = Profiler('convert_national_2024')
+    with WorkbookSession() as session:
+        print('Loading Excel file...')
+        wb = session.open(EXCEL_FILE)
+
+        print('Extracting 小選挙区 data...')
+        prefectures = prof.run('extract_shou_data', extract_shou_data, wb)
+
+        print('Extracting 比例代表 data...')
+        hirei_blocks = prof.run('extract_hirei_data', extract_hirei_data, wb)
+
+        total_shou_seats = sum(p['totalDistricts'] for p in prefectures)
+        total_hirei_seats = sum(b['totalSeats'] for b in hirei_blocks)
+
+        data = {
+            'year': 2024,
+            'electionDate': '2024-10-27',
+            'hirei': {
+                'totalSeats': total_hirei_seats,
+                'blocks': hirei_blocks,
+            },
+            'shou': {
+                'totalSeats': total_shou_seats,
+                'prefectures': prefectures,
+                'districts': [],
+            },
+        }
+
+        write_json(OUTPUT, data)
+
+        # 候補者別データは選挙区単位でストリーミングし、都道府県シャードにだけ書く
+        # (比例名簿があれば惜敗率・比例復活を計算してブロックのシャードに入れる)
+        # 小選挙区の結果がないと当選者を名簿から除けないので、当落の計算もしない
+        districts = hirei_lists = None
+        if os.path.exists(CANDIDATE_FILE):
+            print('Extracting 小選挙区 candidates...')
+            districts = stream_shou_districts(session.open(CANDIDATE_FILE))
+            hirei_lists = stream_hirei_lists(wb)
+        else:
+            print(f'  WARN {os.path.basename(CANDIDATE_FILE)}: not found, skipping candidates and list results')
+        shards = prof.run('write_shards', write_shards, data, OUTPUT, districts, hirei_lists=hirei_lists)
 
     print(f'\nOutput: {OUTPUT}')
     print(f'小選挙区: {total_shou_seats} seats, {len(prefectures)} prefectures')
     print(f'比例代表: {total_hirei_seats} seats, {len(hirei_blocks)} blocks')
+    print(f"候補者:   {shards['districts']} districts, {shards['candidates']} candidates")
 
     # Validation
     print('\n--- Validation ---')
@@ -326,6 +307,9 @@ def main():
             hirei_ok = False
     if hirei_ok:
         print('  比例代表: All blocks OK')
+    print_check(hirei_blocks)
+    if 'revival' in shards:
+        print_report(shards['revival'])
 
     # Summary
     print('\n--- 小選挙区 当選者数 ---')
@@ -346,6 +330,8 @@ def main():
         if seats > 0:
             print(f'  {party}: {seats}')
 
+    prof.finish()
+
 
 if __name__ == '__main__':
     main()
@@ -3,107 +3,78 @@
 2026年衆議院選挙 全国データ変換スクリプト
 Excel → NationalElectionData JSON
 """
-import json
+import os
 import re
-import openpyxl
-
-SHOU_FILE = '/Users/tamata78/Downloads/2026_都道府県別党派別新前元別当選人数（小選挙区）.xlsx'
-HIREI_FILE = '/Users/tamata78/Downloads/2026_比例代表当選人数.xlsx'
-OUTPUT = '/Users/tamata78/work/election-viewer/public/data/elections/shugiin_2026.json'
-
-PREFECTURES = [
-    '北海道', '青森県', '岩手県', '宮城県', '秋田県', '山形県', '福島県',
-    '茨城県', '栃木県', '群馬県', '埼玉県', '千葉県', '東京都', '神奈川県',
-    '新潟県', '富山県', '石川県', '福井県', '山梨県', '長野県',
-    '岐阜県', '静岡県', '愛知県', '三重県',
-    '滋賀県', '京都府', '大阪府', '兵庫県', '奈良県', '和歌山県',
-    '鳥取県', '島根県', '岡山県', '広島県', '山口県',
-    '徳島県', '香川県', '愛媛県', '高知県',
-    '福岡県', '佐賀県', '長崎県', '熊本県', '大分県', '宮崎県', '鹿児島県', '沖縄県'
-]
-
-BLOCKS = {
-    '北海道': ['北海道'],
-    '東北': ['青森県', '岩手県', '宮城県', '秋田県', '山形県', '福島県'],
-    '北関東': ['茨城県', '栃木県', '群馬県', '埼玉県'],
-    '南関東': ['千葉県', '神奈川県', '山梨県'],
-    '東京都': ['東京都'],
-    '北陸信越': ['新潟県', '富山県', '石川県', '福井県', '長野県'],
-    '東海': ['岐阜県', '静岡県', '愛知県', '三重県'],
-    '近畿': ['滋賀県', '京都府', '大阪府', '兵庫県', '奈良県', '和歌山県'],
-    '中国': ['鳥取県', '島根県', '岡山県', '広島県', '山口県'],
-    '四国': ['徳島県', '香川県', '愛媛県', '高知県'],
-    '九州': ['福岡県', '佐賀県', '長崎県', '熊本県', '大分県', '宮崎県', '鹿児島県', '沖縄県'],
-}
 
-BLOCK_SEATS = {
-    '北海道': 8, '東北': 12, '北関東': 19, '南関東': 23,
-    '東京都': 19, '北陸信越': 10, '東海': 21, '近畿': 28,
-    '中国': 10, '四国': 6, '九州': 20,
+from cell_decode import parse_count, safe_int
+from dhondt import print_check
+from dimensions import BLOCK_NAMES, BLOCK_SEATS, PREFECTURE_NAMES
+from election_shards import write_shards
+from hirei_revival import print_report, stream_hirei_lists
+from json_output import write_json
+from label_index import PatternMatcher
+from paths import input_path, output_path
+from profiling import Profiler
+from shou_candidates import stream_shou_districts
+from table_layout import extract, table
+from workbook_session import WorkbookSession
+
+SHOU_FILE = input_path('2026_都道府県別党派別新前元別当選人数（小選挙区）.xlsx')
+HIREI_FILE = input_path('2026_比例代表当選人数.xlsx')
+# 小選挙区の候補者別得票数 (集計表には候補者がないため別ファイル、なければ候補者なしで出力)
+CANDIDATE_FILE = input_path('2026_候補者別得票数（小選挙区）.xlsx')
+OUTPUT = output_path('elections', 'shugiin_2026.json')
+
+
+# Block label fragments in the first 3 columns → block name (earlier entries win)
+BLOCK_LABELS = {
+    '北海道': '北海道', '東北': '東北', '北関東': '北関東',
+    '南関東': '南関東', '東京': '東京都', '北陸': '北陸信越',
+    '東海': '東海', '近畿': '近畿', '中国': '中国',
+    '四国': '四国', '九州': '九州',
 }
+BLOCK_MATCHER = PatternMatcher(BLOCK_LABELS)
 
-
-def safe_int(val):
-    """Safely convert a value to int."""
-    if val is None:
-        return 0
-    if isinstance(val, (int, float)):
-        return int(val)
-    s = str(val).replace(',', '').replace(' ', '').replace('\u3000', '').replace('票', '')
-    # Take first number from string
-    m = re.search(r'\d+', s)
-    return int(m.group(0)) if m else 0
-
-
-def parse_count(val):
-    """Parse elected count from value like '1                        1' or integer."""
-    if val is None:
-        return 0
-    if isinstance(val, (int, float)):
-        return int(val)
-    s = str(val).strip()
-    nums = re.findall(r'\d+', s)
-    if nums:
-        return int(nums[-1])  # 計 is the last number
-    return 0
+KNOWN_PARTIES = [
+    '自由民主党', '中道改革連合', '日本維新の会', '国民民主党',
+    '参政党', '日本共産党', 'れいわ新選組', '社会民主党',
+    'チームみらい', '日本保守党', '減税日本・ゆうこく連合',
+]
+PARTY_MATCHER = PatternMatcher(KNOWN_PARTIES)
 
 
 def detect_block(r0, r1, r2):
     """Detect block name from first 3 columns."""
-    block_id = (str(r0 or '') + str(r1 or '') + str(r2 or '')).replace(' ', '').replace('\u3000', '')
-    if not block_id or block_id == 'NoneNoneNone':
-        return None
-    mapping = [
-        ('北海道', '北海道'), ('東北', '東北'), ('北関東', '北関東'),
-        ('南関東', '南関東'), ('東京', '東京都'), ('北陸', '北陸信越'),
-        ('東海', '東海'), ('近畿', '近畿'), ('中国', '中国'),
-        ('四国', '四国'), ('九州', '九州'),
-    ]
-    for key, name in mapping:
-        if key in block_id:
-            return name
-    return None
-
-
-def extract_shou_data():
+    key = BLOCK_MATCHER.best(str(r0 or '') + str(r1 or '') + str(r2 or ''))
+    return BLOCK_LABELS[key] if key else None
+
+
+# 小選挙区 得票数 (Table 24/25 の男女計の列) と有効投票数 (Table 31)、47都道府県
+SHOU_VOTES_LAYOUT = {
+    'votes24': table(sheet='Table 24', anchor=2, rows=PREFECTURE_NAMES,
+                     columns={'自由民主党': 5, '中道改革連合': 8, '日本維新の会': 11, '国民民主党': 14},
+                     decode=safe_int, dtype='int64'),
+    'votes25': table(sheet='Table 25', anchor=2, rows=PREFECTURE_NAMES,
+                     columns={'参政党': 5, '日本共産党': 8, 'れいわ新選組': 11, '減税日本・ゆうこく連合': 14},
+                     decode=safe_int, dtype='int64'),
+    'valid': table(sheet='Table 31', anchor=1, rows=PREFECTURE_NAMES, columns={'有効投票数': 2},
+                   decode=safe_int, dtype='int64'),
+}
+
+
+def extract_shou_data(session):
     """Extract 小選挙区 data from the Excel file."""
-    wb = openpyxl.load_workbook(SHOU_FILE)
+    wb = session.open(SHOU_FILE)
 
     # --- Table 17/18: elected counts per prefecture ---
     rows17 = list(wb['Table 17'].iter_rows(min_row=3, max_row=49, values_only=True))
     rows18 = list(wb['Table 18'].iter_rows(min_row=3, max_row=49, values_only=True))
 
-    # --- Table 24/25: votes per prefecture (main parties, clean format) ---
-    # Table 24: pref(3), LDP(男女計), chudo(男女計), ishin(男女計), kokumin(男女計)
-    rows24 = list(wb['Table 24'].iter_rows(min_row=3, max_row=49, values_only=True))
-    # Table 25: sansei(男女計), kyosan(男女計), reiwa(男女計), genzei(男女計)
-    rows25 = list(wb['Table 25'].iter_rows(min_row=3, max_row=49, values_only=True))
-
-    # --- Table 31: total valid votes per prefecture ---
-    rows31 = list(wb['Table 31'].iter_rows(min_row=2, max_row=48, values_only=True))
+    # --- Table 24/25/31: votes and total valid votes per prefecture ---
+    votes_data = extract(SHOU_VOTES_LAYOUT, wb)
 
     prefectures = []
-    for i, pref_name in enumerate(PREFECTURES):
+    for i, pref_name in enumerate(PREFECTURE_NAMES):
         r17 = rows17[i]
         total_districts = safe_int(r17[3])
 
@@ -134,25 +105,12 @@ def extract_shou_data():
                 break
         elected['無所属'] = musozoku
 
-        # Votes from Table 24 (計 columns: 5, 8, 11, 14)
-        r24 = rows24[i]
-        votes = {
-            '自由民主党': safe_int(r24[5]),
-            '中道改革連合': safe_int(r24[8]),
-            '日本維新の会': safe_int(r24[11]),
-            '国民民主党': safe_int(r24[14]),
-        }
-
-        # Votes from Table 25 (計 columns: 5, 8, 11, 14)
-        r25 = rows25[i]
-        votes['参政党'] = safe_int(r25[5])
-        votes['日本共産党'] = safe_int(r25[8])
-        votes['れいわ新選組'] = safe_int(r25[11])
-        votes['減税日本・ゆうこく連合'] = safe_int(r25[14])
+        # Votes from Table 24/25 (計 columns: 5, 8, 11, 14)
+        votes = votes_data['votes24'][pref_name]
+        votes.update(votes_data['votes25'][pref_name])
 
         # Total valid votes from Table 31
-        r31 = rows31[i]
-        total_votes_pref = safe_int(r31[2])  # 有効投票数
+        total_votes_pref = votes_data['valid'][pref_name]['有効投票数']
         if total_votes_pref == 0:
             total_votes_pref = sum(votes.values())
 
@@ -186,9 +144,9 @@ def extract_shou_data():
     return prefectures
 
 
-def extract_hirei_data():
+def extract_hirei_data(session):
     """Extract 比例代表 data."""
-    wb_shou = openpyxl.load_workbook(SHOU_FILE)
+    wb_shou = session.open(SHOU_FILE)
 
     # --- Block-level votes from Table 28/29/30 (比例代表 by block) ---
     block_votes = {}
@@ -247,7 +205,7 @@ def extract_hirei_data():
             block_totals[current_block] = safe_int(row[6])
 
     # --- Parse hirei Excel for elected counts per party per block ---
-    wb_hirei = openpyxl.load_workbook(HIREI_FILE)
+    wb_hirei = session.open(HIREI_FILE)
 
     # Each block has 2-4 tables containing party data side-by-side
     block_table_map = {
@@ -264,34 +222,27 @@ def extract_hirei_data():
         '九州': [30, 31, 32, 33],
     }
 
-    known_parties = [
-        '自由民主党', '中道改革連合', '日本維新の会', '国民民主党',
-        '参政党', '日本共産党', 'れいわ新選組', '社会民主党',
-        'チームみらい', '日本保守党', '減税日本・ゆうこく連合',
-    ]
-
     def parse_hirei_tables(table_nums):
         """Parse hirei tables for a block, extracting party elected counts and votes."""
         parties = {}
         for tnum in table_nums:
             ws = wb_hirei[f'Table {tnum}']
             all_rows = list(ws.iter_rows(min_row=1, max_row=min(3, ws.max_row),
-                                         max_col=ws.max_column, values_only=False))
+                                         max_col=ws.max_column, values_only=True))
             if len(all_rows) < 3:
                 continue
 
-            # Identify parties from row 1
-            row1 = [(c.value, c.column) for c in all_rows[0]]
-            row2 = [(c.value, c.column) for c in all_rows[1]]
-            row3 = [(c.value, c.column) for c in all_rows[2]]
+            # Identify parties from row 1 (col is 1-based)
+            row1 = [(v, c) for c, v in enumerate(all_rows[0], start=1)]
+            row2 = [(v, c) for c, v in enumerate(all_rows[1], start=1)]
+            row3 = [(v, c) for c, v in enumerate(all_rows[2], start=1)]
 
             party_cols = []
             for val, col in row1:
                 if val:
-                    for p in known_parties:
-                        if p in str(val):
-                            party_cols.append((p, col))
-                            break
+                    p = PARTY_MATCHER.best(val)
+                    if p:
+                        party_cols.append((p, col))
 
             for party_name, start_col in party_cols:
                 # Elected count from row 3
@@ -328,7 +279,7 @@ def extract_hirei_data():
 
     # Build hirei blocks
     blocks = []
-    for block_name in BLOCKS:
+    for block_name in BLOCK_NAMES:
         tables = block_table_map.get(block_name, [])
         party_data = parse_hirei_tables(tables)
 
@@ -373,35 +324,49 @@ def extract_hirei_data():
 
 
 def main():
-    print('Extracting 小選挙区 data...')
-    prefectures = extract_shou_data()
-
-    print('Extracting 比例代表 data...')
-    hirei_blocks = extract_hirei_data()
-
-    total_shou_seats = sum(p['totalDistricts'] for p in prefectures)
-    total_hirei_seats = sum(b['totalSeats'] for b in hirei_blocks)
-
-    data = {
-        'year': 2026,
-        'electionDate': '2026-02-08',
-        'hirei': {
-            'totalSeats': total_hirei_seats,
-            'blocks': hirei_blocks,
-        },
-        'shou': {
-            'totalSeats': total_shou_seats,
-            'prefectures': prefectures,
-            'districts': [],
-        },
-    }
+    prof = Profiler('convert_national_2026')
+    with WorkbookSession() as session:
+        print('Extracting 小選挙区 data...')
+        prefectures = prof.run('extract_shou_data', extract_shou_data, session)
+
+        print('Extracting 比例代表 data...')
+        hirei_blocks = prof.run('extract_hirei_data', extract_hirei_data, session)
+
+        total_shou_seats = sum(p['totalDistricts'] for p in prefectures)
+        total_hirei_seats = sum(b['totalSeats'] for b in hirei_blocks)
+
+        data = {
+            'year': 2026,
+            'electionDate': '2026-02-08',
+            'hirei': {
+                'totalSeats': total_hirei_seats,
+                'blocks': hirei_blocks,
+            },
+            'shou': {
+                'totalSeats': total_shou_seats,
+                'prefectures': prefectures,
+                'districts': [],
+            },
+        }
 
-    with open(OUTPUT, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+        write_json(OUTPUT, data)
+
+        # 候補者別データは選挙区単位でストリーミングし、都道府県シャードにだけ書く
+        # (比例名簿があれば惜敗率・比例復活を計算してブロックのシャードに入れる)
+        # 小選挙区の結果がないと当選者を名簿から除けないので、当落の計算もしない
+        districts = hirei_lists = None
+        if os.path.exists(CANDIDATE_FILE):
+            print('Extracting 小選挙区 candidates...')
+            districts = stream_shou_districts(session.open(CANDIDATE_FILE))
+            hirei_lists = stream_hirei_lists(session.open(HIREI_FILE))
+        else:
+            print(f'  WARN {os.path.basename(CANDIDATE_FILE)}: not found, skipping candidates and list results')
+        shards = prof.run('write_shards', write_shards, data, OUTPUT, districts, hirei_lists=hirei_lists)
 
     print(f'\nOutput: {OUTPUT}')
     print(f'小選挙区: {total_shou_seats} seats, {len(prefectures)} prefectures')
     print(f'比例代表: {total_hirei_seats} seats, {len(hirei_blocks)} blocks')
+    print(f"候補者:   {shards['districts']} districts, {shards['candidates']} candidates")
 
     # Validation
     print('\n--- Validation ---')
@@ -422,6 +387,9 @@ def main():
             hirei_ok = False
     if hirei_ok:
         print('  比例代表: All blocks OK')
+    print_check(hirei_blocks)
+    if 'revival' in shards:
+        print_report(shards['revival'])
 
     # Summary
     print('\n--- 小選挙区 当選者数 ---')
@@ -442,6 +410,8 @@ def main():
         if seats > 0:
             print(f'  {party}: {seats}')
 
+    prof.finish()
+
 
 if __name__ == '__main__':
     main()
@@ -7,108 +7,18 @@ Excel → NationalElectionData JSON
 - 選挙区は合区あり (鳥取・島根、徳島・高知)
 - 比例代表は全国一本 (ブロックなし)
 """
-import json
-import re
-import unicodedata
-import openpyxl
-
-EXCEL_FILE = '/Users/tamata78/Downloads/2025_参議委員選挙_小選挙区_比例区.xlsx'
-OUTPUT = '/Users/tamata78/work/election-viewer/public/data/elections/sangiin_2025.json'
-
-# 45選挙区 (合区: 鳥取・島根、徳島・高知) — Tables 21-23 の行順
-SANGIIN_PREFECTURES = [
-    '北海道', '青森県', '岩手県', '宮城県', '秋田県', '山形県', '福島県',
-    '茨城県', '栃木県', '群馬県', '埼玉県', '千葉県', '東京都', '神奈川県',
-    '新潟県', '富山県', '石川県', '福井県', '山梨県', '長野県',
-    '岐阜県', '静岡県', '愛知県', '三重県',
-    '滋賀県', '京都府', '大阪府', '兵庫県', '奈良県', '和歌山県',
-    '鳥取県・島根県', '岡山県', '広島県', '山口県',
-    '徳島県・高知県', '香川県', '愛媛県',
-    '福岡県', '佐賀県', '長崎県', '熊本県', '大分県', '宮崎県', '鹿児島県', '沖縄県',
-]
-
-# 標準47都道府県 (Tables 28, 38 の行順)
-STANDARD_47 = [
-    '北海道', '青森県', '岩手県', '宮城県', '秋田県', '山形県', '福島県',
-    '茨城県', '栃木県', '群馬県', '埼玉県', '千葉県', '東京都', '神奈川県',
-    '新潟県', '富山県', '石川県', '福井県', '山梨県', '長野県',
-    '岐阜県', '静岡県', '愛知県', '三重県',
-    '滋賀県', '京都府', '大阪府', '兵庫県', '奈良県', '和歌山県',
-    '鳥取県', '島根県', '岡山県', '広島県', '山口県',
-    '徳島県', '香川県', '愛媛県', '高知県',
-    '福岡県', '佐賀県', '長崎県', '熊本県', '大分県', '宮崎県', '鹿児島県', '沖縄県',
-]
-
-# 合区マッピング
-MERGE_MAP = {
-    '鳥取県': '鳥取県・島根県',
-    '島根県': '鳥取県・島根県',
-    '徳島県': '徳島県・高知県',
-    '高知県': '徳島県・高知県',
-}
-
-
-def normalize_party(name):
-    """全角→半角変換等"""
-    return unicodedata.normalize('NFKC', name).strip()
-
-
-def safe_int(val):
-    """小さな整数値 (当選者数など) を安全にパース"""
-    if val is None:
-        return 0
-    if isinstance(val, (int, float)):
-        return int(val)
-    s = str(val).replace(',', '').replace(' ', '').replace('\u3000', '')
-    m = re.search(r'\d+', s)
-    return int(m.group(0)) if m else 0
-
-
-def parse_count(val):
-    """結合セル '2        1        3' から最後の数値 (計) を取得"""
-    if val is None:
-        return 0
-    if isinstance(val, (int, float)):
-        return int(val)
-    s = str(val).strip()
-    nums = re.findall(r'\d+', s)
-    if nums:
-        return int(nums[-1])
-    return 0
-
 
-def parse_teisuu(val):
-    """定数 '6(1)' → 7 (本来の定数+補欠の合計)"""
-    if val is None:
-        return 0
-    s = str(val).strip()
-    nums = re.findall(r'\d+', s)
-    return sum(int(n) for n in nums) if nums else 0
+from cell_decode import normalize_party, parse_count, parse_teisuu, safe_int, safe_votes
+from dhondt import print_check
+from dimensions import GOUKU_MAP, PREFECTURE_NAMES, SANGIIN_DISTRICTS
+from election_shards import write_shards
+from json_output import write_json
+from paths import input_path, output_path
+from profiling import Profiler
+from workbook_session import WorkbookSession
 
-
-def safe_votes(val):
-    """得票数をパース。
-
-    このExcelでは数値セルのピリオドが千区切りとして使われている:
-    879.676 (float) → 879,676票
-    文字列は通常のカンマ区切り: '14,470,016.925' → 14470017
-    """
-    if val is None:
-        return 0
-    if isinstance(val, str):
-        s = val.replace(',', '').replace(' ', '').replace('\u3000', '')
-        try:
-            return int(round(float(s)))
-        except (ValueError, TypeError):
-            return 0
-    if isinstance(val, int):
-        return val
-    if isinstance(val, float):
-        # ピリオドが千区切りのケース: 879.676 → 879676
-        rounded = round(val, 3)
-        s = f'{rounded:.3f}'
-        return int(s.replace('.', ''))
-    return 0
+EXCEL_FILE = input_path('2025_参議委員選挙_小選挙区_比例区.xlsx')
+OUTPUT = output_path('elections', 'sangiin_2025.json')
 
 
 def get_elected(row, col_start, col_end):
@@ -140,7 +50,7 @@ def extract_senkyoku_data(wb):
 
     # --- 47都道府県の得票データ (Table 28) ---
     pref_votes_47 = {}
-    for i, pref in enumerate(STANDARD_47):
+    for i, pref in enumerate(PREFECTURE_NAMES):
         r = rows28[i]
         pref_votes_47[pref] = {
             '自由民主党': safe_votes(r[7]),
@@ -151,15 +61,15 @@ def extract_senkyoku_data(wb):
 
     # --- 47都道府県の有効投票数 (Table 38) ---
     pref_valid_47 = {}
-    for i, pref in enumerate(STANDARD_47):
+    for i, pref in enumerate(PREFECTURE_NAMES):
         r = rows38[i]
         pref_valid_47[pref] = safe_votes(r[6])
 
     # --- 合区マージ → 45選挙区 ---
     pref_votes_45 = {}
     pref_valid_45 = {}
-    for pref in STANDARD_47:
-        merged = MERGE_MAP.get(pref)
+    for pref in PREFECTURE_NAMES:
+        merged = GOUKU_MAP.get(pref)
         target = merged if merged else pref
         if target not in pref_votes_45:
             pref_votes_45[target] = {}
@@ -170,7 +80,7 @@ def extract_senkyoku_data(wb):
 
     # --- 45選挙区データ構築 ---
     prefectures = []
-    for i, pref_name in enumerate(SANGIIN_PREFECTURES):
+    for i, pref_name in enumerate(SANGIIN_DISTRICTS):
         r21 = rows21[i]
         r22 = rows22[i]
         r23 = rows23[i]
@@ -314,14 +224,16 @@ def extract_hirei_data(wb):
 
 
 def main():
-    print('Loading Excel file...')
-    wb = openpyxl.load_workbook(EXCEL_FILE)
+    prof = Profiler('convert_sangiin_2025')
+    with WorkbookSession() as session:
+        print('Loading Excel file...')
+        wb = session.open(EXCEL_FILE)
 
-    print('Extracting 選挙区 data...')
-    prefectures = extract_senkyoku_data(wb)
+        print('Extracting 選挙区 data...')
+        prefectures = prof.run('extract_senkyoku_data', extract_senkyoku_data, wb)
 
-    print('Extracting 比例代表 data...')
-    hirei_blocks, total_hirei_seats = extract_hirei_data(wb)
+        print('Extracting 比例代表 data...')
+        hirei_blocks, total_hirei_seats = prof.run('extract_hirei_data', extract_hirei_data, wb)
 
     total_senkyoku_seats = sum(p['totalDistricts'] for p in prefectures)
 
@@ -339,8 +251,8 @@ def main():
         },
     }
 
-    with open(OUTPUT, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    write_json(OUTPUT, data)
+    write_shards(data, OUTPUT)
 
     print(f'\nOutput: {OUTPUT}')
     print(f'選挙区: {total_senkyoku_seats} seats, {len(prefectures)} prefectures')
@@ -368,6 +280,7 @@ def main():
             hirei_ok = False
     if hirei_ok:
         print('  比例代表: All blocks OK')
+    print_check(hirei_blocks)
 
     # --- Summary ---
     print('\n--- 選挙区 当選者数 ---')
@@ -385,6 +298,8 @@ def main():
             if p['seats'] > 0:
                 print(f"  {p['party']}: {p['seats']}")
 
+    prof.finish()
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+比例代表の議席配分 (ドント式)
+
+extract_hirei_data() が返すブロック (衆院11ブロック / 参院は全国1ブロック) から
+得票数の行列 [ブロック × 政党] を作り、全ブロックの議席を一括で配分し直して
+集計表から読んだ議席数と突き合わせる。
+
+  vote_matrix(blocks)   → HireiMatrix (得票数・集計表の議席数・定数)
+  allocate(votes, seats)  得票数 [N × 政党] → 議席 [N × 政党] (N 行を一度に配分)
+  check_seats(blocks)   集計表の議席数と配分結果が異なるブロック・政党
+
+allocate() は商 (得票数 ÷ 1, 2, …, 定数) を [N × 政党 × 定数] の配列で作り、
+行ごとに上位 定数 個を取る。行ごとにループしないため、得票数を仮定した
+数千通りの配分 (what-if) もまとめて計算できる。
+
+  caps    政党ごとの議席上限 (名簿登載者数)。上限を超える商は使わない
+  同じ商が定数の境目に並んだ場合 (実際の選挙ではくじ) は列の順で決め、
+  return_ties=True ならその行を返す
+
+使い方:
+  python scripts/dhondt.py                   # elections/*.json の議席を検算
+  python scripts/dhondt.py shugiin_2024 --what-if 10000
+"""
+import argparse
+import json
+import os
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from election_shards import election_files
+
+
+class HireiMatrix(NamedTuple):
+    blocks: list          # ブロック名
+    parties: list         # 政党名 (列)
+    votes: np.ndarray     # [ブロック × 政党] 得票数
+    seats: np.ndarray     # [ブロック × 政党] 集計表の議席数
+    total_seats: np.ndarray  # [ブロック] 定数
+
+
+def vote_matrix(blocks):
+    """HireiBlock のリスト → HireiMatrix (政党の列は初出順)"""
+    parties = {}
+    for b in blocks:
+        for p in b['parties']:
+            parties.setdefault(p['party'], len(parties))
+    votes = np.zeros((len(blocks), len(parties)), dtype=np.int64)
+    seats = np.zeros_like(votes)
+    for i, b in enumerate(blocks):
+        for p in b['parties']:
+            votes[i, parties[p['party']]] = p['votes']
+            seats[i, parties[p['party']]] = p['seats']
+    total_seats = np.array([b['totalSeats'] for b in blocks], dtype=np.int64)
+    return HireiMatrix([b['name'] for b in blocks], list(parties), votes, seats, total_seats)
+
+
+def allocate(votes, seats, caps=None, return_ties=False):
+    """ドント式で議席を配分する
+
+    votes: [政党] または [N × 政党] の得票数
+    seats: 定数 (スカラーまたは [N])
+    caps:  政党ごとの議席上限 ([政党] または [N × 政党])。省略時は上限なし
+
+    戻り値: votes と同じ形の議席数 (return_ties=True なら (議席, [N] の同順位フラグ))
+    """
+    votes = np.asarray(votes, dtype=np.float64)
+    single = votes.ndim == 1
+    votes = np.atleast_2d(votes)
+    n, p = votes.shape
+    seats = np.broadcast_to(np.asarray(seats, dtype=np.int64), (n,))
+    smax = int(seats.max()) if n else 0
+    result = np.zeros((n, p), dtype=np.int64)
+    ties = np.zeros(n, dtype=bool)
+
+    if smax > 0 and p > 0:
+        # 商 [N × 政党 × 定数]。得票のない政党・上限を超える分は -inf
+        quotients = votes[:, :, None] / np.arange(1, smax + 1, dtype=np.float64)
+        usable = votes[:, :, None] > 0
+        if caps is not None:
+            usable = usable & (np.arange(smax) < np.broadcast_to(caps, (n, p))[:, :, None])
+        flat = np.where(usable, quotients, -np.inf).reshape(n, p * smax)
+
+        # 行ごとの順位 (商の降順、同じ商は列の順)。順位 < 定数 が当選
+        order = np.argsort(-flat, axis=1, kind='stable')
+        rank = np.empty_like(order)
+        np.put_along_axis(rank, order, np.arange(p * smax), axis=1)
+        won = (rank < seats[:, None]) & np.isfinite(flat)
+        result = won.reshape(n, p, smax).sum(axis=2)
+
+        if return_ties:
+            ranked = np.take_along_axis(flat, order, axis=1)
+            rows = np.arange(n)
+            last = ranked[rows, np.clip(seats - 1, 0, p * smax - 1)]
+            after = np.where(seats < p * smax, ranked[rows, np.clip(seats, 0, p * smax - 1)], -np.inf)
+            ties = (seats > 0) & np.isfinite(last) & (last == after)
+
+    if single:
+        result, ties = result[0], ties[0]
+    return (result, ties) if return_ties else result
+
+
+def check_seats(blocks, caps=None):
+    """集計表の議席数とドント式の配分が異なる政党を返す
+
+    戻り値: [{block, party, votes, parsed, computed}]。同順位で配分が決まらない
+    ブロックは party = None の行で知らせる。
+    """
+    m = vote_matrix(blocks)
+    computed, ties = allocate(m.votes, m.total_seats, caps=caps, return_ties=True)
+    diffs = []
+    for i, j in zip(*np.nonzero(computed != m.seats)):
+        diffs.append({'block': m.blocks[i], 'party': m.parties[j], 'votes': int(m.votes[i, j]),
+                      'parsed': int(m.seats[i, j]), 'computed': int(computed[i, j])})
+    for i in np.flatnonzero(ties):
+        diffs.append({'block': m.blocks[i], 'party': None, 'votes': None, 'parsed': None, 'computed': None})
+    return diffs
+
+
+def print_check(blocks):
+    """check_seats() の結果を出力 (変換スクリプトの Validation 用)"""
+    diffs = check_seats(blocks)
+    for d in diffs:
+        if d['party'] is None:
+            print(f"  WARN {d['block']}: ドント式の最終議席が同じ商で並ぶ (くじ)")
+        else:
+            # 配分より少ないのは名簿の候補者が足りず他党に移った場合が多い
+            note = ' (名簿不足?)' if d['parsed'] < d['computed'] else ''
+            print(f"  WARN {d['block']} {d['party']}: seats={d['parsed']} != d'Hondt={d['computed']}{note}")
+    if not diffs:
+        print("  比例代表: d'Hondt allocation matches")
+    return not diffs
+
+
+def what_if(votes, seats, samples, spread=0.05, seed=0):
+    """得票数を ±spread の範囲でランダムに増減させた samples 通りの配分 [samples × 政党]"""
+    rng = np.random.default_rng(seed)
+    noise = rng.uniform(1 - spread, 1 + spread, size=(samples, len(votes)))
+    return allocate(noise * np.asarray(votes, dtype=np.float64), seats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="比例代表の議席をドント式で検算")
+    parser.add_argument('elections', nargs='*', help='対象 (例: shugiin_2024、省略時は全件)')
+    parser.add_argument('--what-if', type=int, default=0, metavar='N',
+                        help='各ブロックで得票を ±5%% 動かした N 通りを配分し、議席の幅を出力')
+    args = parser.parse_args()
+
+    ok = True
+    for path in election_files(args.elections):
+        with open(path, encoding='utf-8') as f:
+            blocks = json.load(f)['hirei']['blocks']
+        print(f'{os.path.basename(path)}')
+        ok = print_check(blocks) and ok
+
+        if args.what_if:
+            m = vote_matrix(blocks)
+            start = time.perf_counter()
+            totals = sum(what_if(m.votes[i], m.total_seats[i], args.what_if, seed=i)
+                         for i in range(len(m.blocks)))
+            elapsed = time.perf_counter() - start
+            rate = args.what_if * len(m.blocks) / elapsed
+            print(f'  what-if: {args.what_if} × {len(m.blocks)} blocks in {elapsed * 1000:.1f} ms '
+                  f'({rate:,.0f} allocations/s)')
+            for j in np.argsort(-m.seats.sum(axis=0)):
+                lo, hi = totals[:, j].min(), totals[:, j].max()
+                if hi > 0:
+                    print(f'    {m.parties[j]}: {m.seats[:, j].sum()} ({lo}〜{hi})')
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
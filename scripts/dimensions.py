@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+次元レジストリ (都道府県・ブロック・選挙区・政党)
+
+変換スクリプトごとに持っていた都道府県リスト・合区マッピング・ブロック構成・
+政党名を一か所にまとめ、安定した整数 ID を振る。
+
+  都道府県   ID = JIS X 0401 都道府県コード (1-47)
+  合区       ID = 48 以降 (参院選の選挙区としてのみ使う)
+  ブロック   ID = 1-11 (衆院比例ブロック)、0 = 全国 (参院比例)
+  政党       ID = PARTIES の各行に固定で振る
+
+ID は分割ファイル名 (shou/{prefId}.json 等) や results_db.py・election_cube.py の
+結合キーになるため、既存の ID は変更・再利用しない。行の追加は末尾に新しい ID で行う。
+ラベルと ID の対応は public/data/elections/dimensions.json に一度だけ出力する。
+
+政党名は表記ゆれ (全角英字の「ＮＨＫ党」と「NHK党」、「自民党」と「自由民主党」等) を
+aliases で正規名に寄せ、党名変更・合流は predecessors (前身政党) で系譜をたどれる。
+
+使い方:
+  python scripts/dimensions.py              # dimensions.json を出力
+"""
+import argparse
+import unicodedata
+from functools import lru_cache
+
+from json_output import write_json
+from paths import output_path
+
+FORMAT = 'dimensions/v1'
+
+# ── 都道府県 (JIS コード, 名称, 衆院比例ブロック) ─────────────────
+PREFECTURES = [
+    (1, '北海道', '北海道'),
+    (2, '青森県', '東北'), (3, '岩手県', '東北'), (4, '宮城県', '東北'),
+    (5, '秋田県', '東北'), (6, '山形県', '東北'), (7, '福島県', '東北'),
+    (8, '茨城県', '北関東'), (9, '栃木県', '北関東'), (10, '群馬県', '北関東'),
+    (11, '埼玉県', '北関東'), (12, '千葉県', '南関東'), (13, '東京都', '東京都'),
+    (14, '神奈川県', '南関東'),
+    (15, '新潟県', '北陸信越'), (16, '富山県', '北陸信越'), (17, '石川県', '北陸信越'),
+    (18, '福井県', '北陸信越'), (19, '山梨県', '南関東'), (20, '長野県', '北陸信越'),
+    (21, '岐阜県', '東海'), (22, '静岡県', '東海'), (23, '愛知県', '東海'), (24, '三重県', '東海'),
+    (25, '滋賀県', '近畿'), (26, '京都府', '近畿'), (27, '大阪府', '近畿'),
+    (28, '兵庫県', '近畿'), (29, '奈良県', '近畿'), (30, '和歌山県', '近畿'),
+    (31, '鳥取県', '中国'), (32, '島根県', '中国'), (33, '岡山県', '中国'),
+    (34, '広島県', '中国'), (35, '山口県', '中国'),
+    (36, '徳島県', '四国'), (37, '香川県', '四国'), (38, '愛媛県', '四国'), (39, '高知県', '四国'),
+    (40, '福岡県', '九州'), (41, '佐賀県', '九州'), (42, '長崎県', '九州'), (43, '熊本県', '九州'),
+    (44, '大分県', '九州'), (45, '宮崎県', '九州'), (46, '鹿児島県', '九州'), (47, '沖縄県', '九州'),
+]
+
+# 標準47都道府県 (JIS コード順。総務省の都道府県別集計表の行順と同じ)
+PREFECTURE_NAMES = [name for _, name, _ in PREFECTURES]
+
+# ── 衆院比例ブロック (ID, 名称) ─────────────────────────────────
+BLOCKS = [
+    (1, '北海道'), (2, '東北'), (3, '北関東'), (4, '南関東'), (5, '東京都'), (6, '北陸信越'),
+    (7, '東海'), (8, '近畿'), (9, '中国'), (10, '四国'), (11, '九州'),
+]
+BLOCK_NAMES = [name for _, name in BLOCKS]
+
+# 参院比例代表 (全国区) はブロック ID 0
+NATIONAL_BLOCK = (0, '全国')
+
+# ブロック定数 (2022年の区割り改定後。2024年・2026年の衆院選で共通)
+BLOCK_SEATS = {
+    '北海道': 8, '東北': 12, '北関東': 19, '南関東': 23,
+    '東京都': 19, '北陸信越': 10, '東海': 21, '近畿': 28,
+    '中国': 10, '四国': 6, '九州': 20,
+}
+
+# ブロック → 構成都道府県 (JIS コード順)
+BLOCK_PREFECTURES = {
+    block: [name for _, name, b in PREFECTURES if b == block] for block in BLOCK_NAMES
+}
+
+# ── 参院選 合区 (ID, 選挙区名, 構成都道府県) ─────────────────────
+GOUKU = [
+    (48, '鳥取県・島根県', ('鳥取県', '島根県')),
+    (49, '徳島県・高知県', ('徳島県', '高知県')),
+]
+
+# 合区マッピング (個別県名 → 合区名)
+GOUKU_MAP = {pref: name for _, name, prefs in GOUKU for pref in prefs}
+GOUKU_PREFECTURES = {name: prefs for _, name, prefs in GOUKU}
+
+
+def _sangiin_districts():
+    """45選挙区 (合区適用後。合区は先頭の構成県の位置に置く)"""
+    out = []
+    for pref in PREFECTURE_NAMES:
+        district = GOUKU_MAP.get(pref, pref)
+        if district not in out:
+            out.append(district)
+    return out
+
+
+SANGIIN_DISTRICTS = _sangiin_districts()
+
+# ── 政党 (ID, 正式名, 略称, 表記ゆれ, 前身政党) ──────────────────
+PARTIES = [
+    (1, '自由民主党', '自民', ('自民党',), ()),
+    (2, '立憲民主党', '立民', ('立憲',), ('民主党', '民進党')),
+    (3, '日本維新の会', '維新', ('維新の会',), ('維新の党',)),
+    (4, '公明党', '公明', (), ()),
+    (5, '日本共産党', '共産', ('共産党',), ()),
+    (6, '国民民主党', '国民', (), ('希望の党',)),
+    (7, 'れいわ新選組', 'れいわ', (), ()),
+    (8, '社会民主党', '社民', ('社民党',), ()),
+    (9, '参政党', '参政', (), ()),
+    (10, 'チームみらい', 'みらい', (), ()),
+    (11, '希望の党', '希望', (), ()),
+    (12, '日本保守党', '保守', (), ()),
+    (13, '中道改革連合', '中道', (), ('立憲民主党', '公明党')),
+    (14, '減税日本・ゆうこく連合', '減税', (), ()),
+    (15, 'NHK党', 'NHK', ('NHKから国民を守る党',), ()),
+    (16, 'みんなでつくる党', 'みんつく', (), ('NHK党',)),
+    (17, '幸福実現党', '幸福', (), ()),
+    (18, '日本第一党', '日本第一', (), ()),
+    (19, '維新政党・新風', '新風', (), ()),
+    (20, '新党くにもり', 'くにもり', (), ()),
+    (21, 'ごぼうの党', 'ごぼう', (), ()),
+    (22, '安楽死制度を考える会', '安楽死', (), ()),
+    (23, '都民ファースト', '都ファ', ('都民ファーストの会',), ()),
+    (24, '再生の道', '再生', (), ()),
+    (25, '日本誠真会', '誠真', (), ()),
+    (26, '無所属連合', '無所属連合', (), ()),
+    (27, '日本改革党', '改革', (), ()),
+    (28, '労働の解放をめざす労働者党', '労働者党', (), ()),
+    (29, '民主党', '民主', (), ()),
+    (30, '民進党', '民進', (), ()),
+    (31, '維新の党', '維新の党', (), ()),
+    (90, '諸派', '諸派', (), ()),
+    (97, '本人届出', '本人届出', (), ()),
+    (98, '無所属', '無所属', ('無所属・その他',), ()),
+    (99, 'その他', 'その他', (), ()),
+]
+
+
+def _key(name):
+    # 全角英数 (ＮＨＫ) → 半角、空白除去
+    return unicodedata.normalize('NFKC', name).replace(' ', '')
+
+
+_PREF_IDS = {name: code for code, name, _ in PREFECTURES}
+_PREF_IDS.update({name: gid for gid, name, _ in GOUKU})
+_BLOCK_IDS = {name: bid for bid, name in BLOCKS + [NATIONAL_BLOCK]}
+_BLOCK_IDS['東京'] = _BLOCK_IDS['東京都']  # 2017年のデータは「東京」
+_PARTY_IDS = {}
+for _pid, _name, _short, _aliases, _ in PARTIES:
+    for _label in (_name, *_aliases):
+        _PARTY_IDS[_key(_label)] = _pid
+_PARTY_NAMES = {pid: name for pid, name, _, _, _ in PARTIES}
+
+
+def pref_id(name):
+    """都道府県名 / 合区名 → ID (未登録は None)"""
+    return _PREF_IDS.get(name)
+
+
+def block_id(name):
+    """ブロック名 → ID (未登録は None)"""
+    return _BLOCK_IDS.get(name)
+
+
+def block_of(pref):
+    """都道府県名 → 衆院比例ブロック名"""
+    return next((b for _, name, b in PREFECTURES if name == pref), None)
+
+
+@lru_cache(maxsize=None)
+def party_id(name):
+    """政党名 (表記ゆれ可) → ID (未登録は None)"""
+    return _PARTY_IDS.get(_key(name))
+
+
+def canonical_party(name):
+    """政党名 → 正式名 (未登録はそのまま)"""
+    pid = party_id(name)
+    return _PARTY_NAMES[pid] if pid is not None else name
+
+
+def party_lineage(name):
+    """政党名 → 自身と前身政党の正式名 (新しい順、重複なし)"""
+    preds = {pname: pre for _, pname, _, _, pre in PARTIES}
+    out, queue = [], [canonical_party(name)]
+    while queue:
+        current = queue.pop(0)
+        if current in out:
+            continue
+        out.append(current)
+        queue.extend(preds.get(current, ()))
+    return out
+
+
+def build_dimensions():
+    """dimensions.json の内容"""
+    return {
+        'format': FORMAT,
+        'prefectures': [
+            {'id': code, 'name': name, 'blockId': block_id(block)}
+            for code, name, block in PREFECTURES
+        ],
+        'sangiinDistricts': [
+            {'id': pref_id(d), 'name': d, 'prefIds': [pref_id(p) for p in GOUKU_PREFECTURES.get(d, (d,))]}
+            for d in SANGIIN_DISTRICTS
+        ],
+        'blocks': [
+            {'id': bid, 'name': name, 'prefIds': [pref_id(p) for p in BLOCK_PREFECTURES.get(name, [])]}
+            for bid, name in [NATIONAL_BLOCK] + BLOCKS
+        ],
+        'parties': [
+            {
+                'id': pid,
+                'name': name,
+                'shortName': short,
+                'aliases': list(aliases),
+                'predecessorIds': [party_id(p) for p in preds],
+            }
+            for pid, name, short, aliases, preds in PARTIES
+        ],
+    }
+
+
+def write_dimensions(path=None):
+    # build_all.py が --output-root で環境変数を設定した後に呼ぶため、パスは呼び出し時に解決する
+    path = path or output_path('elections', 'dimensions.json')
+    write_json(path, build_dimensions())
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='次元レジストリ (dimensions.json) の出力')
+    parser.parse_args()
+
+    path = write_dimensions()
+    print(f'Output: {path}')
+    print(f'  {len(PREFECTURES)} prefectures, {len(SANGIIN_DISTRICTS)} sangiin districts, '
+          f'{len(BLOCKS)} blocks, {len(PARTIES)} parties')
+
+
+if __name__ == '__main__':
+    main()
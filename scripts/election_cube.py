@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+政党 × 地域 × 選挙 の分析用キューブ (.build/cube/)
+
+results_db.py と同じ読み込み (collect) の結果を、密な NumPy 配列にして .npy で
+保存する。分析のたびに shugiin_*.json / sangiin_*.json / tokyo-*.json から
+同じ配列を作り直さずに済むようにするためのもの。
+
+  votes.npy   [種別 × 政党 × 地域 × 選挙] 得票 (float64、データなしは NaN)
+  seats.npy   同 議席
+  rates.npy   同 得票率 (%)
+  rollup.npy  [種別 × 地域 × 選挙] 下位の地域の合計で埋めたセル (bool)
+  cube.json   軸のラベル (種別、政党 ID・名称、地域の level・code・名称・親、選挙)
+
+集計の階層 投票区 → 区市町村 → 小選挙区 → 都道府県 → ブロック → 全国 も同じ
+処理で埋める。区市町村の小選挙区は選挙ごと (小選挙区の区市町村別データの
+district 列)、複数の選挙区にまたがる区市町村は選挙区の部分 (area) を選挙区に
+合計する。データがない (種別, 地域, 選挙) のうち、子の地域がすべてそろって
+いるものだけを子の合計で埋め、元のデータがある地域はそのまま使う (合区の県は
+全国の直下なので、参院選の中国・四国ブロックは埋まらない)。
+
+読み込みは np.load(mmap_mode='r') なので、全選挙を開いてもスライスに触れる
+までメモリをほとんど使わない。
+
+使い方:
+  python scripts/election_cube.py build
+  python scripts/election_cube.py show --tier hirei --party 自民,立憲 --level block --election shugiin_2024
+  python scripts/election_cube.py show --measure rates --party 自民 --geography 千代田区,港区
+
+  from election_cube import ElectionCube
+  cube = ElectionCube.load()
+  s = cube.slice('votes', tier='hirei', party='自由民主党', level='municipality')
+  s.values            # [政党 × 地域 × 選挙] (memmap から読んだ部分だけ)
+  cube.value('seats', tier='shou', party=1, geography='東京都', election='shugiin_2026')
+"""
+import argparse
+import json
+import os
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from dimensions import PARTIES, block_id, party_id, pref_id
+from paths import REPO_ROOT
+from results_db import collect
+
+CUBE_DIR = os.path.join(REPO_ROOT, '.build', 'cube')
+FORMAT = 'election-cube/v1'
+
+TIERS = ['hirei', 'shou', 'local']
+MEASURES = ['votes', 'seats', 'rates']
+
+# 集計の深さ (子 → 親 の順に埋める)。gouku は全国の直下
+LEVEL_DEPTH = {
+    'nation': 0, 'block': 1, 'gouku': 1, 'prefecture': 2, 'district': 3,
+    'municipality': 4, 'area': 4, 'polling': 5,
+}
+
+_PARTY_SHORT = {short: pid for pid, _, short, *_ in PARTIES}
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 構築
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def parent_matrix(db, geos, elections):
+    """[地域 × 選挙] → 集計先の地域のインデックス (-1 = なし)
+
+    区市町村は選挙ごとの小選挙区、選挙区にまたがる区市町村は area が選挙区に
+    集計されるので区市町村自体は集計しない (二重計上になる)。
+    """
+    index = {gid: i for i, gid in enumerate(geos)}
+    split = set(db.area_parents.values())
+    parents = np.full((len(geos), len(elections)), -1, dtype=np.int64)
+    for (level, _), (gid, _, parent) in db.geos.items():
+        if level == 'municipality' and gid in split:
+            continue
+        if parent is not None:
+            parents[index[gid], :] = index[parent]
+    for (e, gid), district in db.memberships.items():
+        parents[index[gid], elections.index(e)] = index[district]
+    return parents
+
+
+def rollup(votes, seats, direct, parents, depth):
+    """子の合計で親を埋める (in place)。埋めたセル [種別 × 地域 × 選挙] を返す
+
+    深い level から順に、子 → 親 の対応行列 [選挙 × 子 × 親] との積で合計する。
+    """
+    n_tiers, n_parties, n_geos, n_elections = votes.shape
+    filled = np.zeros((n_tiers, n_geos, n_elections), dtype=bool)
+    has = direct.copy()
+    for d in range(max(depth), 0, -1):
+        children = np.flatnonzero(depth == d)
+        if children.size == 0:
+            continue
+        member = np.zeros((n_elections, children.size, n_geos))
+        e_idx, c_idx = np.nonzero(parents[children].T >= 0)
+        member[e_idx, c_idx, parents[children][c_idx, e_idx]] = 1
+
+        sub_votes = votes[:, :, children, :]
+        present = ~np.isnan(sub_votes)
+        # [種別 × 政党 × 子 × 選挙] × [選挙 × 子 × 親] → [種別 × 政党 × 親 × 選挙]
+        total_votes = np.einsum('tpce,ecg->tpge', np.nan_to_num(sub_votes), member)
+        total_seats = np.einsum('tpce,ecg->tpge', np.nan_to_num(seats[:, :, children, :]), member)
+        counted = np.einsum('tpce,ecg->tpge', present.astype(float), member) > 0
+        # 子がすべてそろっている親だけ埋める (一部の区市町村しかない年の部分和にしない)
+        n_children = member.sum(axis=1).T  # [親 × 選挙]
+        n_with_data = np.einsum('tce,ecg->tge', has[:, children, :].astype(float), member)
+
+        fill = (n_children > 0) & (n_with_data == n_children) & ~has  # [種別 × 親 × 選挙]
+        mask = fill[:, None, :, :] & counted
+        votes[mask] = total_votes[mask]
+        seats[mask] = total_seats[mask]
+        filled |= fill
+        has |= fill
+    return filled
+
+
+def build_cube(out_dir=CUBE_DIR, db=None):
+    """キューブを書き出し、cube.json の内容を返す (db は results_db.collect() の結果)"""
+    db = db or collect()
+    elections = [eid for eid, *_ in sorted(db.elections.values())]
+    geos = [gid for gid, *_ in sorted(db.geos.values())]
+    parties = sorted(db.parties)
+    e_index = {e: i for i, e in enumerate(elections)}
+    g_index = {g: i for i, g in enumerate(geos)}
+    p_index = {p: i for i, p in enumerate(parties)}
+    t_index = {t: i for i, t in enumerate(TIERS)}
+
+    shape = (len(TIERS), len(parties), len(geos), len(elections))
+    votes = np.full(shape, np.nan)
+    seats = np.full(shape, np.nan)
+    rates = np.full(shape, np.nan)
+    for (e, g, p, tier), (v, rate, s, _) in db.results.items():
+        cell = (t_index[tier], p_index[p], g_index[g], e_index[e])
+        if v is not None:
+            votes[cell] = v
+        if s is not None:
+            seats[cell] = s
+        if rate is not None:
+            rates[cell] = rate
+    direct = ~(np.isnan(votes) & np.isnan(rates)).all(axis=1)
+
+    levels = {gid: level for (level, _), (gid, _, _) in db.geos.items()}
+    depth = np.array([LEVEL_DEPTH[levels[g]] for g in geos])
+    filled = rollup(votes, seats, direct, parent_matrix(db, geos, elections), depth)
+    # 埋めた地域の得票率は政党別得票の合計に対する割合
+    with np.errstate(invalid='ignore', divide='ignore'):
+        share = votes / np.nansum(votes, axis=1, keepdims=True) * 100
+    fill_cells = np.broadcast_to(filled[:, None, :, :], shape) & ~np.isnan(votes)
+    rates[fill_cells] = np.round(share[fill_cells], 2)
+
+    by_gid = {gid: (level, code, name, parent) for (level, code), (gid, name, parent) in db.geos.items()}
+    labels = {
+        'format': FORMAT,
+        'built': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'shape': list(shape),
+        'tiers': TIERS,
+        'parties': [{'id': p, 'name': db.parties[p][1], 'shortName': db.parties[p][2]} for p in parties],
+        'geographies': [
+            {'level': by_gid[g][0], 'code': by_gid[g][1], 'name': by_gid[g][2],
+             'parent': g_index.get(by_gid[g][3], -1) if by_gid[g][3] is not None else -1}
+            for g in geos
+        ],
+        'elections': [
+            {'name': name, 'type': kind, 'year': year, 'date': date}
+            for name, (_, kind, year, date) in sorted(db.elections.items(), key=lambda kv: kv[1][0])
+        ],
+    }
+
+    os.makedirs(out_dir, exist_ok=True)
+    for name, array in (('votes', votes), ('seats', seats), ('rates', rates), ('rollup', filled)):
+        tmp = os.path.join(out_dir, f'{name}.tmp.npy')
+        np.save(tmp, array)
+        os.replace(tmp, os.path.join(out_dir, f'{name}.npy'))
+    with open(os.path.join(out_dir, 'cube.json'), 'w', encoding='utf-8') as f:
+        json.dump(labels, f, ensure_ascii=False, indent=1)
+    return labels
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 読み込み・スライス
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class CubeSlice(NamedTuple):
+    values: np.ndarray  # [政党 × 地域 × 選挙]
+    parties: list
+    geographies: list
+    elections: list
+
+
+class ElectionCube:
+    """memmap した .npy とラベル。政党・地域・選挙は名称・ID・インデックスで指定できる"""
+
+    def __init__(self, directory, labels, arrays):
+        self.directory = directory
+        self.labels = labels
+        self.arrays = arrays
+        self.parties = labels['parties']
+        self.geographies = labels['geographies']
+        self.elections = labels['elections']
+        self._party = {p['id']: i for i, p in enumerate(self.parties)}
+        self._party_name = {p['name']: i for i, p in enumerate(self.parties)}
+        self._geo = {(g['level'], g['code']): i for i, g in enumerate(self.geographies)}
+        self._election = {e['name']: i for i, e in enumerate(self.elections)}
+
+    @classmethod
+    def load(cls, directory=CUBE_DIR):
+        with open(os.path.join(directory, 'cube.json'), encoding='utf-8') as f:
+            labels = json.load(f)
+        arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+                  for name in MEASURES + ['rollup']}
+        return cls(directory, labels, arrays)
+
+    # ── ラベル → インデックス ──
+    def party_index(self, label):
+        """政党 ID・正式名・略称・表記ゆれ → 政党軸のインデックス"""
+        if isinstance(label, (int, np.integer)):
+            pid = int(label)
+        elif label in self._party_name:
+            return self._party_name[label]
+        else:
+            pid = _PARTY_SHORT.get(label) or party_id(label)
+        if pid not in self._party:
+            raise KeyError(f'unknown party: {label}')
+        return self._party[pid]
+
+    def geo_index(self, label):
+        """地域 → 地域軸のインデックス
+
+        (level, code)、'全国'、都道府県・合区名、ブロック名、'東京都1区'、
+        区市町村名 (同名があれば先に登録された地域)、整数は地域軸のインデックス。
+        """
+        if isinstance(label, (int, np.integer)):
+            return int(label)
+        if isinstance(label, tuple):
+            return self._geo[(label[0], str(label[1]))]
+        if label == '全国':
+            return self._geo[('nation', '0')]
+        pid = pref_id(label)
+        if pid is not None:
+            return self._geo.get(('prefecture', str(pid)), self._geo.get(('gouku', str(pid))))
+        bid = block_id(label)
+        if bid is not None and ('block', str(bid)) in self._geo:
+            return self._geo[('block', str(bid))]
+        for i, g in enumerate(self.geographies):
+            if g['name'] == label:
+                return i
+        raise KeyError(f'unknown geography: {label}')
+
+    def election_index(self, label):
+        if isinstance(label, (int, np.integer)):
+            return int(label)
+        if label not in self._election:
+            raise KeyError(f'unknown election: {label}')
+        return self._election[label]
+
+    def level(self, name):
+        """level の地域のインデックス"""
+        return [i for i, g in enumerate(self.geographies) if g['level'] == name]
+
+    def children(self, geography):
+        i = self.geo_index(geography)
+        return [j for j, g in enumerate(self.geographies) if g['parent'] == i]
+
+    # ── スライス ──
+    @staticmethod
+    def _many(value, lookup, n):
+        if value is None:
+            return list(range(n))
+        values = value if isinstance(value, (list, tuple, range, np.ndarray)) else [value]
+        return [lookup(v) for v in values]
+
+    def slice(self, measure='votes', tier='hirei', party=None, geography=None, election=None, level=None):
+        """[政党 × 地域 × 選挙] の部分配列。省略した軸はすべて、level で地域を絞り込む"""
+        if measure not in MEASURES:
+            raise KeyError(f'unknown measure: {measure}')
+        if isinstance(geography, tuple):
+            geography = [geography]
+        p = self._many(party, self.party_index, len(self.parties))
+        g = self._many(geography, self.geo_index, len(self.geographies))
+        if level is not None:
+            at_level = set(self.level(level))
+            g = [i for i in g if i in at_level]
+        e = self._many(election, self.election_index, len(self.elections))
+        array = self.arrays[measure][TIERS.index(tier)]
+        values = np.asarray(array[np.ix_(p, g, e)])
+        return CubeSlice(values, [self.parties[i] for i in p], [self.geographies[i] for i in g],
+                         [self.elections[i] for i in e])
+
+    def value(self, measure, tier, party, geography, election):
+        """1セルの値 (データなしは NaN)"""
+        return float(self.arrays[measure][TIERS.index(tier), self.party_index(party),
+                                          self.geo_index(geography), self.election_index(election)])
+
+    def is_rollup(self, tier, geography, election):
+        return bool(self.arrays['rollup'][TIERS.index(tier), self.geo_index(geography), self.election_index(election)])
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# CLI
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def _split(value):
+    if value is None:
+        return None
+    return [int(v) if v.isdigit() else v for v in value.split(',') if v]
+
+
+def print_slice(s, measure):
+    for p_i, party in enumerate(s.parties):
+        print(f"\n{party['name']} ({measure})")
+        print('  ' + ' ' * 24 + ''.join(f"{e['name']:>16}" for e in s.elections))
+        for g_i, geo in enumerate(s.geographies):
+            row = s.values[p_i, g_i]
+            if np.isnan(row).all():
+                continue
+            cells = ''.join(f'{"-" if np.isnan(v) else f"{v:,.2f}" if measure == "rates" else f"{v:,.0f}":>16}'
+                            for v in row)
+            print(f"  {geo['level']:<12} {geo['name']:<10}" + cells)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='政党 × 地域 × 選挙 の分析用キューブ')
+    parser.add_argument('--dir', default=CUBE_DIR, help=f'出力先 (既定: {os.path.relpath(CUBE_DIR, REPO_ROOT)})')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help='出力ルートの JSON から作り直す')
+    show = sub.add_parser('show', help='スライスを表示')
+    show.add_argument('--measure', choices=MEASURES, default='votes')
+    show.add_argument('--tier', choices=TIERS, default='hirei')
+    show.add_argument('--party', help='政党 (カンマ区切り、名称・略称・ID)')
+    show.add_argument('--geography', help='地域 (カンマ区切り)')
+    show.add_argument('--level', choices=sorted(LEVEL_DEPTH, key=LEVEL_DEPTH.get))
+    show.add_argument('--election', help='選挙 (カンマ区切り、shugiin_2024 等)')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        labels = build_cube(args.dir)
+        print(f'Output: {args.dir}')
+        print(f"  shape {' × '.join(map(str, labels['shape']))} (種別 × 政党 × 地域 × 選挙), "
+              f'{time.perf_counter() - start:.2f} s')
+        return
+
+    cube = ElectionCube.load(args.dir)
+    s = cube.slice(args.measure, args.tier, _split(args.party), _split(args.geography),
+                   _split(args.election), args.level)
+    print_slice(s, args.measure)
+
+
+if __name__ == '__main__':
+    main()
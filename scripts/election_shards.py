@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+全国選挙データの分割出力 (都道府県別・ブロック別シャード + インデックス)
+
+全国ページは elections/{type}_{year}.json をまるごと読み込むが、都道府県・
+比例ブロックを選んだときに必要なのはその一部だけ。変換スクリプトは通常の
+JSON に加えて、次の分割ファイルを elections/{type}_{year}/ に書き出す。
+
+  index.json         概要。全国の政党別合計、都道府県ごとの名称・選挙区数・政党別の
+                     得票・得票率・議席 (partyResults、全体ファイルと同じ。小選挙区ビューは
+                     これだけで描ける)、ブロックごとの名称・定数・政党別議席数 (議席のある
+                     政党のみ) と shard。ブロックの政党別得票・名簿はシャードにある
+  shou/{prefId}.json  都道府県 (参院は合区を含む選挙区) ごとの集計 + 選挙区別候補者
+                     (選挙区別の候補者を渡したときだけ、候補者のいる都道府県の分を書く。
+                      変換スクリプトは候補者別得票数のファイル (CANDIDATE_FILE) を
+                      shou_candidates.py でストリームして渡す。ファイルがなければ作られない)
+  hirei/{blockId}.json  比例ブロックごとの政党別結果 + 名簿候補者
+                     (名簿を渡すと hirei_revival.py で惜敗率・当落を計算して埋める)
+
+ファイル名の ID は dimensions.py の prefId / blockId (dimensions.json と同じ)。
+index.json の各行の shard に相対パスが入る。書き直すのは shou/ と hirei/ の
+シャードと index.json だけで、同じディレクトリの swing.json 等には触れない。
+
+使い方 (出力済みの JSON から作り直す場合):
+  python scripts/election_shards.py                     # elections/*.json すべて
+  python scripts/election_shards.py shugiin_2024
+"""
+import argparse
+import glob
+import itertools
+import json
+import os
+
+from dimensions import block_id, canonical_party, party_id, pref_id
+from hirei_revival import DistrictResults, compute_revival
+from json_output import write_json
+from paths import output_path
+
+FORMAT = 'election-shards/v2'
+
+# 分割ファイルを置くサブディレクトリ
+SHARD_DIRS = ('shou', 'hirei')
+
+
+def shard_dir(path):
+    """elections/shugiin_2024.json → elections/shugiin_2024/"""
+    return os.path.splitext(path)[0]
+
+
+def national_totals(data):
+    """政党別の全国合計 (比例得票・議席、小選挙区得票・議席)"""
+    totals = {}
+
+    def row(name):
+        name = canonical_party(name)
+        if name not in totals:
+            totals[name] = {
+                'party': name, 'partyId': party_id(name),
+                'hireiVotes': 0, 'hireiSeats': 0, 'shouVotes': 0, 'shouSeats': 0,
+            }
+        return totals[name]
+
+    for block in data['hirei']['blocks']:
+        for p in block['parties']:
+            r = row(p['party'])
+            r['hireiVotes'] += p['votes']
+            r['hireiSeats'] += p['seats']
+    for pref in data['shou']['prefectures']:
+        for p in pref['partyResults']:
+            r = row(p['party'])
+            r['shouVotes'] += p['totalVotes']
+            r['shouSeats'] += p['seats']
+
+    rows = list(totals.values())
+    for r in rows:
+        r['seats'] = r['hireiSeats'] + r['shouSeats']
+    rows.sort(key=lambda r: (-r['seats'], -r['hireiVotes'], -r['shouVotes']))
+    return rows
+
+
+def party_seats(rows):
+    """政党別議席数 (議席のある政党のみ、元の並び順)"""
+    return {r['party']: r['seats'] for r in rows if r['seats'] > 0}
+
+
+def build_index(data, district_counts=None):
+    """index.json の内容 (各行の shard に分割ファイルの相対パス。都道府県は候補者のシャードがあるときだけ)"""
+    district_counts = district_counts or {}
+    prefectures = []
+    for pref in data['shou']['prefectures']:
+        pid = pref_id(pref['prefecture'])
+        entry = {
+            'prefecture': pref['prefecture'],
+            'totalDistricts': pref['totalDistricts'],
+            'partyResults': pref['partyResults'],
+        }
+        if district_counts.get(pid):
+            entry.update(shard=f'shou/{pid}.json', districtCount=district_counts[pid])
+        prefectures.append(entry)
+    blocks = [
+        {
+            'name': block['name'],
+            'totalSeats': block['totalSeats'],
+            'totalVotes': block['totalVotes'],
+            'seats': party_seats(block['parties']),
+            'shard': f"hirei/{block_id(block['name'])}.json",
+        }
+        for block in data['hirei']['blocks']
+    ]
+    return {
+        'format': FORMAT,
+        **{k: v for k, v in data.items() if k not in ('hirei', 'shou')},
+        'national': national_totals(data),
+        'hirei': {'totalSeats': data['hirei']['totalSeats'], 'blocks': blocks},
+        'shou': {'totalSeats': data['shou']['totalSeats'], 'prefectures': prefectures},
+    }
+
+
+def remove_stale(root, keep):
+    """shou/ と hirei/ のうち keep (今回書いたシャードのパス) にないファイルを消す
+
+    名称変更した都道府県などのシャードを残さないため。.gz / .br も一緒に消す。
+    """
+    removed = []
+    for sub in SHARD_DIRS:
+        directory = os.path.join(root, sub)
+        if not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if path.removesuffix('.gz').removesuffix('.br') not in keep:
+                os.remove(path)
+                removed.append(path)
+    return removed
+
+
+def write_shards(data, path, districts=None, hirei_lists=None):
+    """path (elections/{type}_{year}.json) に対応する分割ファイルを書き出す
+
+    districts: ShouDistrict のイテラブル (都道府県順)。省略時は data['shou']['districts']。
+    ジェネレータを渡せば、同時に保持する候補者は1都道府県分だけになる。
+    hirei_lists: 比例名簿の行のイテラブル (hirei_revival.stream_hirei_lists)。
+    名簿があればブロックのシャードに候補者と当落を入れ、照合結果を stats['revival'] に返す。
+    """
+    if districts is None:
+        districts = data['shou']['districts']
+    results = DistrictResults()
+    if hirei_lists is not None:
+        districts = results.tap(districts)
+    root = shard_dir(path)
+    for sub in SHARD_DIRS:
+        os.makedirs(os.path.join(root, sub), exist_ok=True)
+
+    summaries = {pref_id(pref['prefecture']): pref for pref in data['shou']['prefectures']}
+    written = {}
+    stats = {'root': root, 'shards': 0, 'districts': 0, 'candidates': 0}
+
+    def write_pref(pid, pref, pref_districts):
+        shard = os.path.join(root, 'shou', f'{pid}.json')
+        if pid in written:
+            # 都道府県順でない入力 (同じ都道府県が離れて出てくる) は追記する
+            with open(shard, encoding='utf-8') as f:
+                pref_districts = json.load(f)['districts'] + pref_districts
+        else:
+            stats['shards'] += 1
+        written[pid] = len(pref_districts)
+        write_json(shard, {**summaries.get(pid, {'prefecture': pref}), 'districts': pref_districts})
+
+    for pref, group in itertools.groupby(districts, key=lambda d: d['prefecture']):
+        group = list(group)
+        stats['districts'] += len(group)
+        stats['candidates'] += sum(len(d['candidates']) for d in group)
+        write_pref(pref_id(pref), pref, group)
+
+    blocks = data['hirei']['blocks']
+    entries = list(hirei_lists) if hirei_lists is not None else []
+    if entries:
+        blocks, stats['revival'] = compute_revival(blocks, entries, results)
+    shards = {os.path.join(root, 'shou', f'{pid}.json') for pid in written}
+    for block in blocks:
+        shard = os.path.join(root, 'hirei', f"{block_id(block['name'])}.json")
+        write_json(shard, block)
+        shards.add(shard)
+        stats['shards'] += 1
+    remove_stale(root, shards)
+
+    # index.json は最後に置き換える (write_json は一時ファイル → rename)
+    write_json(os.path.join(root, 'index.json'), build_index(data, written))
+    return stats
+
+
+def election_files(names=None):
+    files = sorted(glob.glob(output_path('elections', 's[ha]*giin_*.json')))
+    if names:
+        files = [f for f in files if os.path.splitext(os.path.basename(f))[0] in names]
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description='全国選挙データを都道府県別・ブロック別に分割')
+    parser.add_argument('elections', nargs='*', help='対象 (例: shugiin_2024、省略時は全件)')
+    args = parser.parse_args()
+
+    for path in election_files(args.elections):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        stats = write_shards(data, path)
+        print(f"  {os.path.basename(path)} → {os.path.relpath(stats['root'], output_path())}/ "
+              f"({stats['shards']} shards, {stats['districts']} districts)")
+
+
+if __name__ == '__main__':
+    main()
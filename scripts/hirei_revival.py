@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+比例代表 名簿の当落判定 (惜敗率・比例復活)
+
+衆院の比例名簿には小選挙区との重複立候補者が同じ順位で並ぶ。同順位の
+重複立候補者は惜敗率 (得票数 ÷ その選挙区の当選者の得票数) の高い順に
+当選する。小選挙区の当選者は名簿から除かれ、得票が有効投票総数の 1/10
+未満 (供託金没収点) の重複立候補者は比例で当選できない。
+
+  DistrictResults   小選挙区の候補者を列ごとの配列に集める (ストリームを通す
+                    tap() で shou_candidates.py の ShouDistrict ストリームに挟む)
+  stream_hirei_lists  比例名簿の表 (見出しで検出) → 名簿の行を1件ずつ
+  compute_revival   名簿と小選挙区結果を結合し、惜敗率・当落を NumPy で一括計算
+                    政党・ブロックごとの議席数 (総務省の集計表) と突き合わせる
+
+名簿の表は列の位置ではなく見出しで検出する (先頭 HEADER_SCAN 行に
+「名簿順位」「候補者名」を含む行があるシート)。
+
+  ブロック  列があればその値、なければブロック名だけの行を見出しとして扱う
+  党派     列があればその値 (空欄は前の行)、なければ政党名だけの行を見出しとして扱う
+  重複     '東京都1区' 等の選挙区または '○' 等の記号があれば重複立候補
+  当落     あれば総務省の当落 ('当' / '比当' 等) として計算結果と照合する
+
+出力の HireiCandidate.result は '当' (名簿順位による当選)、'比当' (重複立候補者の
+比例復活)、'落'。小選挙区の当選者は名簿の候補者に含めない (ShouDistrict 側にある)。
+
+小選挙区の候補者は変換スクリプトが候補者別得票数のファイル (CANDIDATE_FILE) から
+shou_candidates.py で読む。このファイルがなければ当選者を名簿から除けないため、
+名簿の当落は計算せず、ブロックのシャードの candidates は空のままになる。
+"""
+import numpy as np
+
+from cell_decode import clean_name, clean_party, safe_int
+from dimensions import BLOCK_NAMES, block_id, party_id
+from label_index import PatternMatcher, normalize_label
+
+# 供託金没収点: 有効投票総数に対する割合 (これ未満の重複立候補者は比例で当選しない)
+FORFEIT_RATE = 0.1
+SEKIHAIRITSU_DIGITS = 3
+HEADER_SCAN = 10
+# dimensions に未登録の政党の仮 ID (実行ごとに名前ごとに振る)。政党・ブロックの
+# グループ番号は ブロック ID × GROUP_STRIDE + 政党 ID
+SURROGATE_PARTY_BASE = 1000
+GROUP_STRIDE = 1_000_000
+
+LIST_LABELS = {
+    'ブロック': 'block',
+    '党派': 'party',
+    '政党': 'party',
+    '順位': 'rank',
+    '候補者名': 'name',
+    '氏名': 'name',
+    '年齢': 'age',
+    '重複': 'dual',
+    '選挙区': 'dual',
+    '当落': 'result',
+}
+LIST_MATCHER = PatternMatcher(LIST_LABELS)
+LIST_REQUIRED = ('rank', 'name')
+
+_NO_MARK = {'', '-', '−', '―', '‐', '×'}
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 入力
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def candidate_key(name, party):
+    """名簿と小選挙区の候補者を結び付けるキー (氏名 + 政党 ID、未登録の政党は政党名)"""
+    pid = party_id(party)
+    return f'{normalize_label(name)}|{pid if pid is not None else normalize_label(party)}'
+
+
+class DistrictResults:
+    """小選挙区の候補者を列ごとのリストに集め、arrays() で NumPy 配列にする
+
+    候補者は選挙区ごとに連続して並ぶ (offsets が各選挙区の先頭位置)。
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.votes = []
+        self.won = []
+        self.dual = []
+        self.offsets = []
+
+    def add(self, district):
+        self.offsets.append(len(self.votes))
+        for c in district['candidates']:
+            self.keys.append(candidate_key(c['name'], c['party']))
+            self.votes.append(c['votes'])
+            self.won.append(c['result'] == '当')
+            self.dual.append(bool(c.get('isDualCandidate')))
+
+    def tap(self, districts):
+        """districts をそのまま返しながら集める (ストリームの途中に挟む)"""
+        for district in districts:
+            if district['candidates']:
+                self.add(district)
+            yield district
+
+    def __len__(self):
+        return len(self.votes)
+
+    def arrays(self):
+        """候補者ごとの配列: key, votes, winnerVotes, sekihairitsu, won, dual, forfeited"""
+        votes = np.asarray(self.votes, dtype=np.float64)
+        starts = np.asarray(self.offsets, dtype=np.intp)
+        if votes.size == 0:
+            empty = np.zeros(0)
+            return {'key': np.asarray([], dtype=str), 'votes': empty, 'winnerVotes': empty,
+                    'sekihairitsu': empty, 'won': empty.astype(bool), 'dual': empty.astype(bool),
+                    'forfeited': empty.astype(bool)}
+        counts = np.diff(np.append(starts, votes.size))
+        winner = np.repeat(np.maximum.reduceat(votes, starts), counts)
+        valid = np.repeat(np.add.reduceat(votes, starts), counts)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            seki = np.where(winner > 0, votes / winner * 100, 0.0)
+        return {
+            'key': np.asarray(self.keys, dtype=str),
+            'votes': votes,
+            'winnerVotes': winner,
+            'sekihairitsu': np.round(seki, SEKIHAIRITSU_DIGITS),
+            'won': np.asarray(self.won, dtype=bool),
+            'dual': np.asarray(self.dual, dtype=bool),
+            'forfeited': votes < valid * FORFEIT_RATE,
+        }
+
+
+def header_columns(row):
+    """名簿の見出し行なら {役割: 列}、そうでなければ None"""
+    columns = {}
+    for c, val in enumerate(row):
+        label = LIST_MATCHER.best(val) if isinstance(val, str) else None
+        if label is not None:
+            columns.setdefault(LIST_LABELS[label], c)
+    return columns if all(r in columns for r in LIST_REQUIRED) else None
+
+
+def find_header(rows):
+    """先頭 HEADER_SCAN 行から見出し行を探す。見つかれば {役割: 列}、rows は次の行から続く"""
+    for i, row in enumerate(rows):
+        columns = header_columns(row)
+        if columns is not None or i + 1 >= HEADER_SCAN:
+            return columns
+    return None
+
+
+def _cell(row, columns, role):
+    c = columns.get(role)
+    return row[c] if c is not None and c < len(row) else None
+
+
+def iter_sheet_list(rows):
+    """名簿の表の行 → 名簿の行 {block, party, rank, name, age, dual, result} を1件ずつ"""
+    rows = iter(rows)
+    columns = find_header(rows)
+    if columns is None:
+        return
+
+    block, party = None, None
+    for row in rows:
+        first = normalize_label(next((v for v in row if v not in (None, '')), ''))
+        name = clean_name(_cell(row, columns, 'name'))
+        rank = safe_int(_cell(row, columns, 'rank'))
+        # ブロック名・政党名だけの行は見出し
+        if not name and first in BLOCK_NAMES:
+            block = first
+            continue
+        if not name and first and party_id(first) is not None:
+            party = clean_party(first)
+            continue
+        row_block = normalize_label(_cell(row, columns, 'block'))
+        if row_block:
+            block = row_block
+        row_party = _cell(row, columns, 'party')
+        if row_party not in (None, ''):
+            party = clean_party(row_party)
+        if not name or rank <= 0 or block is None or party is None:
+            continue
+        result = normalize_label(_cell(row, columns, 'result'))
+        yield {
+            'block': block,
+            'party': party,
+            'rank': rank,
+            'name': name,
+            'age': safe_int(_cell(row, columns, 'age')),
+            'dual': normalize_label(_cell(row, columns, 'dual')) not in _NO_MARK,
+            'result': result or None,
+        }
+
+
+def stream_hirei_lists(wb):
+    """ワークブック内の全名簿表から名簿の行を1件ずつ返す"""
+    for name in wb.sheetnames:
+        yield from iter_sheet_list(wb.stream_rows(name))
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 当落計算
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def _join(keys, district_keys):
+    """名簿のキー → 小選挙区候補者の位置 (見つからなければ -1)"""
+    if district_keys.size == 0:
+        return np.full(keys.size, -1, dtype=np.intp)
+    order = np.argsort(district_keys, kind='stable')
+    sorted_keys = district_keys[order]
+    pos = np.clip(np.searchsorted(sorted_keys, keys), 0, sorted_keys.size - 1)
+    return np.where(sorted_keys[pos] == keys, order[pos], -1)
+
+
+class PartyIds:
+    """政党名 → ID。未登録の政党は SURROGATE_PARTY_BASE から名前ごとに仮 ID を振る
+
+    未登録の政党どうしが同じグループにまとまらないようにするため (1回の計算の中だけで使う)。
+    """
+
+    def __init__(self):
+        self.surrogates = {}
+
+    def __call__(self, name):
+        pid = party_id(name)
+        if pid is None:
+            pid = self.surrogates.setdefault(normalize_label(name), SURROGATE_PARTY_BASE + len(self.surrogates))
+        return pid
+
+
+def _group(block, party, party_ids):
+    return (block_id(block) or 0) * GROUP_STRIDE + party_ids(party)
+
+
+def compute_revival(blocks, entries, results):
+    """名簿の当落を計算して blocks の各政党の candidates を埋める
+
+    blocks:  HireiBlock のリスト (parties[].seats が総務省集計の議席数)
+    entries: 名簿の行 (stream_hirei_lists の戻り値など)
+    results: DistrictResults
+
+    戻り値: (candidates を埋めた blocks, 照合レポート)
+    レポートの mismatches は議席数と計算上の当選者数が合わない政党・ブロック、
+    disagreements は名簿に当落がある場合に計算結果と異なる候補者。
+    """
+    entries = list(entries)
+    n = len(entries)
+    d = results.arrays()
+    party_ids = PartyIds()
+
+    def party_group(b, p):
+        return _group(b['name'], p['party'], party_ids)
+
+    group_keys = np.fromiter((_group(e['block'], e['party'], party_ids) for e in entries),
+                             dtype=np.int64, count=n)
+    ranks = np.fromiter((e['rank'] for e in entries), dtype=np.int64, count=n)
+    dual = np.fromiter((e['dual'] for e in entries), dtype=bool, count=n)
+    keys = np.asarray([candidate_key(e['name'], e['party']) for e in entries], dtype=str)
+
+    # 小選挙区の結果と結合。見つからない行 (j = -1) は末尾の番兵を指す
+    j = _join(keys, d['key'])
+    found = j >= 0
+
+    def pick(name, fill):
+        return np.append(d[name], fill)[j]
+
+    won_district = pick('won', False)
+    forfeited = pick('forfeited', False)
+    seki = np.where(won_district, np.nan, pick('sekihairitsu', np.nan))
+
+    # 政党・ブロックごとに (名簿順位, 惜敗率の降順) で並べ、有資格者の先頭から議席数まで当選
+    groups, code = np.unique(group_keys, return_inverse=True)
+    seats_by_group = {party_group(b, p): p['seats'] for b in blocks for p in b['parties']}
+    seats = np.fromiter((seats_by_group.get(int(g), 0) for g in groups), dtype=np.int64, count=groups.size)
+
+    eligible = ~won_district & ~forfeited
+    order = np.lexsort((-np.nan_to_num(seki), ranks, code))
+    code_sorted = code[order]
+    elig_sorted = eligible[order].astype(np.int64)
+    before = np.cumsum(elig_sorted) - elig_sorted
+    first = np.ones(n, dtype=bool)
+    first[1:] = code_sorted[1:] != code_sorted[:-1]
+    group_start = np.maximum.accumulate(np.where(first, np.arange(n), 0))
+    position = before - before[group_start]
+    elected = np.zeros(n, dtype=bool)
+    elected[order] = (elig_sorted > 0) & (position < seats[code_sorted])
+    revived = elected & found
+
+    elected_count = np.bincount(code, weights=elected, minlength=groups.size).astype(np.int64)
+    eligible_count = np.bincount(code, weights=eligible, minlength=groups.size).astype(np.int64)
+
+    # 計算結果 → HireiCandidate (名簿順)
+    votes, winner_votes = pick('votes', 0), pick('winnerVotes', 0)
+    listed = {}
+    for i in order:
+        if won_district[i]:
+            continue
+        e = entries[i]
+        c = {
+            'rank': e['rank'], 'name': e['name'], 'age': e['age'], 'party': e['party'],
+            'result': '比当' if revived[i] else ('当' if elected[i] else '落'),
+        }
+        if found[i]:
+            c['votes'] = int(votes[i])
+            c['winnerVotes'] = int(winner_votes[i])
+            c['sekihairitsu'] = float(seki[i])
+        c['block'] = e['block']
+        listed.setdefault(int(group_keys[i]), []).append(c)
+
+    out = [{**b, 'parties': [{**p, 'candidates': listed.get(party_group(b, p), [])} for p in b['parties']]}
+           for b in blocks]
+
+    # 総務省の議席数との照合
+    group_index = {int(g): k for k, g in enumerate(groups)}
+    mismatches = []
+    for b in blocks:
+        for p in b['parties']:
+            k = group_index.get(party_group(b, p))
+            got = int(elected_count[k]) if k is not None else 0
+            if got != p['seats']:
+                mismatches.append({
+                    'block': b['name'], 'party': p['party'], 'seats': p['seats'], 'elected': got,
+                    'eligible': int(eligible_count[k]) if k is not None else 0,
+                })
+
+    disagreements = [
+        {'block': e['block'], 'party': e['party'], 'rank': e['rank'], 'name': e['name'],
+         'parsed': e['result'], 'computed': bool(elected[i])}
+        for i, e in enumerate(entries)
+        if e['result'] is not None and not won_district[i] and ('当' in e['result']) != elected[i]
+    ]
+
+    report = {
+        'entries': n,
+        'matched': int(found.sum()),
+        'unmatchedDual': int((dual & ~found).sum()),
+        'districtWinners': int(won_district.sum()),
+        'forfeited': int(forfeited.sum()),
+        'elected': int(elected.sum()),
+        'revived': int(revived.sum()),
+        'mismatches': mismatches,
+        'disagreements': disagreements,
+    }
+    return out, report
+
+
+def print_report(report):
+    """照合レポートの要約を出力 (変換スクリプトの Validation 用)"""
+    print(f"  比例名簿: {report['entries']} 人 (小選挙区当選 {report['districtWinners']}, "
+          f"当選 {report['elected']}, うち比例復活 {report['revived']})")
+    if report['unmatchedDual']:
+        print(f"  WARN 小選挙区の結果と結合できない重複立候補者: {report['unmatchedDual']} 人")
+    for m in report['mismatches']:
+        print(f"  WARN {m['block']} {m['party']}: 議席 {m['seats']} / 計算上の当選 {m['elected']} "
+              f"(名簿の有資格者 {m['eligible']})")
+    for d in report['disagreements'][:10]:
+        print(f"  WARN {d['block']} {d['party']} {d['rank']}位 {d['name']}: 名簿 {d['parsed']} / 計算 "
+              f"{'当選' if d['computed'] else '落選'}")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+JSON 出力ステージ
+
+変換スクリプトの出力はすべて write_json() で書き出す。
+
+  - 区切りの空白を除いた minified JSON (ELECTION_JSON_PRETTY=1 で indent=2)
+  - 同じディレクトリに .gz / .br の事前圧縮ファイル
+    (CDN・静的配信サーバーが Accept-Encoding に応じてそのまま返す)
+
+.br の生成には brotli パッケージが必要。未インストールなら .gz のみ作る。
+
+使い方 (既存ファイルの一括処理):
+  python scripts/json_output.py                 # public/data の圧縮ファイルを更新
+  python scripts/json_output.py --minify        # JSON 自体も minify して書き直す
+"""
+import argparse
+import gzip
+import json
+import os
+
+from paths import output_root
+
+try:
+    import brotli
+except ImportError:  # .br は任意
+    brotli = None
+
+# 事前圧縮の対象
+COMPRESS_EXTENSIONS = ('.json', '.csv')
+
+# 圧縮レベル (gzip, brotli)。fast は開票速報 (live_count.py) のように繰り返し書き直す出力用
+LEVELS = (9, 11)
+FAST_LEVELS = (6, 5)
+
+
+def pretty_requested():
+    return os.environ.get('ELECTION_JSON_PRETTY', '0') == '1'
+
+
+def dumps(data):
+    if pretty_requested():
+        return json.dumps(data, ensure_ascii=False, indent=2)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def _write_bytes(path, data):
+    # --output-root に空のディレクトリを指定しても書けるように
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def compress_file(path, fast=False):
+    """path の .gz / .br を書き出す。作成したファイルのリストを返す"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    gzip_level, brotli_quality = FAST_LEVELS if fast else LEVELS
+    written = []
+    # mtime=0 で内容が同じなら .gz もバイト単位で同じになる
+    _write_bytes(path + '.gz', gzip.compress(raw, compresslevel=gzip_level, mtime=0))
+    written.append(path + '.gz')
+    if brotli is not None:
+        _write_bytes(path + '.br', brotli.compress(raw, quality=brotli_quality))
+        written.append(path + '.br')
+    return written
+
+
+def write_json(path, data, fast=False):
+    """minified JSON + .gz / .br を書き出す"""
+    _write_bytes(path, dumps(data).encode('utf-8'))
+    compress_file(path, fast)
+
+
+def _stale(path, sibling):
+    return not os.path.exists(sibling) or os.path.getmtime(sibling) < os.path.getmtime(path)
+
+
+def iter_data_files(root):
+    for dirpath, _, files in os.walk(root):
+        for name in sorted(files):
+            if name.endswith(COMPRESS_EXTENSIONS):
+                yield os.path.join(dirpath, name)
+
+
+def compress_tree(root=None, minify=False, force=False):
+    """root 以下の JSON/CSV の圧縮ファイルを更新 (元ファイルより古いものだけ)"""
+    root = root or output_root()
+    updated = []
+    for path in iter_data_files(root):
+        if minify and path.endswith('.json'):
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            text = dumps(data).encode('utf-8')
+            with open(path, 'rb') as f:
+                if f.read() != text:
+                    _write_bytes(path, text)
+        siblings = [path + '.gz'] + ([path + '.br'] if brotli is not None else [])
+        if force or any(_stale(path, s) for s in siblings):
+            compress_file(path)
+            updated.append(path)
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='public/data の JSON/CSV を事前圧縮')
+    parser.add_argument('root', nargs='?', help='対象ディレクトリ (既定: 出力ルート)')
+    parser.add_argument('--minify', action='store_true', help='JSON を minify して書き直す')
+    parser.add_argument('--force', action='store_true', help='圧縮ファイルをすべて作り直す')
+    args = parser.parse_args()
+
+    if brotli is None:
+        print('brotli が未インストールのため .br は作成しません (pip install brotli)')
+    updated = compress_tree(args.root, minify=args.minify, force=args.force)
+    root = args.root or output_root()
+    for path in updated:
+        print(f'  compressed {os.path.relpath(path, root)}')
+    print(f'{len(updated)} files updated')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+シートのラベル索引とマルチパターン照合
+
+LabelIndex はシートを1パスで走査し、正規化したセル文字列 → 座標 の辞書を作る。
+結合セルは範囲内の全座標にラベルを展開するため、label_at() でどのセルからでも
+見出しを引ける。アンカー検索 (find/search) は結合範囲の左上セルのみを返す。
+
+PatternMatcher は政党名・ブロック名などの複数パターンを Aho-Corasick 法で
+1回の走査で照合する。
+
+正規化: NFKC + 半角/全角空白の除去
+"""
+import re
+import unicodedata
+from collections import deque
+
+_SPACES = re.compile(r'[\s　]+')
+
+
+def normalize_label(val):
+    """ラベル比較用の正規化 (NFKC + 空白・全角空白除去)"""
+    if val is None:
+        return ''
+    return _SPACES.sub('', unicodedata.normalize('NFKC', str(val)))
+
+
+class PatternMatcher:
+    """Aho-Corasick オートマトン。パターンは宣言順が優先度になる。"""
+
+    def __init__(self, patterns, normalize=True):
+        self.normalize = normalize
+        self.patterns = list(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for i, p in enumerate(self.patterns):
+            key = normalize_label(p) if normalize else p
+            node = 0
+            for ch in key:
+                if ch not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[node][ch] = len(self._goto) - 1
+                node = self._goto[node][ch]
+            self._out[node].append(i)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                nxt = self._goto[f].get(ch, 0)
+                self._fail[child] = nxt if nxt != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def _scan(self, text):
+        if text is None:
+            return
+        text = normalize_label(text) if self.normalize else str(text)
+        node = 0
+        for pos, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for i in self._out[node]:
+                yield pos, i
+
+    def findall(self, text):
+        """text に含まれるパターンの一覧 (宣言順、重複なし)"""
+        return [self.patterns[i] for i in sorted({i for _, i in self._scan(text)})]
+
+    def best(self, text):
+        """text に含まれるパターンのうち最も宣言順が早いもの (なければ None)"""
+        found = [i for _, i in self._scan(text)]
+        return self.patterns[min(found)] if found else None
+
+
+class LabelIndex:
+    """正規化ラベル → [(row, col)] の索引 (0-indexed)"""
+
+    def __init__(self, sheet):
+        self.sheet = sheet
+        self._anchors = {}   # label -> [(r, c)] 左上セルのみ
+        self._covered = {}   # (r, c) -> (label, 左上セル) 結合範囲内の全セル
+        self._search_cache = {}
+
+        for r, row in enumerate(sheet.rows):
+            for c, val in enumerate(row):
+                if isinstance(val, str) and val:
+                    key = normalize_label(val)
+                    if key:
+                        self._anchors.setdefault(key, []).append((r, c))
+
+        for r0, c0, r1, c1 in getattr(sheet, 'merged', ()):
+            key = normalize_label(sheet.cell_value(r0, c0))
+            if not key:
+                continue
+            for r in range(r0, r1 + 1):
+                for c in range(c0, c1 + 1):
+                    self._covered[(r, c)] = (key, (r0, c0))
+
+    def labels(self):
+        return self._anchors.keys()
+
+    def find(self, text, col=None, start=0):
+        """text と完全一致するラベルの座標 (行順)。O(1) の辞書引き"""
+        hits = self._anchors.get(normalize_label(text), [])
+        return [(r, c) for r, c in hits if r >= start and (col is None or c == col)]
+
+    def search(self, text, col=None, start=0):
+        """text を含むラベルの座標 (行順)。走査はラベルの種類数に比例"""
+        key = normalize_label(text)
+        if key not in self._search_cache:
+            hits = [rc for label, coords in self._anchors.items() if key in label for rc in coords]
+            self._search_cache[key] = sorted(hits)
+        return [(r, c) for r, c in self._search_cache[key]
+                if r >= start and (col is None or c == col)]
+
+    def first(self, text, col=None, start=0, nth=0):
+        """text を含む nth 番目のラベルの行 (なければ None)"""
+        hits = self.search(text, col=col, start=start)
+        return hits[nth][0] if nth < len(hits) else None
+
+    def label_at(self, r, c):
+        """座標 (r, c) の正規化ラベル。結合セル内なら左上セルのラベル"""
+        if (r, c) in self._covered:
+            return self._covered[(r, c)][0]
+        return normalize_label(self.sheet.cell_value(r, c))
+
+    def merged_origin(self, r, c):
+        """結合範囲の左上セル (結合していなければ (r, c))"""
+        if (r, c) in self._covered:
+            return self._covered[(r, c)][1]
+        return (r, c)
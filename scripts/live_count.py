@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+開票速報のインクリメンタル集計 (衆院選の開票当日用)
+
+開票速報のファイルが届くたびに convert_national_2026.py 等を最初から
+実行し直すのではなく、監視するディレクトリに置かれた速報ファイルを前回までの
+値と比べ、変わった開票区の差分だけを選挙区・都道府県・ブロックの集計に足し込み、
+変わった都道府県・ブロックのシャードと index.json だけを書き出す
+(elections/live/{type}_{year}/、election_shards.py と同じ形)。
+
+速報ファイル (CSV、UTF-8) は1行 = 開票区 × 候補者 (小選挙区) または
+開票区 × 政党 (比例代表) の累計得票。ヘッダーは日本語・英語のどちらでもよい。
+
+  種別 (tier)            小選挙区 / 比例代表 (shou / hirei)
+  都道府県 (prefecture)
+  選挙区 (district)      小選挙区のみ。'1' または '1区'
+  開票区 (municipality)
+  候補者 (candidate)     小選挙区のみ
+  政党 (party)
+  得票数 (votes)
+
+ファイルは開票区の累計の差し替えで、ファイルにない開票区は前回の値のまま
+(一部の開票区だけのファイルでよい)。ファイルは名前順に処理し、置くときは
+一時名で書いてから rename する (.tmp / .part は読まない)。
+
+集計:
+  小選挙区  開票区 → 選挙区の候補者別得票 → 現時点の1位を当選 (result '当')
+            → 都道府県の政党別得票・議席 (変わった選挙区だけ集計し直す)
+  比例代表  開票区 → ブロックの政党別得票 → ドント式 (dhondt.py) で議席
+  開票区別の集計はシャードの municipalities に入れる。
+
+--base の全体ファイル (既定: 出力済みの elections/{type}_{year}.json) からは
+都道府県の選挙区数とブロック定数だけを使い、得票は 0 から数える。速報のない
+都道府県・ブロックも得票 0 で載せる。
+出力はすべて elections/live/ の下で、変換済みの elections/{type}_{year}.json と
+そのシャードは書き換えない。全体ファイル elections/live/{type}_{year}.json
+(小選挙区の districts を含む) は終了時 (--once または Ctrl-C) に、
+1件以上取り込んでいれば書く。
+開票中のシャードの .gz / .br は速度優先の圧縮レベル (json_output.FAST_LEVELS) で作るので、
+確定後に json_output.py --force で圧縮し直す。
+
+使い方:
+  python scripts/live_count.py ~/sokuhou                     # 1秒ごとに監視
+  python scripts/live_count.py ~/sokuhou --election shugiin_2026 --interval 0.5
+  python scripts/live_count.py ~/sokuhou --once              # 置かれているファイルを処理して終了
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from dhondt import allocate
+from dimensions import BLOCK_SEATS, PREFECTURE_NAMES, block_id, block_of, canonical_party, pref_id
+from election_shards import build_index, shard_dir
+from json_output import write_json
+from paths import output_path
+
+DEFAULT_ELECTION = 'shugiin_2026'
+POLL_INTERVAL = 1.0
+SNAPSHOT_PATTERN = '*.csv'
+PARTIAL_SUFFIXES = ('.tmp', '.part')
+
+# 列名 → 日本語・英語の見出し
+COLUMNS = {
+    'tier': ('種別', 'tier'),
+    'prefecture': ('都道府県', 'prefecture'),
+    'district': ('選挙区', 'district'),
+    'municipality': ('開票区', 'municipality'),
+    'candidate': ('候補者', 'candidate'),
+    'party': ('政党', 'party'),
+    'votes': ('得票数', 'votes'),
+}
+TIERS = {'小選挙区': 'shou', 'shou': 'shou', '比例代表': 'hirei', 'hirei': 'hirei'}
+
+_DISTRICT_NO = re.compile(r'(\d+)')
+
+
+def _share(votes, total):
+    return round(votes / total * 100, 2) if total else 0
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 速報ファイル
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def read_snapshot(path):
+    """速報 CSV → 行 (dict) のイテラブル。見出しは COLUMNS のどちらの表記でもよい"""
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader, [])]
+        index = {}
+        for key, labels in COLUMNS.items():
+            for label in labels:
+                if label in header:
+                    index[key] = header.index(label)
+                    break
+        missing = [k for k in ('tier', 'prefecture', 'municipality', 'party', 'votes') if k not in index]
+        if missing:
+            raise ValueError(f"{os.path.basename(path)}: missing column(s) {', '.join(missing)}")
+        for values in reader:
+            if not any(v.strip() for v in values):
+                continue
+            row = {k: values[i].strip() if i < len(values) else '' for k, i in index.items()}
+            tier = TIERS.get(row['tier'])
+            if tier is None:
+                raise ValueError(f"{os.path.basename(path)}: unknown tier {row['tier']!r}")
+            row['tier'] = tier
+            row['votes'] = int(float(row['votes'].replace(',', '') or 0))
+            yield row
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 集計
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class LiveCount:
+    """開票区の累計 → 選挙区・都道府県・ブロックの集計 (差分で更新)"""
+
+    def __init__(self, year, election_date=None, base=None):
+        self.year = year
+        self.election_date = election_date
+        # 開票区の累計 (前回の速報の値)
+        self.rows = {}                                     # 行のキー → 得票
+        self.candidate_party = {}                          # (都道府県, 区, 候補者) → 政党
+        # 集計
+        self.districts = defaultdict(lambda: defaultdict(int))       # (都道府県, 区) → {候補者: 得票}
+        self.pref_districts = defaultdict(set)                       # 都道府県 → {区}
+        self.pref_votes = defaultdict(lambda: defaultdict(int))      # 都道府県 → {政党: 得票}
+        self.block_votes = defaultdict(lambda: defaultdict(int))     # ブロック → {政党: 得票}
+        # (種別, 都道府県) → {(開票区, 区): {政党: 得票}}
+        self.municipalities = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
+        self.winners = {}                                  # (都道府県, 区) → 候補者
+        self.district_rows = {}                            # (都道府県, 区) → ShouDistrict
+        # 出力用 (NationalElectionData と同じ形)
+        self.total_districts = {}
+        self.block_seats = dict(BLOCK_SEATS)
+        self.prefectures = {}
+        self.blocks = {}
+        if base:
+            self.election_date = self.election_date or base.get('electionDate')
+            for p in base['shou']['prefectures']:
+                self.total_districts[p['prefecture']] = p['totalDistricts']
+            for b in base['hirei']['blocks']:
+                self.block_seats[b['name']] = b['totalSeats']
+        self.updates = 0
+
+    # ── 差分の適用 ──
+    def _parse(self, row):
+        """速報の1行 → (行のキー, 政党, 区)。不正な行は ValueError"""
+        pref = row['prefecture']
+        if pref_id(pref) is None or pref not in PREFECTURE_NAMES:
+            raise ValueError(f'unknown prefecture: {pref}')
+        party = canonical_party(row['party'])
+        if row['tier'] == 'hirei':
+            return ('hirei', pref, row['municipality'], party), party, None
+        m = _DISTRICT_NO.search(row.get('district', ''))
+        if m is None or not row.get('candidate'):
+            raise ValueError(f"{pref} {row['municipality']}: 小選挙区の行に選挙区・候補者がない")
+        district = int(m.group(1))
+        prev = self.candidate_party.get((pref, district, row['candidate']), party)
+        if prev != party:
+            raise ValueError(f"{pref}{district}区 {row['candidate']}: party changed {prev} → {party}")
+        return ('shou', pref, district, row['candidate'], row['municipality']), party, district
+
+    def apply(self, rows):
+        """速報の行を取り込み、変わった (都道府県の集合, ブロックの集合, 変わった行数) を返す
+
+        ファイル全体を検査してから取り込むので、不正な行があれば何も変えない。
+        """
+        parsed = [(row, *self._parse(row)) for row in rows]
+        prefs, blocks, districts, changed = set(), set(), set(), 0
+        for row, key, party, district in parsed:
+            delta = row['votes'] - self.rows.get(key, 0)
+            if delta == 0 and key in self.rows:
+                continue
+            self.rows[key] = row['votes']
+            changed += 1
+            pref = row['prefecture']
+            self.municipalities[(row['tier'], pref)][(row['municipality'], district)][party] += delta
+            if row['tier'] == 'shou':
+                self.candidate_party[(pref, district, row['candidate'])] = party
+                self.districts[(pref, district)][row['candidate']] += delta
+                self.pref_districts[pref].add(district)
+                self.pref_votes[pref][party] += delta
+                districts.add((pref, district))
+                prefs.add(pref)
+            else:
+                block = block_of(pref)
+                self.block_votes[block][party] += delta
+                blocks.add(block)
+        for pref, district in districts:
+            self.district_rows[(pref, district)] = self._district(pref, district)
+        for pref in prefs:
+            self.prefectures[pref] = self._prefecture(pref)
+        for block in blocks:
+            self.blocks[block] = self._block(block)
+        if changed:
+            self.updates += 1
+        return prefs, blocks, changed
+
+    # ── 変わった地域の集計し直し ──
+    def _district(self, pref, district):
+        votes = self.districts[(pref, district)]
+        total = sum(votes.values())
+        leader = max(votes, key=votes.get) if total else None
+        self.winners[(pref, district)] = leader
+        candidates = [
+            {'name': name, 'party': self.candidate_party[(pref, district, name)], 'votes': v,
+             'voteRate': _share(v, total), 'result': '当' if name == leader else '落', 'isDualCandidate': False}
+            for name, v in votes.items()
+        ]
+        candidates.sort(key=lambda c: -c['votes'])
+        return {'prefecture': pref, 'district': district, 'candidates': candidates}
+
+    def _prefecture(self, pref):
+        districts = [self.district_rows[(pref, d)] for d in sorted(self.pref_districts[pref])]
+        seats = defaultdict(int)
+        for d in districts:
+            winner = self.winners[(pref, d['district'])]
+            if winner:
+                seats[self.candidate_party[(pref, d['district'], winner)]] += 1
+        votes = self.pref_votes[pref]
+        total = sum(votes.values())
+        results = [{'party': p, 'seats': seats[p], 'totalVotes': v, 'voteRate': _share(v, total)}
+                   for p, v in votes.items() if v or seats[p]]
+        results.sort(key=lambda r: (-r['seats'], -r['totalVotes']))
+        return {
+            'prefecture': pref,
+            'totalDistricts': self.total_districts.get(pref, len(districts)),
+            'partyResults': results,
+            'districts': districts,
+            'municipalities': self._municipalities('shou', pref),
+        }
+
+    def _block(self, block):
+        parties = [p for p, v in self.block_votes[block].items() if v > 0]
+        votes = np.array([self.block_votes[block][p] for p in parties], dtype=np.int64)
+        seats = allocate(votes, self.block_seats.get(block, 0)) if parties else []
+        total = int(votes.sum()) if parties else 0
+        rows = [{'party': p, 'block': block, 'seats': int(s), 'votes': int(v), 'voteRate': _share(v, total),
+                 'candidates': []} for p, v, s in zip(parties, votes, seats)]
+        rows.sort(key=lambda r: (-r['seats'], -r['votes']))
+        return {
+            'name': block,
+            'totalSeats': self.block_seats.get(block, 0),
+            'totalVotes': total,
+            'parties': rows,
+            'municipalities': [m for pref in PREFECTURE_NAMES if block_of(pref) == block
+                               for m in self._municipalities('hirei', pref)],
+        }
+
+    def _municipalities(self, tier, pref):
+        out = []
+        for (muni, district), votes in self.municipalities[(tier, pref)].items():
+            row = {'name': muni, 'prefecture': pref, 'totalVotes': sum(votes.values()), 'parties': dict(votes)}
+            if district is not None:
+                row['district'] = district
+            out.append(row)
+        return out
+
+    # ── 出力 ──
+    def data(self):
+        """全体ファイル (NationalElectionData) の内容。シャード用の列は除く
+
+        速報のない都道府県 (--base にあるもの)・ブロックは得票 0 で載せる。
+        """
+        prefs = [self.prefectures.get(p) or {'prefecture': p, 'totalDistricts': self.total_districts[p],
+                                             'partyResults': []}
+                 for p in PREFECTURE_NAMES if p in self.prefectures or p in self.total_districts]
+        blocks = [self.blocks.get(b) or {'name': b, 'totalSeats': self.block_seats[b], 'totalVotes': 0, 'parties': []}
+                  for b in BLOCK_SEATS if b in self.blocks or b in self.block_seats]
+        return {
+            'year': self.year,
+            'electionDate': self.election_date,
+            'hirei': {
+                'totalSeats': sum(self.block_seats.get(b['name'], 0) for b in blocks),
+                'blocks': [{k: v for k, v in b.items() if k != 'municipalities'} for b in blocks],
+            },
+            'shou': {
+                'totalSeats': sum(p['totalDistricts'] for p in prefs),
+                'prefectures': [{k: v for k, v in p.items() if k not in ('districts', 'municipalities')}
+                                for p in prefs],
+                'districts': [d for p in prefs for d in p.get('districts', ())],
+            },
+        }
+
+    def write(self, path, prefs, blocks):
+        """変わった都道府県・ブロックのシャードと index.json を書き、書いたファイルを返す"""
+        root = shard_dir(path)
+        os.makedirs(os.path.join(root, 'shou'), exist_ok=True)
+        os.makedirs(os.path.join(root, 'hirei'), exist_ok=True)
+        data = self.data()
+        summaries = {p['prefecture']: p for p in data['shou']['prefectures']}
+        written = []
+        for pref in sorted(prefs, key=pref_id):
+            shard = os.path.join(root, 'shou', f'{pref_id(pref)}.json')
+            p = self.prefectures[pref]
+            write_json(shard, {**summaries[pref], 'districts': p['districts'], 'municipalities': p['municipalities']},
+                       fast=True)
+            written.append(shard)
+        for block in sorted(blocks, key=block_id):
+            shard = os.path.join(root, 'hirei', f'{block_id(block)}.json')
+            write_json(shard, self.blocks[block], fast=True)
+            written.append(shard)
+        counts = {pref_id(p): len(self.prefectures[p]['districts']) for p in self.prefectures}
+        index = build_index(data, counts)
+        for entry in index['hirei']['blocks']:
+            if entry['name'] not in self.blocks:
+                del entry['shard']
+        index['live'] = {'updatedAt': time.strftime('%Y-%m-%dT%H:%M:%S'), 'updates': self.updates,
+                         'municipalities': sum(len(m) for m in self.municipalities.values())}
+        write_json(os.path.join(root, 'index.json'), index, fast=True)
+        written.append(os.path.join(root, 'index.json'))
+        return written
+
+    def write_full(self, path):
+        """全体ファイルを書く (小選挙区の districts も含める)"""
+        write_json(path, self.data())
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 監視
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def pending(directory, seen):
+    """新しい・更新された速報ファイル (名前順)"""
+    out = []
+    for path in sorted(glob.glob(os.path.join(directory, SNAPSHOT_PATTERN))):
+        if path.endswith(PARTIAL_SUFFIXES):
+            continue
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if seen.get(path) != signature:
+            out.append((path, signature))
+    return out
+
+
+def process(live, path, output):
+    start = time.perf_counter()
+    prefs, blocks, changed = live.apply(read_snapshot(path))
+    written = live.write(output, prefs, blocks) if changed else []
+    print(f"[{time.strftime('%H:%M:%S')}] {os.path.basename(path)}: {changed} rows changed, "
+          f"{len(prefs)} prefectures, {len(blocks)} blocks → {len(written)} files "
+          f"({time.perf_counter() - start:.2f} s)")
+
+
+def watch(directory, live, output, interval=POLL_INTERVAL, once=False):
+    seen = {}
+    try:
+        while True:
+            for path, signature in pending(directory, seen):
+                try:
+                    process(live, path, output)
+                except (OSError, ValueError) as e:
+                    print(f'  WARN {os.path.basename(path)}: {e}')
+                seen[path] = signature
+            if once:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if live.updates:
+            live.write_full(output)
+            print(f'Output: {output}')
+        else:
+            print('No updates; nothing written')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='開票速報のインクリメンタル集計')
+    parser.add_argument('directory', help='速報ファイルを置くディレクトリ')
+    parser.add_argument('--election', default=DEFAULT_ELECTION, help=f'出力する選挙 (既定: {DEFAULT_ELECTION})')
+    parser.add_argument('--base', help='選挙区数・定数を読む全体ファイル (既定: 出力済みの同じ選挙)')
+    parser.add_argument('--date', help='投票日 (YYYY-MM-DD、既定: --base の electionDate)')
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL, help=f'監視間隔 (秒、既定: {POLL_INTERVAL})')
+    parser.add_argument('--once', action='store_true', help='置かれているファイルを処理して終了')
+    args = parser.parse_args()
+
+    kind, year = args.election.split('_')
+    if kind != 'shugiin':
+        parser.error('only shugiin elections are supported (1人区の小選挙区・ブロック別比例)')
+    output = output_path('elections', 'live', f'{args.election}.json')
+    base_path = args.base or output_path('elections', f'{args.election}.json')
+    base = None
+    if os.path.exists(base_path):
+        with open(base_path, encoding='utf-8') as f:
+            base = json.load(f)
+    live = LiveCount(int(year), args.date, base)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    print(f'Watching {args.directory} → {os.path.relpath(shard_dir(output), output_path())}/')
+    watch(os.path.expanduser(args.directory), live, output, args.interval, args.once)
+
+
+if __name__ == '__main__':
+    main()
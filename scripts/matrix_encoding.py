@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+区市町村別結果の行列 (列指向) エンコード
+
+convert_syosenkyoku の出力は区市町村ごとに政党名をキーにした dict を持つため、
+政党名が区市町村数 × 年数だけ繰り返される。行列形式では政党名・選挙区・区分を
+一度だけ持ち、得票数と得票率を整数の2次元配列 [区市町村][政党] にする。
+
+  {
+    "format": "municipality-matrix/v1",
+    "electionType": "小選挙区", "electionDate": "2026-02-08",
+    "parties":   ["自由民主党", ...],          政党 ID = 添字
+    "partyIds":  [1, ...],                    次元レジストリの政党 ID (dimensions.py、未登録は null)
+    "districts": ["1区", ...],                選挙区 ID = 添字
+    "types":     ["区部", "市部"],             区分 ID = 添字
+    "municipalities": {                        区市町村 (列指向)
+      "name": [...], "district": [選挙区 ID], "type": [区分 ID], "totalVotes": [...]
+    },
+    "votes":  [[...], ...],                    得票数
+    "rateBp": [[...], ...],                    得票率 (ベーシスポイント: 28.87% → 2887)
+    "total":  {"totalVotes": n, "votes": [...], "rateBp": [...], "seats": [...]}
+  }
+
+得票率は変換時に小数2桁へ丸めているため、ベーシスポイントで損失なく表せる。
+src/lib/municipality-matrix.ts がページ用の元の形式に戻す。
+"""
+import os
+
+import numpy as np
+
+from dimensions import party_id
+
+FORMAT = 'municipality-matrix/v1'
+
+
+def matrix_path(path):
+    """tokyo-syosenkyoku-2026.json → tokyo-syosenkyoku-2026.matrix.json"""
+    root, ext = os.path.splitext(path)
+    return f'{root}.matrix{ext or ".json"}'
+
+
+def to_bp(rate):
+    return int(round(rate * 100))
+
+
+def _dimension(values):
+    """値のリスト → (ユニーク値の出現順リスト, ID のリスト)"""
+    ids = {}
+    codes = [ids.setdefault(v, len(ids)) for v in values]
+    return list(ids), codes
+
+
+def encode_municipalities(data):
+    """convert_syosenkyoku 形式 → 行列形式"""
+    parties = list(data['parties'])
+    munis = data['municipalities']
+    districts, district_ids = _dimension([m['district'] for m in munis])
+    types, type_ids = _dimension([m['type'] for m in munis])
+
+    shape = (len(munis), len(parties))
+    votes = np.zeros(shape, dtype=np.int64)
+    rate_bp = np.zeros(shape, dtype=np.int64)
+    for i, m in enumerate(munis):
+        for j, party in enumerate(parties):
+            cell = m[party]
+            votes[i, j] = cell['votes']
+            rate_bp[i, j] = to_bp(cell['rate'])
+
+    total = data['total']
+    return {
+        'format': FORMAT,
+        'electionType': data['electionType'],
+        'electionDate': data['electionDate'],
+        'parties': parties,
+        'partyIds': [party_id(p) for p in parties],
+        'districts': districts,
+        'types': types,
+        'municipalities': {
+            'name': [m['name'] for m in munis],
+            'district': district_ids,
+            'type': type_ids,
+            'totalVotes': [m['totalVotes'] for m in munis],
+        },
+        'votes': votes.tolist(),
+        'rateBp': rate_bp.tolist(),
+        'total': {
+            'totalVotes': total['totalVotes'],
+            'votes': [total[p]['votes'] if p in total else 0 for p in parties],
+            'rateBp': [to_bp(total[p]['rate']) if p in total else 0 for p in parties],
+            'seats': [total[p]['seats'] if p in total else 0 for p in parties],
+        },
+    }
+
+
+def decode_municipalities(matrix):
+    """行列形式 → convert_syosenkyoku 形式 (検証・Python 側の利用向け)"""
+    parties = matrix['parties']
+    cols = matrix['municipalities']
+    municipalities = []
+    for i, name in enumerate(cols['name']):
+        muni = {
+            'name': name,
+            'district': matrix['districts'][cols['district'][i]],
+            'type': matrix['types'][cols['type'][i]],
+            'totalVotes': cols['totalVotes'][i],
+        }
+        for j, party in enumerate(parties):
+            muni[party] = {'votes': matrix['votes'][i][j], 'rate': matrix['rateBp'][i][j] / 100}
+        municipalities.append(muni)
+
+    t = matrix['total']
+    total = {'totalVotes': t['totalVotes']}
+    for j, party in enumerate(parties):
+        total[party] = {'votes': t['votes'][j], 'rate': t['rateBp'][j] / 100, 'seats': t['seats'][j]}
+
+    return {
+        'electionType': matrix['electionType'],
+        'electionDate': matrix['electionDate'],
+        'parties': parties,
+        'total': total,
+        'municipalities': municipalities,
+    }
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+比例代表 得票率・議席の推移 (elections/national_party_trends.json) の生成
+
+elections/shugiin_*.json / sangiin_*.json の比例得票と議席を、系譜表で
+現在の政党 (SERIES) にまとめて年ごとの行にする。系譜表は dimensions.py の
+前身政党 (predecessors) から作る (希望の党 → 国民民主党、民主党・民進党 →
+立憲民主党 など)。SERIES にも系譜表にもない政党は「その他」。
+
+  shugiin_hirei / sangiin_hirei   比例得票率 (%)
+  shugiin_seats / sangiin_seats   議席 (比例 + 小選挙区・選挙区)
+
+選挙ごとの JSON がない年 (2021年衆院選など) の行と、tokyo_hirei 等の手入力の
+セクションは既存ファイルの値を残す。選挙ごとの JSON が概算値 (note に
+APPROXIMATE を含む。2017年衆院選のブロック得票など) の年も、既存ファイルに
+確認済みの行があればそれを残し、ない年だけ計算した行を入れる。
+
+選挙ごとの JSON の内容ハッシュを .build/party_trends.json に記録し、変わった
+年だけ読み直す。読み直す年は [選挙 × 政党] の得票・議席行列にまとめ、
+[政党 × 系列] の対応行列との積で一度に集計する。
+
+使い方:
+  python scripts/party_trends.py
+  python scripts/party_trends.py --force   # 全年を読み直す
+"""
+import argparse
+import json
+import os
+import re
+
+import numpy as np
+
+from build_manifest import file_hash
+from dimensions import canonical_party, party_lineage
+from election_shards import national_totals, election_files
+from json_output import write_json
+from paths import REPO_ROOT, output_path
+
+CACHE_FILE = os.path.join(REPO_ROOT, '.build', 'party_trends.json')
+# 集計に使うコード (変わったらキャッシュを捨てて全年を読み直す)。national_totals は election_shards.py
+CODE = [os.path.join(REPO_ROOT, 'scripts', f) for f in ('party_trends.py', 'dimensions.py', 'election_shards.py')]
+
+SOURCE = '総務省選挙部「衆議院議員総選挙・最高裁判所裁判官国民審査結果調」「参議院議員通常選挙結果調」'
+
+# 推移グラフの系列 (現在の政党)。系列にない政党は OTHER
+SERIES = [
+    '自由民主党', '立憲民主党', '公明党', '日本共産党', '日本維新の会',
+    '国民民主党', 'れいわ新選組', '社会民主党', '参政党', '中道改革連合',
+]
+OTHER = 'その他'
+# 選挙ごとの JSON の note にこの語があれば、集計表の確報値ではない
+APPROXIMATE = '概算値'
+
+# 回次 (選挙ごとの JSON には含まれない)
+ELECTION_NAMES = {
+    ('shugiin', 2017): '第48回', ('shugiin', 2021): '第49回',
+    ('shugiin', 2024): '第50回', ('shugiin', 2026): '第51回',
+    ('sangiin', 2019): '第25回', ('sangiin', 2022): '第26回', ('sangiin', 2025): '第27回',
+}
+
+_FILE = re.compile(r'^(?P<type>shugiin|sangiin)_(?P<year>\d{4})\.json$')
+
+
+def block_votes(block):
+    """ブロックの (有効投票数, {政党: 得票}) を得票率と整合する形で返す
+
+    得票率は集計表の値なので、得票率から逆算した有効投票数 (政党ごとの中央値) を
+    優先し、得票は 得票率 × 有効投票数 とする。得票率の合計が 100% を超える、
+    または逆算値が政党別合計の2倍を超える (集計表の総数の取り違え) ときは
+    totalVotes と得票数、それも合わなければ政党別合計を使う。
+    """
+    parties = block['parties']
+    listed = sum(p['votes'] for p in parties)
+    votes = {p['party']: p['votes'] for p in parties}
+    rated = [p for p in parties if p['votes'] > 0 and p.get('voteRate')]
+    if rated and sum(p['voteRate'] for p in parties) <= 100.5:
+        implied = float(np.median([p['votes'] / p['voteRate'] * 100 for p in rated]))
+        if implied <= listed * 2:
+            return implied, {p['party']: p['voteRate'] / 100 * implied for p in parties}
+    if listed <= block['totalVotes'] <= listed * 2:
+        return block['totalVotes'], votes
+    if listed:
+        print(f"  WARN {block['name']}: totalVotes={block['totalVotes']:,} / 政党別合計={listed:,} → 合計を使う")
+    return listed, votes
+
+
+def lineage_table():
+    """政党名 → 系列名。系列そのものを優先し、前身政党は最初に現れた系列に寄せる"""
+    table = {s: s for s in SERIES}
+    for s in SERIES:
+        for pred in party_lineage(s)[1:]:
+            table.setdefault(pred, s)
+    return table
+
+
+def series_of(name, table=None):
+    table = table or lineage_table()
+    return table.get(canonical_party(name), OTHER)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 集計
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def compute_rows(elections):
+    """[(種別, 年, データ)] → 年ごとの (得票率の行, 議席の行)
+
+    全選挙の政党を列にした得票・議席行列 [選挙 × 政党] と、政党 → 系列の
+    対応行列 [政党 × 系列] の積で系列ごとの合計を出す。
+    """
+    table = lineage_table()
+    columns = SERIES + [OTHER]
+    totals = [national_totals(data) for _, _, data in elections]
+    blocks = [[block_votes(b) for b in data['hirei']['blocks']] for _, _, data in elections]
+    parties = sorted({r['party'] for rows in totals for r in rows})
+    col = {p: j for j, p in enumerate(parties)}
+
+    votes = np.zeros((len(elections), len(parties)))
+    seats = np.zeros((len(elections), len(parties)), dtype=np.int64)
+    for i, rows in enumerate(totals):
+        for r in rows:
+            seats[i, col[r['party']]] = r['seats']
+        for _, block in blocks[i]:
+            for party, v in block.items():
+                votes[i, col[canonical_party(party)]] += v
+    mapping = np.zeros((len(parties), len(columns)), dtype=np.int64)
+    for p, j in col.items():
+        mapping[j, columns.index(table.get(p, OTHER))] = 1
+
+    valid = np.array([sum(v for v, _ in bs) for bs in blocks], dtype=np.float64)
+    by_series = votes @ mapping
+    # 「その他」は有効投票から系列の合計を引いた残り (集計表に個別の行がない諸派を含む)
+    by_series[:, -1] = np.maximum(valid - by_series[:, :-1].sum(axis=1), 0)
+    rates = np.round(by_series / np.maximum(valid, 1)[:, None] * 100, 2)
+    series_seats = seats @ mapping
+
+    out = []
+    for i, (kind, year, data) in enumerate(elections):
+        head = {'year': str(year), 'name': ELECTION_NAMES.get((kind, year), ''), 'date': data['electionDate']}
+        rate_row = {**head, **{c: float(rates[i, k]) for k, c in enumerate(columns)}}
+        seat_row = {**head, **{c: int(series_seats[i, k]) for k, c in enumerate(columns)}}
+        # 系列名と違う党名で集計した政党 (希望の党など) は note に残す
+        merged = [f'{p} {votes[i, j] / max(valid[i], 1) * 100:.2f}% を{table[p]}に計上'
+                  for p, j in col.items()
+                  if votes[i, j] > 0 and table.get(p, p) != p]
+        if merged:
+            rate_row['note'] = '、'.join(merged)
+        out.append((rate_row, seat_row))
+    return out
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# インクリメンタル
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def _load_cache(path=CACHE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_cache(cache, path=CACHE_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+
+
+def _merge(existing, computed, approximate=()):
+    """年ごとの行: 計算した年で置き換え、選挙ごとの JSON がない年は既存の行を残す
+
+    approximate の年 (概算値の JSON から計算した行) は既存の行がなければ入れる。
+    """
+    rows = {str(r['year']): r for r in existing}
+    for r in computed:
+        if r['year'] not in approximate or r['year'] not in rows:
+            rows[r['year']] = r
+    return [rows[y] for y in sorted(rows)]
+
+
+def build_trends(force=False, output=None, cache_path=CACHE_FILE):
+    """national_party_trends.json を書き出し、読み直した選挙の数を返す"""
+    output = output or output_path('elections', 'national_party_trends.json')
+    existing = {}
+    if os.path.exists(output):
+        with open(output, encoding='utf-8') as f:
+            existing = json.load(f)
+
+    cache = {} if force else _load_cache(cache_path)
+    code = {os.path.relpath(p, REPO_ROOT): file_hash(p) for p in CODE}
+    if cache.get('code') != code:
+        cache = {}
+    entries = cache.get('elections', {})
+
+    files = {}
+    for path in election_files():
+        m = _FILE.match(os.path.basename(path))
+        if m:
+            files[os.path.basename(path)] = (m.group('type'), int(m.group('year')), path)
+    hashes = {name: file_hash(path) for name, (_, _, path) in files.items()}
+    stale = sorted(name for name in files if entries.get(name, {}).get('hash') != hashes[name])
+
+    elections = []
+    for name in stale:
+        kind, year, path = files[name]
+        with open(path, encoding='utf-8') as f:
+            elections.append((kind, year, json.load(f)))
+    rows = compute_rows(elections) if elections else []
+    for name, (_, _, data), (rate_row, seat_row) in zip(stale, elections, rows):
+        entries[name] = {'hash': hashes[name], 'hirei': rate_row, 'seats': seat_row,
+                         'approximate': APPROXIMATE in data.get('note', '')}
+    entries = {name: e for name, e in entries.items() if name in files}
+
+    trends = {'source': SOURCE, 'note': _note(), **{k: v for k, v in existing.items() if k not in ('source', 'note')}}
+    for kind in ('shugiin', 'sangiin'):
+        mine = sorted((e for name, e in entries.items() if files[name][0] == kind), key=lambda e: e['hirei']['year'])
+        approximate = {e['hirei']['year'] for e in mine if e['approximate']}
+        for section in ('hirei', 'seats'):
+            key = f'{kind}_{section}'
+            trends[key] = _merge(existing.get(key, []), [e[section] for e in mine], approximate)
+
+    write_json(output, trends)
+    _save_cache({'code': code, 'elections': entries}, cache_path)
+    return len(stale)
+
+
+def _note():
+    table = lineage_table()
+    merged = [f'「{p}」→「{s}」' for p, s in table.items() if p != s]
+    return (f"政党名は現行名に標準化 (scripts/party_trends.py、dimensions.py の前身政党)。"
+            f"{'、'.join(merged)}として集計。系列にない政党は「{OTHER}」。")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='比例代表 得票率・議席の推移を生成')
+    parser.add_argument('--force', action='store_true', help='全年を読み直す')
+    args = parser.parse_args()
+    n = build_trends(force=args.force)
+    print(f'national_party_trends.json: {n} elections recomputed')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+変換スクリプト共通の入出力パス
+
+  ELECTION_INPUT_ROOT   ソース Excel の置き場所 (既定: <repo>/temp_excel)
+  ELECTION_OUTPUT_ROOT  JSON 出力先 (既定: <repo>/public/data)
+
+build_all.py の --input-root / --output-root はこの環境変数を設定する。
+"""
+import os
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def input_root():
+    return os.environ.get('ELECTION_INPUT_ROOT', os.path.join(REPO_ROOT, 'temp_excel'))
+
+
+def output_root():
+    return os.environ.get('ELECTION_OUTPUT_ROOT', os.path.join(REPO_ROOT, 'public', 'data'))
+
+
+def input_path(*parts):
+    return os.path.join(input_root(), *parts)
+
+
+def output_path(*parts):
+    return os.path.join(output_root(), *parts)
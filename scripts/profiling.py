@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+変換スクリプトのステージ別プロファイル (--profile)
+
+各変換スクリプトは抽出ステージ (extract_hirei_votes 等) を Profiler.run() 経由で
+呼ぶ。--profile 指定時 (または ELECTION_PROFILE=1) のみ計測し、ステージごとに
+
+  wall        経過時間
+  cells       参照したセル数 (workbook_session.CELL_STATS)
+  decodes     正規表現によるセル文字列のデコード回数 (cell_decode のメモ未ヒット分)
+  memo hits   メモ化でデコードを省略した回数
+  peak        tracemalloc のピークメモリ
+
+を表示する。全体の cProfile を .build/profile/<スクリプト名>.prof に、
+ステージ別の結果を同名の .json に保存する。.prof は pstats 形式で、
+snakeviz / flameprof / gprof2dot でフレームグラフ・コールグラフにできる。
+
+  python scripts/convert_sangiin_2022.py --profile
+  python scripts/build_all.py --profile --force
+"""
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from cell_decode import decode_stats
+from paths import REPO_ROOT
+from workbook_session import CELL_STATS
+
+PROFILE_DIR = os.path.join(REPO_ROOT, '.build', 'profile')
+
+
+def profile_requested(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    return '--profile' in argv or os.environ.get('ELECTION_PROFILE', '0') == '1'
+
+
+def _decode_totals():
+    stats = decode_stats().values()
+    return sum(s['decodes'] for s in stats), sum(s['hits'] for s in stats)
+
+
+class Profiler:
+    """抽出ステージの計測。無効時は run() が関数をそのまま呼ぶだけ。"""
+
+    def __init__(self, name, enabled=None, out_dir=PROFILE_DIR):
+        self.name = name
+        self.enabled = profile_requested() if enabled is None else enabled
+        self.out_dir = out_dir
+        self.stages = []
+        self._profile = None
+        self._start = None
+        if self.enabled:
+            tracemalloc.start()
+            self._profile = cProfile.Profile()
+            self._start = time.perf_counter()
+            self._profile.enable()
+
+    def run(self, stage, fn, *args, **kwargs):
+        if not self.enabled:
+            return fn(*args, **kwargs)
+
+        cells0 = CELL_STATS['cells']
+        decodes0, hits0 = _decode_totals()
+        tracemalloc.reset_peak()
+        mem0 = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            wall = time.perf_counter() - start
+            decodes1, hits1 = _decode_totals()
+            self.stages.append({
+                'stage': stage,
+                'wallMs': round(wall * 1000, 3),
+                'cells': CELL_STATS['cells'] - cells0,
+                'regexDecodes': decodes1 - decodes0,
+                'memoHits': hits1 - hits0,
+                'peakKB': round((tracemalloc.get_traced_memory()[1] - mem0) / 1024, 1),
+            })
+
+    def finish(self):
+        """計測を終了して結果を表示・保存"""
+        if not self.enabled:
+            return
+        self._profile.disable()
+        total = time.perf_counter() - self._start
+        tracemalloc.stop()
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        prof_path = os.path.join(self.out_dir, f'{self.name}.prof')
+        json_path = os.path.join(self.out_dir, f'{self.name}.json')
+        self._profile.dump_stats(prof_path)
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({'script': self.name, 'totalMs': round(total * 1000, 3), 'stages': self.stages},
+                      f, ensure_ascii=False, indent=2)
+
+        print(f'\n--- Profile: {self.name} ---')
+        print(f"  {'stage':36s} {'wall ms':>10s} {'cells':>10s} {'decodes':>9s} {'memo hits':>10s} {'peak KB':>10s}")
+        for s in self.stages:
+            print(f"  {s['stage']:36s} {s['wallMs']:10.1f} {s['cells']:10d} {s['regexDecodes']:9d} "
+                  f"{s['memoHits']:10d} {s['peakKB']:10.1f}")
+        print(f'  total {total * 1000:.1f} ms')
+        print(f'  cProfile: {os.path.relpath(prof_path, REPO_ROOT)}')
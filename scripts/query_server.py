@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+変換済みデータのローカル問い合わせ API (asyncio、標準ライブラリのみ)
+
+ページは JSON ファイルをまるごと取得してブラウザで絞り込んでいる。このサーバは
+起動時に出力ルートの JSON を読み込み、年・選挙種別・都道府県/ブロック/区市町村・
+政党で絞り込んだ部分だけを返す。外部サービスには接続しない。
+
+  GET /health                              件数とキャッシュの状態
+  GET /elections?type=shugiin&year=2024    全国選挙の一覧
+  GET /elections/{type}_{year}             全国選挙 (elections/*.json + 分割ファイルの候補者)
+        ?section=hirei,shou,national  block=近畿,8  prefecture=東京都,13  party=自民党,1
+  GET /municipalities                      区市町村別データセットの一覧 (tokyo-*.json)
+  GET /municipalities/{dataset}            例: tokyo-shou-detailed
+        ?municipality=千代田区  district=1区  type=区部  party=自由民主党
+  GET /ota?district=4区&year=2024&section=hirei&party=...   ota-election-master.json
+
+パラメータはカンマ区切りまたは繰り返しで複数指定できる。政党は正式名・略称・表記ゆれ・ID、
+都道府県・ブロックは名称・ID (dimensions.py) のどちらでもよく、都道府県に
+合区の構成県を指定するとその合区が含まれる。
+
+応答は本文の sha256 を強い ETag にして LRU キャッシュに保持し
+(正規化したパスとパラメータがキー)、If-None-Match が一致すれば 304 を返す。
+Cache-Control: no-cache なのでブラウザは毎回条件付き GET で再検証する。
+データは起動時のものを使う (変換後はサーバを再起動する)。
+
+使い方:
+  python scripts/query_server.py                       # http://127.0.0.1:8787
+  python scripts/query_server.py --port 9000 --cache-size 512 --root /tmp/data
+"""
+import argparse
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+from dimensions import GOUKU, PARTIES, block_id, canonical_party, party_id, pref_id
+from election_shards import national_totals, shard_dir
+from paths import output_root
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8787
+CACHE_SIZE = 256
+
+# 区市町村別データセット (出力ルート直下)。行列形式は同じデータの別エンコードなので除く
+MUNICIPALITY_PATTERN = 'tokyo-*.json'
+MUNICIPALITY_EXCLUDE = ('.matrix.json',)
+_MUNICIPALITY_META = {'name', 'district', 'type', 'totalVotes', 'votes', 'total'}
+
+_PARTY_NAMES = {pid: name for pid, name, *_ in PARTIES}
+_PARTY_SHORT = {short: name for _, name, short, *_ in PARTIES}
+_GOUKU_MEMBERS = {gid: {pref_id(p) for p in prefs} for gid, _, prefs in GOUKU}
+
+HTTP_STATUS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+               405: 'Method Not Allowed'}
+
+
+class QueryError(Exception):
+    """400 / 404 で返すエラー"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LRUCache:
+    """キー → 値 の LRU (最大 maxsize 件)"""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.items.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.maxsize:
+            self.items.popitem(last=False)
+
+    def stats(self):
+        return {'size': len(self.items), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# パラメータ
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def _values(params, key):
+    """?key=a,b&key=c → ['a', 'b', 'c']"""
+    return [v.strip() for raw in params.get(key, []) for v in raw.split(',') if v.strip()]
+
+
+def _ids(values, lookup, kind):
+    """名称または数値 ID のリスト → ID の集合 (未知の値は 400)"""
+    ids = set()
+    for v in values:
+        i = int(v) if v.isdigit() else lookup(v)
+        if i is None:
+            raise QueryError(400, f'unknown {kind}: {v}')
+        ids.add(i)
+    return ids
+
+
+def party_filter(params):
+    """?party= → 正式名の集合 (指定なしは None = すべて)"""
+    values = _values(params, 'party')
+    if not values:
+        return None
+    names = set()
+    for v in values:
+        if v.isdigit():
+            if int(v) not in _PARTY_NAMES:
+                raise QueryError(400, f'unknown party: {v}')
+            names.add(_PARTY_NAMES[int(v)])
+        else:
+            names.add(_PARTY_SHORT.get(v) or canonical_party(v))
+    return names
+
+
+def _party_ok(name, parties):
+    return parties is None or canonical_party(name) in parties
+
+
+def _pref_ok(pid, wanted):
+    """合区 (ID 48-) は構成県の指定でも一致"""
+    return wanted is None or pid in wanted or bool(_GOUKU_MEMBERS.get(pid, set()) & wanted)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# データ
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def _load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class DataStore:
+    """起動時に読み込んだ出力データ"""
+
+    def __init__(self, root=None):
+        self.root = root or output_root()
+        self.elections = {}       # 'shugiin_2024' → {data, national, districts, lists}
+        self.municipalities = {}  # 'tokyo-shou-detailed' → data
+        self.ota = None
+        self.load()
+
+    def load(self):
+        start = time.perf_counter()
+        for path in sorted(glob.glob(os.path.join(self.root, 'elections', 's[ha]*giin_*.json'))):
+            name = os.path.splitext(os.path.basename(path))[0]
+            self.elections[name] = self._load_election(path)
+        for path in sorted(glob.glob(os.path.join(self.root, MUNICIPALITY_PATTERN))):
+            if path.endswith(MUNICIPALITY_EXCLUDE):
+                continue
+            name = os.path.splitext(os.path.basename(path))[0]
+            self.municipalities[name] = _load(path)
+        ota = os.path.join(self.root, 'ota-election-master.json')
+        self.ota = _load(ota) if os.path.exists(ota) else None
+        self.seconds = time.perf_counter() - start
+
+    @staticmethod
+    def _load_election(path):
+        """全体ファイル + 分割ファイルの選挙区別候補者・比例名簿"""
+        data = _load(path)
+        directory = shard_dir(path)
+        districts, lists = {}, {}
+        for shard in glob.glob(os.path.join(directory, 'shou', '*.json')):
+            pref = _load(shard)
+            if pref.get('districts'):
+                districts[pref_id(pref['prefecture'])] = pref['districts']
+        for shard in glob.glob(os.path.join(directory, 'hirei', '*.json')):
+            block = _load(shard)
+            if any(p.get('candidates') for p in block['parties']):
+                lists[block_id(block['name'])] = {p['party']: p['candidates'] for p in block['parties']}
+        return {'data': data, 'national': national_totals(data), 'districts': districts, 'lists': lists}
+
+    # ── 全国選挙 ──
+    def election_list(self, params):
+        types = set(_values(params, 'type'))
+        years = set(_values(params, 'year'))
+        out = []
+        for name, e in self.elections.items():
+            kind, year = name.split('_')
+            if (types and kind not in types) or (years and year not in years):
+                continue
+            data = e['data']
+            out.append({'name': name, 'type': kind, 'year': data['year'], 'electionDate': data['electionDate'],
+                        'hireiSeats': data['hirei']['totalSeats'], 'shouSeats': data['shou']['totalSeats']})
+        return {'elections': out}
+
+    def election(self, name, params):
+        e = self.elections.get(name)
+        if e is None:
+            raise QueryError(404, f'unknown election: {name}')
+        data = e['data']
+        sections = set(_values(params, 'section')) or {'hirei', 'shou', 'national'}
+        unknown = sections - {'hirei', 'shou', 'national'}
+        if unknown:
+            raise QueryError(400, f"unknown section: {', '.join(sorted(unknown))}")
+        parties = party_filter(params)
+        blocks = _ids(_values(params, 'block'), block_id, 'block') or None
+        prefs = _ids(_values(params, 'prefecture'), pref_id, 'prefecture') or None
+
+        out = {'name': name, 'year': data['year'], 'electionDate': data['electionDate']}
+        if 'national' in sections:
+            out['national'] = [r for r in e['national'] if _party_ok(r['party'], parties)]
+        if 'hirei' in sections:
+            out['hirei'] = {'totalSeats': data['hirei']['totalSeats'], 'blocks': [
+                {**b, 'parties': [
+                    {**p, 'candidates': e['lists'].get(block_id(b['name']), {}).get(p['party'], p.get('candidates', []))}
+                    for p in b['parties'] if _party_ok(p['party'], parties)]}
+                for b in data['hirei']['blocks'] if blocks is None or block_id(b['name']) in blocks
+            ]}
+        if 'shou' in sections:
+            selected = [p for p in data['shou']['prefectures'] if _pref_ok(pref_id(p['prefecture']), prefs)]
+            out['shou'] = {
+                'totalSeats': data['shou']['totalSeats'],
+                'prefectures': [{**p, 'partyResults': [r for r in p['partyResults'] if _party_ok(r['party'], parties)]}
+                                for p in selected],
+                'districts': [
+                    {**d, 'candidates': [c for c in d['candidates'] if _party_ok(c['party'], parties)]}
+                    for p in selected for d in e['districts'].get(pref_id(p['prefecture']), [])
+                ],
+            }
+        return out
+
+    # ── 区市町村別 ──
+    def municipality_list(self, params):
+        return {'datasets': [
+            {'name': name, 'electionType': d.get('electionType'), 'electionDate': d.get('electionDate'),
+             'municipalities': len(d.get('municipalities') or d.get('constituencies') or [])}
+            for name, d in self.municipalities.items()
+        ]}
+
+    def municipality(self, name, params):
+        data = self.municipalities.get(name)
+        if data is None:
+            raise QueryError(404, f'unknown dataset: {name}')
+        parties = party_filter(params)
+        munis = set(_values(params, 'municipality')) or None
+        districts = set(_values(params, 'district')) or None
+        types = set(_values(params, 'type')) or None
+
+        if 'constituencies' in data:
+            # 小選挙区別 (tokyo-syosenkyoku.json): 選挙区 → 区域・候補者
+            return {**data, 'constituencies': [
+                {**c, 'candidates': [x for x in c['candidates'] if _party_ok(x['party'], parties)]}
+                for c in data['constituencies']
+                if (districts is None or c['district'] in districts)
+                and (munis is None or munis & set(c.get('areas', [])))
+            ]}
+
+        def keep(key):
+            return key in _MUNICIPALITY_META or _party_ok(key, parties)
+
+        rows = []
+        for m in data['municipalities']:
+            if (munis is not None and m['name'] not in munis) or \
+                    (districts is not None and m.get('district') not in districts) or \
+                    (types is not None and m.get('type') not in types):
+                continue
+            row = {k: v for k, v in m.items() if keep(k)}
+            if isinstance(m.get('votes'), dict):
+                row['votes'] = {p: v for p, v in m['votes'].items() if _party_ok(p, parties)}
+            rows.append(row)
+        listed = [p for p in data['parties'] if _party_ok(p['name'] if isinstance(p, dict) else p, parties)]
+        total = {k: v for k, v in data['total'].items() if k in ('totalVotes', '合計') or _party_ok(k, parties)}
+        return {**data, 'parties': listed, 'total': total, 'municipalities': rows}
+
+    # ── 大田区 (ota-election-master.json) ──
+    def ota_master(self, params):
+        if self.ota is None:
+            raise QueryError(404, 'ota-election-master.json not found')
+        parties = party_filter(params)
+        districts = set(_values(params, 'district')) or None
+        years = set(_values(params, 'year')) or None
+        sections = set(_values(params, 'section')) or None
+        out = {}
+        for district, entry in self.ota['data'].items():
+            if districts is not None and district not in districts:
+                continue
+            out[district] = {'years': {}}
+            for year, e in entry['years'].items():
+                if years is not None and year not in years:
+                    continue
+                sliced = {}
+                for key, value in e.items():
+                    if isinstance(value, dict) and 'results' in value:
+                        if sections is not None and key not in sections:
+                            continue
+                        value = {**value, 'results': [r for r in value['results'] if _party_ok(r['party'], parties)]}
+                    sliced[key] = value
+                out[district]['years'][year] = sliced
+        return {'region': self.ota.get('region'), 'data': out}
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# HTTP
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def etag_of(body):
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(header, etag):
+    """If-None-Match (カンマ区切り・W/ 付き・*) に etag が含まれるか"""
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(',')]
+    return '*' in tags or any(t.removeprefix('W/') == etag for t in tags)
+
+
+class QueryApp:
+    """パス → DataStore の問い合わせ。200 の応答を LRU キャッシュする"""
+
+    def __init__(self, store, cache_size=CACHE_SIZE):
+        self.store = store
+        self.cache = LRUCache(cache_size)
+
+    def route(self, path, params):
+        parts = [unquote(p) for p in path.strip('/').split('/') if p]
+        if parts == ['health']:
+            return {'ok': True, 'root': self.store.root, 'elections': len(self.store.elections),
+                    'municipalities': len(self.store.municipalities),
+                    'loadSeconds': round(self.store.seconds, 3), 'cache': self.cache.stats()}
+        if parts == ['elections']:
+            return self.store.election_list(params)
+        if len(parts) == 2 and parts[0] == 'elections':
+            return self.store.election(parts[1], params)
+        if parts == ['municipalities']:
+            return self.store.municipality_list(params)
+        if len(parts) == 2 and parts[0] == 'municipalities':
+            return self.store.municipality(parts[1], params)
+        if parts == ['ota']:
+            return self.store.ota_master(params)
+        raise QueryError(404, f'not found: {path}')
+
+    def respond(self, method, target, headers):
+        """→ (status, ヘッダー dict, 本文)"""
+        if method not in ('GET', 'HEAD'):
+            return self._error(405, f'method not allowed: {method}')
+        url = urlsplit(target)
+        pairs = sorted(parse_qsl(url.query, keep_blank_values=False))
+        key = f'{url.path.rstrip("/") or "/"}?{urlencode(pairs)}'
+
+        # /health はキャッシュの状態を返すので毎回作る
+        cached = None if url.path.rstrip('/') == '/health' else self.cache.get(key)
+        if cached is None:
+            params = {}
+            for k, v in pairs:
+                params.setdefault(k, []).append(v)
+            try:
+                result = self.route(url.path, params)
+            except QueryError as e:
+                return self._error(e.status, str(e))
+            body = json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            cached = (body, etag_of(body))
+            if url.path.rstrip('/') != '/health':
+                self.cache.put(key, cached)
+
+        body, etag = cached
+        response_headers = {
+            'Content-Type': 'application/json; charset=utf-8',
+            'ETag': etag,
+            'Cache-Control': 'no-cache',
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Expose-Headers': 'ETag',
+        }
+        if etag_matches(headers.get('if-none-match'), etag):
+            return 304, response_headers, b''
+        return 200, response_headers, body
+
+    @staticmethod
+    def _error(status, message):
+        body = json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+        return status, {'Content-Type': 'application/json; charset=utf-8',
+                        'Access-Control-Allow-Origin': '*'}, body
+
+
+async def _read_request(reader):
+    """→ (method, target, version, headers)。接続が閉じられたら None"""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    # 非 ASCII のまま送られた URL も受け付ける (latin-1 の str.split() は U+0085 等で切れる)
+    parts = line.decode('utf-8', 'replace').strip().split(' ')
+    if len(parts) != 3:
+        raise ValueError(f'bad request line: {line!r}')
+    headers = {}
+    while True:
+        h = await reader.readline()
+        if h in (b'\r\n', b'\n', b''):
+            break
+        k, _, v = h.decode('latin-1').partition(':')
+        headers[k.strip().lower()] = v.strip()
+    return parts[0], parts[1], parts[2], headers
+
+
+async def handle(app, reader, writer):
+    """1接続。HTTP/1.1 の keep-alive で続けて処理する"""
+    try:
+        while True:
+            method = None
+            try:
+                request = await _read_request(reader)
+            except (ValueError, asyncio.LimitOverrunError):
+                status, headers, body = QueryApp._error(400, 'bad request')
+                keep_alive = False
+            else:
+                if request is None:
+                    break
+                method, target, version, req_headers = request
+                status, headers, body = app.respond(method, target, req_headers)
+                keep_alive = version == 'HTTP/1.1' and req_headers.get('connection', '').lower() != 'close'
+            # HEAD は GET と同じヘッダー (Content-Length を含む) で本文なし
+            head = [f'HTTP/1.1 {status} {HTTP_STATUS.get(status, "")}',
+                    *(f'{k}: {v}' for k, v in headers.items()),
+                    f'Content-Length: {len(body)}',
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+            writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+            if method != 'HEAD':
+                writer.write(body)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionResetError, BrokenPipeError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(store, host=DEFAULT_HOST, port=DEFAULT_PORT, cache_size=CACHE_SIZE):
+    app = QueryApp(store, cache_size)
+    server = await asyncio.start_server(lambda r, w: handle(app, r, w), host, port)
+    print(f'Serving {store.root} on http://{host}:{port} '
+          f'({len(store.elections)} elections, {len(store.municipalities)} datasets, '
+          f'loaded in {store.seconds:.2f} s)')
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='変換済みデータのローカル問い合わせ API')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'待ち受けアドレス (既定: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'ポート (既定: {DEFAULT_PORT})')
+    parser.add_argument('--root', help='データのディレクトリ (既定: 出力ルート)')
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE, help=f'応答キャッシュの件数 (既定: {CACHE_SIZE})')
+    args = parser.parse_args()
+    store = DataStore(os.path.abspath(os.path.expanduser(args.root)) if args.root else None)
+    try:
+        asyncio.run(serve(store, args.host, args.port, args.cache_size))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+"""
+選挙結果の SQLite データベース (.build/results.sqlite)
+
+出力ルートの JSON (変換スクリプトの出力) を1つの SQLite に読み込み、選挙を
+またぐ問い合わせ (例: 東京都の区市町村別 自民党の得票率 2017–2026) を
+JSON を開かずに SQL で書けるようにする。build_all.py が変換の後に作り直す。
+
+  elections    選挙 (shugiin_2024 等。統一地方選は local_prefectures_2023 等)
+  geographies  地域。level = nation / block / prefecture / gouku / district /
+               municipality / area (区市町村のうち1選挙区の部分) / polling (投票区)、
+               parent_id で上位の地域 (都道府県 → ブロック等)
+               code は nation '0'、block・prefecture・gouku は dimensions.py の ID、
+               district '{都道府県ID}-{区番号}'、municipality '{都道府県ID}:{名称}'、
+               area '{都道府県ID}:{区市町村}:{区番号}区'、
+               polling '{都道府県ID}:{区市町村}:{投票区番号}'
+  parties      政党。ID は dimensions.py (未登録の政党は 1000 以降)
+  results      選挙 × 地域 × 政党 × 種別 (hirei / shou / local) の得票・得票率・議席
+  totals       選挙 × 地域 × 種別 の総投票数・有権者数・投票率
+  candidates   選挙区の候補者
+  v_results    results に選挙・地域・政党の名前を付けたビュー
+
+同じ (選挙, 地域, 政党, 種別) が複数のファイルにあるときは先に読んだファイルの
+値を使う (全国選挙 → 東京都 → 大田区・目黒区 の順)。
+
+DB は一時ファイルに作って置き換える。挿入は表ごとの executemany で、全体を
+1つのトランザクションにまとめる。
+
+使い方:
+  python scripts/results_db.py build
+  python scripts/results_db.py query "SELECT year, geography, vote_rate FROM v_results
+      WHERE party = '自由民主党' AND level = 'municipality' AND tier = 'hirei' ORDER BY geography, year"
+  python scripts/results_db.py query --csv "SELECT * FROM elections"
+  python scripts/results_db.py tables
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+import unicodedata
+
+from dimensions import (BLOCKS, GOUKU, PARTIES, PREFECTURES, block_id, block_of, canonical_party,
+                        party_id, pref_id)
+from election_shards import national_totals, shard_dir
+from paths import REPO_ROOT, output_root
+
+DB_FILE = os.path.join(REPO_ROOT, '.build', 'results.sqlite')
+FORMAT = 'results-db/v1'
+
+# dimensions.py にない政党の ID
+EXTRA_PARTY_BASE = 1000
+RATE_DIGITS = 2
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE elections (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    type TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    date TEXT
+);
+CREATE TABLE geographies (
+    id INTEGER PRIMARY KEY,
+    level TEXT NOT NULL,
+    code TEXT NOT NULL,
+    name TEXT NOT NULL,
+    parent_id INTEGER REFERENCES geographies(id),
+    UNIQUE (level, code)
+);
+CREATE TABLE parties (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    short_name TEXT
+);
+CREATE TABLE results (
+    election_id INTEGER NOT NULL REFERENCES elections(id),
+    geography_id INTEGER NOT NULL REFERENCES geographies(id),
+    party_id INTEGER NOT NULL REFERENCES parties(id),
+    tier TEXT NOT NULL,
+    votes INTEGER,
+    vote_rate REAL,
+    seats INTEGER,
+    source TEXT NOT NULL,
+    PRIMARY KEY (election_id, geography_id, party_id, tier)
+) WITHOUT ROWID;
+CREATE TABLE totals (
+    election_id INTEGER NOT NULL REFERENCES elections(id),
+    geography_id INTEGER NOT NULL REFERENCES geographies(id),
+    tier TEXT NOT NULL,
+    total_votes INTEGER,
+    eligible_voters INTEGER,
+    turnout REAL,
+    seats INTEGER,
+    source TEXT NOT NULL,
+    PRIMARY KEY (election_id, geography_id, tier)
+) WITHOUT ROWID;
+CREATE TABLE candidates (
+    election_id INTEGER NOT NULL REFERENCES elections(id),
+    geography_id INTEGER NOT NULL REFERENCES geographies(id),
+    party_id INTEGER NOT NULL REFERENCES parties(id),
+    name TEXT NOT NULL,
+    votes INTEGER,
+    vote_rate REAL,
+    winner INTEGER,
+    source TEXT NOT NULL,
+    PRIMARY KEY (election_id, geography_id, name)
+) WITHOUT ROWID;
+CREATE INDEX results_party ON results (party_id, election_id, geography_id);
+CREATE INDEX results_geography ON results (geography_id, party_id, election_id);
+CREATE INDEX geographies_parent ON geographies (parent_id);
+CREATE INDEX candidates_party ON candidates (party_id, election_id);
+CREATE VIEW v_results AS
+SELECT e.name AS election, e.type AS election_type, e.year, g.level, g.code, g.name AS geography,
+       pg.name AS parent, p.name AS party, r.tier, r.votes, r.vote_rate, r.seats, r.source
+FROM results r
+JOIN elections e ON e.id = r.election_id
+JOIN geographies g ON g.id = r.geography_id
+LEFT JOIN geographies pg ON pg.id = g.parent_id
+JOIN parties p ON p.id = r.party_id;
+"""
+
+_ELECTION_FILE = re.compile(r'^(?P<type>shugiin|sangiin)_(?P<year>\d{4})$')
+_DISTRICT_NO = re.compile(r'(\d+)区')
+# 複数の選挙区にまたがる区市町村の行 (大田区4区、全角数字の表記あり)
+_AREA_NAME = re.compile(r'^(?P<municipality>.+?[区市町村])(?P<district>\d+)区$')
+_PREF_NAMES = {code: name for code, name, _ in PREFECTURES}
+_BLOCK_NAMES = dict(BLOCKS)
+_GOUKU_NAMES = {gid: name for gid, name, _ in GOUKU}
+
+
+def _rate(votes, total):
+    return round(votes / total * 100, RATE_DIGITS) if total else None
+
+
+class ResultsLoader:
+    """読み込んだ行を表ごとに保持する (ID の割り当てと重複の除外)"""
+
+    def __init__(self):
+        self.elections = {}   # name → (id, type, year, date)
+        self.geos = {}        # (level, code) → (id, name, parent_id)
+        self.parties = {pid: (pid, name, short) for pid, name, short, *_ in PARTIES}
+        self.extra_parties = {}
+        self.results = {}     # (election, geography, party, tier) → (votes, rate, seats, source)
+        self.totals = {}
+        self.candidates = {}
+        self.duplicates = 0
+        self.election_dates = {}
+        self.area_parents = {}  # area → municipality
+        self.memberships = {}   # (選挙, municipality) → その選挙の district (小選挙区の行の district 列)
+
+    # ── 選挙 ──
+    def election(self, name, kind, year, date=None):
+        if name not in self.elections:
+            self.elections[name] = (len(self.elections) + 1, kind, int(year), date)
+            if date:
+                self.election_dates.setdefault(date, name)
+        return self.elections[name][0]
+
+    def election_on(self, date, kind='shugiin'):
+        """投票日 → 選挙 (区市町村別データは全国選挙と投票日で対応付ける)"""
+        name = self.election_dates.get(date)
+        if name is None:
+            name = f'{kind}_{date[:4]}'
+            self.election(name, kind, date[:4], date)
+        return self.elections[name][0]
+
+    # ── 地域 ──
+    def geo(self, level, code, name, parent=None):
+        key = (level, str(code))
+        if key not in self.geos:
+            self.geos[key] = (len(self.geos) + 1, name, parent)
+        return self.geos[key][0]
+
+    def nation(self):
+        return self.geo('nation', 0, '全国')
+
+    def block(self, name):
+        bid = block_id(name)
+        if bid is None:
+            raise ValueError(f'unknown block: {name}')
+        if bid == 0:
+            return self.nation()
+        return self.geo('block', bid, _BLOCK_NAMES[bid], self.nation())
+
+    def prefecture(self, name):
+        """都道府県 (合区は gouku)"""
+        pid = pref_id(name)
+        if pid is None:
+            raise ValueError(f'unknown prefecture: {name}')
+        if pid in _GOUKU_NAMES:
+            return self.geo('gouku', pid, _GOUKU_NAMES[pid], self.nation())
+        pref = _PREF_NAMES[pid]
+        return self.geo('prefecture', pid, pref, self.block(block_of(pref)))
+
+    def district(self, pref, number):
+        number = int(number)
+        return self.geo('district', f'{pref_id(pref)}-{number}', f'{pref}{number}区', self.prefecture(pref))
+
+    def municipality(self, pref, name):
+        return self.geo('municipality', f'{pref_id(pref)}:{name}', name, self.prefecture(pref))
+
+    def area(self, pref, municipality, number):
+        """区市町村のうち選挙区に含まれる部分 (複数の選挙区にまたがる区市町村)"""
+        parent = self.district(pref, number)
+        gid = self.geo('area', f'{pref_id(pref)}:{municipality}:{int(number)}区',
+                       f'{municipality}({int(number)}区)', parent)
+        self.area_parents[gid] = self.municipality(pref, municipality)
+        return gid
+
+    def place(self, pref, name):
+        """区市町村別データの行名 → municipality または area ('大田区4区')"""
+        name = unicodedata.normalize('NFKC', name).strip()
+        m = _AREA_NAME.match(name)
+        if m:
+            return self.area(pref, m.group('municipality'), m.group('district'))
+        return self.municipality(pref, name)
+
+    def polling(self, pref, municipality, number):
+        parent = self.municipality(pref, municipality)
+        return self.geo('polling', f'{pref_id(pref)}:{municipality}:{number}', f'第{number}投票区', parent)
+
+    # ── 政党 ──
+    def party(self, name):
+        pid = party_id(name)
+        if pid is not None:
+            return pid
+        name = canonical_party(name)
+        if name not in self.extra_parties:
+            self.extra_parties[name] = EXTRA_PARTY_BASE + len(self.extra_parties)
+            self.parties[self.extra_parties[name]] = (self.extra_parties[name], name, None)
+        return self.extra_parties[name]
+
+    # ── 行 ──
+    def result(self, election, geo, party, tier, source, votes=None, rate=None, seats=None):
+        key = (election, geo, self.party(party), tier)
+        if key in self.results:
+            self.duplicates += 1
+            return
+        self.results[key] = (votes, rate, seats, source)
+
+    def total(self, election, geo, tier, source, total_votes=None, eligible=None, turnout=None, seats=None):
+        key = (election, geo, tier)
+        if key not in self.totals:
+            self.totals[key] = (total_votes, eligible, turnout, seats, source)
+
+    def candidate(self, election, geo, party, name, source, votes=None, rate=None, winner=None):
+        key = (election, geo, name)
+        if key not in self.candidates:
+            self.candidates[key] = (self.party(party), votes, rate, None if winner is None else int(winner), source)
+
+    def rollup_areas(self):
+        """area の得票を区市町村に合計する (区市町村全体の行がない選挙・種別のみ)"""
+        sums, totals = {}, {}
+        for (e, g, party, tier), (votes, _, _, source) in self.results.items():
+            muni = self.area_parents.get(g)
+            if muni is not None and votes is not None:
+                key = (e, muni, party, tier)
+                prev = sums.get(key, (0, source))
+                sums[key] = (prev[0] + votes, prev[1])
+        for (e, g, tier), (total, eligible, *_) in self.totals.items():
+            muni = self.area_parents.get(g)
+            if muni is not None and total is not None:
+                prev = totals.get((e, muni, tier), (0, 0))
+                totals[(e, muni, tier)] = (prev[0] + total, prev[1] + (eligible or 0))
+        covered = {(e, g, tier) for e, g, _, tier in self.results}
+        for (e, muni, party, tier), (votes, source) in sums.items():
+            if (e, muni, tier) in covered:
+                continue
+            total = totals.get((e, muni, tier), (0, 0))[0] or None
+            self.results[(e, muni, party, tier)] = (votes, _rate(votes, total) if total else None, None, source)
+        for (e, muni, tier), (total, eligible) in totals.items():
+            if (e, muni, tier) not in covered:
+                self.total(e, muni, tier, 'rollup', total_votes=total, eligible=eligible or None)
+
+    def write(self, conn):
+        """全表を executemany で挿入 (1トランザクション)"""
+        with conn:
+            conn.executemany('INSERT INTO meta VALUES (?, ?)', [
+                ('format', FORMAT), ('root', output_root()),
+                ('built', time.strftime('%Y-%m-%dT%H:%M:%S')),
+            ])
+            conn.executemany('INSERT INTO elections VALUES (?, ?, ?, ?, ?)',
+                             [(eid, name, kind, year, date) for name, (eid, kind, year, date) in self.elections.items()])
+            conn.executemany('INSERT INTO geographies VALUES (?, ?, ?, ?, ?)',
+                             [(gid, level, code, name, parent)
+                              for (level, code), (gid, name, parent) in self.geos.items()])
+            conn.executemany('INSERT INTO parties VALUES (?, ?, ?)', list(self.parties.values()))
+            conn.executemany('INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                             [k + v for k, v in self.results.items()])
+            conn.executemany('INSERT INTO totals VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                             [k + v for k, v in self.totals.items()])
+            conn.executemany('INSERT INTO candidates VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                             [(e, g, p, name, votes, rate, winner, source)
+                              for (e, g, name), (p, votes, rate, winner, source) in self.candidates.items()])
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# ファイル別の読み込み
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def _load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_national(db, path, source):
+    """elections/{shugiin,sangiin}_{year}.json (+ 分割ファイルの選挙区別候補者)"""
+    m = _ELECTION_FILE.match(os.path.splitext(os.path.basename(path))[0])
+    data = _load(path)
+    e = db.election(f"{m.group('type')}_{m.group('year')}", m.group('type'), m.group('year'), data['electionDate'])
+
+    nation = db.nation()
+    rows = national_totals(data)
+    for tier in ('hirei', 'shou'):
+        total = sum(r[f'{tier}Votes'] for r in rows)
+        for r in rows:
+            db.result(e, nation, r['party'], tier, source, r[f'{tier}Votes'],
+                      _rate(r[f'{tier}Votes'], total), r[f'{tier}Seats'])
+        db.total(e, nation, tier, source, total_votes=total,
+                 seats=data[tier]['totalSeats'])
+
+    for block in data['hirei']['blocks']:
+        g = db.block(block['name'])
+        db.total(e, g, 'hirei', source, total_votes=block['totalVotes'], seats=block['totalSeats'])
+        for p in block['parties']:
+            db.result(e, g, p['party'], 'hirei', source, p['votes'], p.get('voteRate'), p['seats'])
+    for pref in data['shou']['prefectures']:
+        g = db.prefecture(pref['prefecture'])
+        db.total(e, g, 'shou', source, seats=pref['totalDistricts'])
+        for p in pref['partyResults']:
+            db.result(e, g, p['party'], 'shou', source, p['totalVotes'], p.get('voteRate'), p['seats'])
+
+    districts = list(data['shou'].get('districts', []))
+    for shard in sorted(glob.glob(os.path.join(shard_dir(path), 'shou', '*.json'))):
+        districts.extend(_load(shard).get('districts', []))
+    for d in districts:
+        g = db.district(d['prefecture'], d['district'])
+        for c in d['candidates']:
+            db.candidate(e, g, c['party'], c['name'], source, c['votes'], c.get('voteRate'), c.get('result') == '当')
+            db.result(e, g, c['party'], 'shou', source, c['votes'], c.get('voteRate'), int(c.get('result') == '当'))
+
+
+def load_constituencies(db, path, source):
+    """tokyo-syosenkyoku.json (東京都の小選挙区別候補者)"""
+    data = _load(path)
+    e = db.election_on(data['electionDate'])
+    for c in data['constituencies']:
+        g = db.district('東京都', _DISTRICT_NO.search(c['district']).group(1))
+        db.total(e, g, 'shou', source, total_votes=c['totalVotes'], seats=1)
+        for x in c['candidates']:
+            db.candidate(e, g, x['party'], x['candidate'], source, x['votes'],
+                         _rate(x['votes'], c['totalVotes']), x.get('winner'))
+            db.result(e, g, x['party'], 'shou', source, x['votes'],
+                      _rate(x['votes'], c['totalVotes']), int(bool(x.get('winner'))))
+
+
+def load_municipalities(db, path, source):
+    """tokyo-*.json (東京都の区市町村別。政党が列の形式と votes 辞書の形式)"""
+    data = _load(path)
+    if 'municipalities' not in data:
+        return
+    e = db.election_on(data['electionDate'])
+    tier = 'hirei' if data['electionType'] == '比例代表' else 'shou'
+    names = [p['name'] if isinstance(p, dict) else p for p in data['parties']]
+    for m in data['municipalities']:
+        g = db.place('東京都', m['name'])
+        if m.get('district') and g not in db.area_parents:
+            db.memberships.setdefault((e, g), db.district('東京都', _DISTRICT_NO.search(m['district']).group(1)))
+        if isinstance(m.get('votes'), dict):
+            total = m.get('total')
+            db.total(e, g, tier, source, total_votes=total)
+            for party, votes in m['votes'].items():
+                db.result(e, g, party, tier, source, votes, _rate(votes, total))
+        else:
+            db.total(e, g, tier, source, total_votes=m.get('totalVotes'))
+            for party in names:
+                cell = m.get(party)
+                if isinstance(cell, dict):
+                    db.result(e, g, party, tier, source, cell.get('votes'), cell.get('rate'))
+
+
+def load_region(db, path, source):
+    """meguro-*.json (区の開票結果。候補者別または政党別)"""
+    data = _load(path)
+    e = db.election_on(data['electionDate'])
+    g = db.municipality('東京都', data['region'])
+    tier = 'hirei' if data['electionType'] == '比例代表' else 'shou'
+    db.total(e, g, tier, source, total_votes=data.get('totalVotes'), eligible=data.get('totalVoters'))
+    if 'candidates' in data:
+        votes = {}
+        for c in data['candidates']:
+            votes[c['party']] = votes.get(c['party'], 0) + c['votes']
+        for party, v in votes.items():
+            db.result(e, g, party, tier, source, v, _rate(v, sum(votes.values())))
+    else:
+        for p in data['parties']:
+            db.result(e, g, p['party'], tier, source, p['votes'], p.get('voteShare'))
+
+
+def load_election_master(db, path, source):
+    """ota-election-master.json (大田区の選挙区ごとの結果と投票区別投票率)"""
+    data = _load(path)
+    region = data.get('region', '大田区')
+    for district, entry in data['data'].items():
+        area = db.area('東京都', region, _DISTRICT_NO.search(district).group(1))
+        for year, y in entry['years'].items():
+            e = db.election_on(y['electionDate'])
+            for tier, key in (('shou', 'syosenkyoku'), ('hirei', 'hirei')):
+                part = y.get(key)
+                if not part:
+                    continue
+                db.total(e, area, tier, source, total_votes=part.get('totalVotes'))
+                for r in part['results']:
+                    db.result(e, area, r['party'], tier, source, r['votes'], r.get('rate'))
+            for d in y.get('districts', []):
+                p = db.polling('東京都', region, d['id'])
+                db.total(e, p, 'shou', source, total_votes=d.get('totalVoters'),
+                         eligible=d.get('dayOfEligibleVoters'), turnout=d.get('totalTurnoutRate'))
+
+
+def load_district_votes(db, path, source):
+    """ota-district-votes.json (大田区の投票区別 政党得票)"""
+    data = _load(path)
+    e = db.election_on(data['electionDate'])
+    region = data.get('region', '大田区')
+    for d in data['districts']:
+        g = db.polling('東京都', region, d['id'])
+        db.total(e, g, 'shou', source, total_votes=d.get('totalVotes'),
+                 eligible=d.get('eligibleVoters'), turnout=d.get('turnoutRate'))
+        for party in data['parties']:
+            cell = d.get(party)
+            if isinstance(cell, dict):
+                db.result(e, g, party, 'shou', source, cell.get('votes'), cell.get('rate'))
+
+
+def load_unified(db, path, source):
+    """unified-local-elections/*.json (統一地方選。得票率と当選者数のみ)"""
+    data = _load(path)
+    scope = 'wards' if 'ward' in os.path.basename(path) else 'prefectures'
+    # 1回分のファイル (prefectures_2015.json) は elections の下にない
+    elections = data.get('elections') or {data['date'][:4]: data}
+    for year, entry in elections.items():
+        e = db.election(f'local_{scope}_{year}', f'local_{scope}', year, entry.get('date'))
+        for row in entry.get(scope, []):
+            if scope == 'wards':
+                g = db.municipality(_PREF_NAMES[int(row['id'][:2])], row['name'])
+            else:
+                g = db.prefecture(_PREF_NAMES[int(row['id'])])
+            db.total(e, g, 'local', source, turnout=row.get('turnout'), seats=row.get('total_seats'))
+            seats = row.get('winner_count', {})
+            for party, rate in row.get('votes_by_party', {}).items():
+                db.result(e, g, party, 'local', source, rate=rate, seats=seats.get(party))
+
+
+# 読み込む順 (先のファイルの値が優先)
+SOURCES = [
+    ('elections/s[ha]*giin_*.json', load_national),
+    ('tokyo-syosenkyoku.json', load_constituencies),
+    ('tokyo-*.json', load_municipalities),
+    ('ota-election-master.json', load_election_master),
+    ('ota-district-votes.json', load_district_votes),
+    ('meguro-*.json', load_region),
+    ('unified-local-elections/*.json', load_unified),
+]
+EXCLUDE = ('.matrix.json',)
+
+
+def collect(root=None):
+    """出力ルートの JSON → ResultsLoader"""
+    root = root or output_root()
+    db = ResultsLoader()
+    seen = set()
+    for pattern, loader in SOURCES:
+        for path in sorted(glob.glob(os.path.join(root, pattern))):
+            if path in seen or path.endswith(EXCLUDE):
+                continue
+            seen.add(path)
+            loader(db, path, os.path.relpath(path, root))
+    db.rollup_areas()
+    return db
+
+
+def build_db(path=DB_FILE, root=None):
+    """DB を作り直し、ResultsLoader を返す"""
+    db = collect(root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript(SCHEMA)
+        db.write(conn)
+        conn.execute('ANALYZE')
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+    return db
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# CLI
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def connect(path=DB_FILE):
+    if not os.path.exists(path):
+        sys.exit(f'{path} not found (python scripts/results_db.py build)')
+    return sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+
+
+def _width(text):
+    # 全角文字は2桁
+    return sum(2 if unicodedata.east_asian_width(ch) in 'WF' else 1 for ch in text)
+
+
+def _pad(text, width):
+    return text + ' ' * (width - _width(text))
+
+
+def print_table(columns, rows):
+    cells = [[('' if v is None else str(v)) for v in row] for row in rows]
+    widths = [max([_width(c)] + [_width(r[i]) for r in cells]) for i, c in enumerate(columns)]
+    print('  '.join(_pad(c, w) for c, w in zip(columns, widths)).rstrip())
+    print('  '.join('-' * w for w in widths))
+    for r in cells:
+        print('  '.join(_pad(v, w) for v, w in zip(r, widths)).rstrip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='選挙結果の SQLite データベース')
+    parser.add_argument('--db', default=DB_FILE, help=f'DB ファイル (既定: {os.path.relpath(DB_FILE, REPO_ROOT)})')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help='出力ルートの JSON から作り直す')
+    query = sub.add_parser('query', help='SQL を実行して結果を表示')
+    query.add_argument('sql')
+    query.add_argument('params', nargs='*', help='? プレースホルダーの値')
+    fmt = query.add_mutually_exclusive_group()
+    fmt.add_argument('--csv', action='store_true', help='CSV で出力')
+    fmt.add_argument('--json', action='store_true', help='JSON で出力')
+    sub.add_parser('tables', help='表と行数を表示')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        db = build_db(args.db)
+        print(f'Output: {args.db}')
+        print(f'  {len(db.elections)} elections, {len(db.geos)} geographies, {len(db.parties)} parties, '
+              f'{len(db.results)} results, {len(db.candidates)} candidates '
+              f'({time.perf_counter() - start:.2f} s)')
+        if db.duplicates:
+            print(f'  {db.duplicates} rows also present in an earlier file (first file used)')
+        return
+
+    conn = connect(args.db)
+    if args.command == 'tables':
+        names = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")]
+        print_table(['table', 'rows'], [(n, conn.execute(f'SELECT COUNT(*) FROM {n}').fetchone()[0]) for n in names])
+        return
+    try:
+        cur = conn.execute(args.sql, args.params)
+    except sqlite3.Error as e:
+        sys.exit(f'SQL error: {e}')
+    columns = [d[0] for d in cur.description or []]
+    rows = cur.fetchall()
+    if args.csv:
+        w = csv.writer(sys.stdout)
+        w.writerow(columns)
+        w.writerows(rows)
+    elif args.json:
+        print(json.dumps([dict(zip(columns, r)) for r in rows], ensure_ascii=False, indent=2))
+    else:
+        print_table(columns, rows)
+        print(f'({len(rows)} rows)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+小選挙区 候補者別得票数のストリーミング抽出 (ShouDistrict / ShouCandidate)
+
+全国の小選挙区 (289区) の候補者は1選挙あたり約1,100行。総務省の当選人数・
+党派別得票の集計表 (変換スクリプトの SHOU_FILE 等) には候補者がないため、
+候補者別得票数の表を別のワークブック (各変換スクリプトの CANDIDATE_FILE) から読む。
+シートを実体化せずに Workbook.stream_rows() で1行ずつ読み、選挙区が変わるたびに
+その選挙区の ShouDistrict を1件ずつ yield する。同時に保持するのは1選挙区分の候補者だけ。
+
+候補者表は列の位置ではなく見出しで検出する (先頭 HEADER_SCAN 行に
+「候補者名」「党派」「得票数」を含み「名簿順位」を含まない行があるシートを
+候補者表とみなす)。
+
+  都道府県 列があればその値、なければ選挙区の値から
+  選挙区   '北海道1区' / '北海道第１区' / '1区' / 1 (都道府県は直前の値を引き継ぐ)
+           都道府県名だけの行は見出しとして扱う。空欄は前の行の選挙区 (結合セル)
+  候補者名 空欄・'計' の行は読み飛ばす
+  得票率   列がない・空欄なら選挙区内の得票数から計算
+  当落     列がなければ最多得票者を '当'
+  重複     '○' 等の記号があれば比例との重複立候補
+
+選挙区は都道府県順に並んでいる前提で、election_shards.write_shards() が
+都道府県ごとにまとめてシャードに書き出す。
+"""
+import re
+
+from cell_decode import clean_name, clean_party, safe_num, safe_rate
+from dimensions import PREFECTURE_NAMES
+from label_index import PatternMatcher, normalize_label
+
+HEADER_SCAN = 10
+
+# 見出し → 列の役割 (宣言順が優先)
+HEADER_LABELS = {
+    '都道府県': 'prefecture',
+    '選挙区': 'district',
+    '候補者名': 'name',
+    '氏名': 'name',
+    '党派': 'party',
+    '政党': 'party',
+    '得票率': 'rate',
+    '得票数': 'votes',
+    '当落': 'result',
+    '重複': 'dual',
+    '順位': 'rank',
+}
+HEADER_MATCHER = PatternMatcher(HEADER_LABELS)
+REQUIRED_ROLES = ('name', 'party', 'votes')
+# 名簿順位のある表は比例代表の名簿 (hirei_revival.py が読む)
+EXCLUDED_ROLES = ('rank',)
+
+_DISTRICT = re.compile(r'^(?P<pref>.+?[都道府県])?第?(?P<num>\d+)区?$')
+_NO_MARK = {'', '-', '−', '―', '‐', '×'}
+_SKIP_NAMES = {'計', '合計', '小計'}
+
+
+def header_columns(row):
+    """候補者表の見出し行なら {役割: 列}、そうでなければ None"""
+    columns = {}
+    for c, val in enumerate(row):
+        label = HEADER_MATCHER.best(val) if isinstance(val, str) else None
+        if label is not None:
+            columns.setdefault(HEADER_LABELS[label], c)
+    if any(r not in columns for r in REQUIRED_ROLES) or any(r in columns for r in EXCLUDED_ROLES):
+        return None
+    return columns
+
+
+def find_header(rows):
+    """先頭 HEADER_SCAN 行から見出し行を探す。見つかれば {役割: 列}、rows は次の行から続く"""
+    for i, row in enumerate(rows):
+        columns = header_columns(row)
+        if columns is not None or i + 1 >= HEADER_SCAN:
+            return columns
+    return None
+
+
+def parse_district(val, current_pref):
+    """選挙区セル → (都道府県, 区番号)。都道府県名のみなら (都道府県, None)"""
+    if isinstance(val, float) and val.is_integer():
+        val = int(val)
+    label = normalize_label(val)
+    if label in PREFECTURE_NAMES:
+        return label, None
+    m = _DISTRICT.match(label)
+    if not m:
+        return current_pref, None
+    return m.group('pref') or current_pref, int(m.group('num'))
+
+
+def _cell(row, columns, role):
+    c = columns.get(role)
+    return row[c] if c is not None and c < len(row) else None
+
+
+def _finish(pref, num, candidates, columns):
+    total = sum(c['votes'] for c in candidates)
+    for c in candidates:
+        if c['voteRate'] is None:
+            c['voteRate'] = round(c['votes'] / total * 100, 2) if total > 0 else 0.0
+    if 'result' not in columns and candidates:
+        max(candidates, key=lambda c: c['votes'])['result'] = '当'
+    candidates.sort(key=lambda c: -c['votes'])
+    return {'prefecture': pref, 'district': num, 'candidates': candidates}
+
+
+def iter_sheet_districts(rows):
+    """候補者表の行 → ShouDistrict を1件ずつ。候補者表でなければ何も返さない"""
+    rows = iter(rows)
+    columns = find_header(rows)
+    if columns is None:
+        return
+
+    pref, num, candidates = None, None, []
+    for row in rows:
+        row_pref = normalize_label(_cell(row, columns, 'prefecture'))
+        district = _cell(row, columns, 'district')
+        if row_pref in PREFECTURE_NAMES and row_pref != pref:
+            if candidates:
+                yield _finish(pref, num, candidates, columns)
+            pref, num, candidates = row_pref, None, []
+        if district not in (None, ''):
+            key = parse_district(district, pref)
+            if key != (pref, num):
+                if candidates:
+                    yield _finish(pref, num, candidates, columns)
+                (pref, num), candidates = key, []
+
+        name = clean_name(_cell(row, columns, 'name'))
+        if not name or normalize_label(name) in _SKIP_NAMES or pref is None or num is None:
+            continue
+        party = clean_party(_cell(row, columns, 'party') or '無所属')
+        result = normalize_label(_cell(row, columns, 'result'))
+        dual = normalize_label(_cell(row, columns, 'dual'))
+        rate = _cell(row, columns, 'rate')
+        candidates.append({
+            'name': name,
+            'party': party,
+            'votes': safe_num(_cell(row, columns, 'votes')),
+            'voteRate': None if rate in (None, '') else safe_rate(rate),
+            'result': '当' if '当' in result else '落',
+            'isDualCandidate': dual not in _NO_MARK,
+        })
+    if candidates:
+        yield _finish(pref, num, candidates, columns)
+
+
+def stream_shou_districts(wb):
+    """ワークブック内の全候補者表から ShouDistrict を1件ずつ返す"""
+    for name in wb.sheetnames:
+        yield from iter_sheet_districts(wb.stream_rows(name))
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+public/data のサイズレポートと予算チェック
+
+出力ルート以下の JSON/CSV ごとに raw / gzip / brotli のサイズを計算し、
+size_budgets.json の予算 (パターンごとの上限 KB と合計の上限) と比較する。
+予算超過があれば終了コード 1 (build_all.py はビルド失敗にする)。
+
+予算ファイル:
+  files: [{pattern, rawKB, gzipKB, brotliKB}]  出力ルートからの相対パス、最初に一致したものを使う
+  total: {rawKB, gzipKB, brotliKB, exclude}    全ファイルの合計 (exclude のパターンに一致するものは除く)
+
+使い方:
+  python scripts/size_report.py
+  python scripts/size_report.py --budgets my_budgets.json --json .build/size-report.json
+"""
+import argparse
+import fnmatch
+import gzip
+import json
+import os
+import sys
+
+from json_output import brotli, iter_data_files
+from paths import REPO_ROOT, output_root
+
+BUDGETS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'size_budgets.json')
+REPORT_FILE = os.path.join(REPO_ROOT, '.build', 'size-report.json')
+
+KINDS = ('raw', 'gzip', 'brotli')
+
+
+def load_budgets(path=BUDGETS_FILE):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def measure(path):
+    """{raw, gzip, brotli} バイト数 (brotli 未インストール時は None)"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return {
+        'raw': len(raw),
+        'gzip': len(gzip.compress(raw, compresslevel=9, mtime=0)),
+        'brotli': len(brotli.compress(raw, quality=11)) if brotli is not None else None,
+    }
+
+
+def _over(sizes, budget):
+    """予算超過の項目 [(種類, サイズ, 上限)]"""
+    over = []
+    for kind in KINDS:
+        limit = budget.get(f'{kind}KB')
+        size = sizes.get(kind)
+        if limit is not None and size is not None and size > limit * 1024:
+            over.append((kind, size, limit * 1024))
+    return over
+
+
+def build_report(root=None, budgets=None):
+    root = root or output_root()
+    budgets = budgets if budgets is not None else load_budgets()
+    files = []
+    for path in iter_data_files(root):
+        rel = os.path.relpath(path, root).replace(os.sep, '/')
+        sizes = measure(path)
+        budget = next((b for b in budgets.get('files', []) if fnmatch.fnmatch(rel, b['pattern'])), None)
+        over = _over(sizes, budget) if budget else []
+        files.append({
+            'path': rel,
+            **sizes,
+            'budget': budget['pattern'] if budget else None,
+            'over': [kind for kind, _, _ in over],
+        })
+
+    # 分割出力 (election_shards.py) は同じデータの別の読み込み単位なので合計から除く
+    exclude = budgets.get('total', {}).get('exclude', [])
+    counted = [f for f in files if not any(fnmatch.fnmatch(f['path'], pat) for pat in exclude)]
+    total = {kind: sum(f[kind] or 0 for f in counted) for kind in KINDS}
+    if brotli is None:
+        total['brotli'] = None
+    total_over = _over(total, budgets.get('total', {}))
+    return {
+        'root': root,
+        'files': files,
+        'total': total,
+        'totalOver': [kind for kind, _, _ in total_over],
+        'ok': not total_over and not any(f['over'] for f in files),
+    }
+
+
+def _kb(n):
+    return '       -' if n is None else f'{n / 1024:8.1f}'
+
+
+def print_report(report):
+    print(f"\n--- Size report: {report['root']} ---")
+    print(f"  {'file':56s} {'raw KB':>8s} {'gzip KB':>8s} {'br KB':>8s}")
+    for f in sorted(report['files'], key=lambda f: -(f['gzip'] or 0)):
+        mark = f"  OVER ({', '.join(f['over'])})" if f['over'] else ''
+        print(f"  {f['path']:56s} {_kb(f['raw'])} {_kb(f['gzip'])} {_kb(f['brotli'])}{mark}")
+    t = report['total']
+    mark = f"  OVER ({', '.join(report['totalOver'])})" if report['totalOver'] else ''
+    print(f"  {'total':56s} {_kb(t['raw'])} {_kb(t['gzip'])} {_kb(t['brotli'])}{mark}")
+    print('  budgets: OK' if report['ok'] else '  budgets: EXCEEDED')
+
+
+def save_report(report, path=REPORT_FILE):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='出力データのサイズレポートと予算チェック')
+    parser.add_argument('root', nargs='?', help='対象ディレクトリ (既定: 出力ルート)')
+    parser.add_argument('--budgets', default=BUDGETS_FILE, help='予算ファイル')
+    parser.add_argument('--json', default=REPORT_FILE, help='レポート JSON の保存先')
+    args = parser.parse_args(argv)
+
+    report = build_report(args.root, load_budgets(args.budgets))
+    print_report(report)
+    save_report(report, args.json)
+    return 0 if report['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+スイング・シミュレーション (一様スイング / ブロック別・都道府県別スイング)
+
+政党の得票率を何ポイント動かしたら議席がどう変わるかを計算する。
+小選挙区は選挙区ごとの得票率の行列 [選挙区 × 政党] にスイングを足して
+最多得票の政党を当選とし、比例代表は同じスイングをブロックの得票率に足して
+dhondt.allocate() で配分し直す。比例の配分には名簿の人数を上限 (caps) として渡す
+(名簿が足りずに議席を他党に譲った政党があるため。hirei_shares を参照)。
+
+  district_matrix(districts)   ShouDistrict → DistrictMatrix (得票率・ブロック・都道府県)
+  simulate(m, hirei, national, regional)
+                               K 通りのスイングをまとめて計算 → 議席 [K × 政党]
+  monte_carlo(...)             乱数のスイングを CHUNK 通りずつプロセスプールで計算し、
+                               政党別の議席分布・選挙区ごとの当選確率を集計
+
+スイングはポイント (得票率 % の差)。national [K × 政党] は全選挙区に、
+regional [K × 地域 × 政党] は地域 (ブロック ID または都道府県 ID) ごとに足す。
+候補者のいない政党にはスイングを足さない (擁立区は変わらない前提)。
+同じ政党の候補者が1選挙区に複数いる場合 (無所属など) は得票の多い1人で代表する。
+
+出力 (elections/{type}_{year}/swing.json、シャードを書き直しても残る):
+  parties     政党別の実際の議席・シナリオでの平均・パーセンタイル・分布
+  districts   選挙区ごとの各党の当選確率
+
+使い方:
+  python scripts/swing.py shugiin_2024 --swing 自由民主党=-3 立憲民主党=+2
+  python scripts/swing.py shugiin_2024 --swing 近畿:日本維新の会=-5
+  python scripts/swing.py shugiin_2024 --scenarios 10000 --sd 2 --regional-sd 1
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+from dhondt import allocate, vote_matrix
+from dimensions import block_id, block_of, canonical_party, party_id, pref_id
+from election_shards import election_files, shard_dir
+from json_output import write_json
+
+FORMAT = 'swing-simulation/v1'
+CHUNK = 1000                # 1プロセスが一度に計算するシナリオ数
+REGIONS = ('block', 'prefecture')
+PERCENTILES = (5, 50, 95)
+
+
+class DistrictMatrix(NamedTuple):
+    parties: list         # 政党名 (列、dimensions.canonical_party)
+    districts: list       # (都道府県, 区番号)
+    shares: np.ndarray    # [選挙区 × 政党] 得票率 (%)、候補者なしは nan
+    block: np.ndarray     # [選挙区] ブロック ID
+    pref: np.ndarray      # [選挙区] 都道府県 ID
+
+
+class HireiShares(NamedTuple):
+    shares: np.ndarray    # [ブロック × 政党] 得票率 (%)
+    total_votes: np.ndarray  # [ブロック]
+    total_seats: np.ndarray  # [ブロック] 定数
+    block: np.ndarray     # [ブロック] ブロック ID
+    caps: np.ndarray      # [ブロック × 政党] 当選できる名簿の人数 (上限なしは定数)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 入力
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def load_districts(path):
+    """elections/{type}_{year}.json のシャードから ShouDistrict を1件ずつ"""
+    root = shard_dir(path)
+    with open(os.path.join(root, 'index.json'), encoding='utf-8') as f:
+        index = json.load(f)
+    for pref in index['shou']['prefectures']:
+        if 'shard' not in pref:
+            continue
+        with open(os.path.join(root, pref['shard']), encoding='utf-8') as f:
+            yield from json.load(f)['districts']
+
+
+def _party_columns(districts, blocks):
+    parties = {}
+    for b in blocks:
+        for p in b['parties']:
+            parties.setdefault(canonical_party(p['party']), len(parties))
+    for d in districts:
+        for c in d['candidates']:
+            parties.setdefault(canonical_party(c['party']), len(parties))
+    return parties
+
+
+def district_matrix(districts, parties):
+    """ShouDistrict のリスト → DistrictMatrix (parties: 政党名 → 列)"""
+    shares = np.full((len(districts), len(parties)), np.nan)
+    for i, d in enumerate(districts):
+        total = sum(c['votes'] for c in d['candidates'])
+        for c in d['candidates']:
+            j = parties[canonical_party(c['party'])]
+            share = c['votes'] / total * 100 if total > 0 else 0.0
+            shares[i, j] = share if np.isnan(shares[i, j]) else max(shares[i, j], share)
+    pref = np.array([pref_id(d['prefecture']) or 0 for d in districts], dtype=np.intp)
+    block = np.array([block_id(block_of(d['prefecture'])) or 0 for d in districts], dtype=np.intp)
+    return DistrictMatrix(list(parties), [(d['prefecture'], d['district']) for d in districts],
+                          shares, block, pref)
+
+
+def hirei_shares(blocks, parties):
+    """HireiBlock のリスト → HireiShares (列は district_matrix と同じ)
+
+    caps は名簿の候補者 (小選挙区の当選者を除いた HireiCandidate) があればその人数。
+    名簿がなくても、実際の得票で配分した議席が実際の議席より多い政党は名簿が
+    尽きた政党なので、実際の議席を上限にする (スイングなしで実際の議席に戻る)。
+    """
+    m = vote_matrix(blocks)
+    nb, p = len(blocks), len(parties)
+    shares = np.zeros((nb, p))
+    actual = np.zeros((nb, p), dtype=np.int64)
+    listed = np.zeros((nb, p), dtype=np.int64)
+    has_list = np.zeros((nb, p), dtype=bool)
+    totals = np.array([b['totalVotes'] or sum(q['votes'] for q in b['parties']) for b in blocks], dtype=np.float64)
+    for j, name in enumerate(m.parties):
+        shares[:, parties[canonical_party(name)]] += m.votes[:, j] / np.maximum(totals, 1) * 100
+    for i, b in enumerate(blocks):
+        for q in b['parties']:
+            j = parties[canonical_party(q['party'])]
+            actual[i, j] += q['seats']
+            if q.get('candidates'):
+                listed[i, j] += len(q['candidates'])
+                has_list[i, j] = True
+    caps = np.where(has_list, listed, m.total_seats[:, None])
+    baseline = allocate(shares * totals[:, None], m.total_seats, caps)
+    caps = np.where(baseline > actual, actual, caps)
+    block = np.array([block_id(b['name']) or 0 for b in blocks], dtype=np.intp)
+    return HireiShares(shares, totals, m.total_seats, block, caps)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# シミュレーション
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def region_size(by):
+    return 12 if by == 'block' else 50
+
+
+def simulate(m, hirei, national, regional=None, by='block'):
+    """K 通りのスイングを適用した議席
+
+    national: [K × 政党] ポイント。regional: [K × 地域 × 政党] (by の ID で引く)
+    戻り値: (小選挙区の当選政党 [K × 選挙区], 小選挙区議席 [K × 政党], 比例議席 [K × 政党])
+    """
+    national = np.atleast_2d(np.asarray(national, dtype=np.float64))
+    k, p = national.shape
+
+    # 小選挙区: [K × 選挙区 × 政党]
+    swing = national[:, None, :]
+    if regional is not None:
+        swing = swing + regional[:, m.block if by == 'block' else m.pref, :]
+    shares = m.shares[None, :, :] + swing
+    shares = np.where(np.isnan(shares), -np.inf, shares)
+    if m.shares.shape[0]:
+        winners = np.argmax(shares, axis=2)
+        offsets = np.arange(k)[:, None] * p
+        shou = np.bincount((winners + offsets).ravel(), minlength=k * p).reshape(k, p)
+    else:
+        winners = np.zeros((k, 0), dtype=np.intp)
+        shou = np.zeros((k, p), dtype=np.int64)
+
+    # 比例: [K × ブロック × 政党] の得票数を作り直して一括配分 (都道府県別スイングは全国分のみ)
+    hirei_swing = national[:, None, :]
+    if regional is not None and by == 'block':
+        hirei_swing = hirei_swing + regional[:, hirei.block, :]
+    standing = hirei.shares > 0
+    h_shares = np.where(standing, np.clip(hirei.shares[None] + hirei_swing, 0, None), 0)
+    votes = h_shares * hirei.total_votes[None, :, None]
+    nb = hirei.shares.shape[0]
+    seats = allocate(votes.reshape(k * nb, p), np.tile(hirei.total_seats, k), np.tile(hirei.caps, (k, 1)))
+    hirei_seats = seats.reshape(k, nb, p).sum(axis=1)
+    return winners, shou, hirei_seats
+
+
+def _run_chunk(args):
+    """プロセスプールの1単位: 乱数のスイング n 通りの (議席 [n × 政党], 当選回数 [選挙区 × 政党])"""
+    m, hirei, seed, n, mean, regional_mean, sd, regional_sd, by = args
+    rng = np.random.default_rng(seed)
+    p = len(m.parties)
+    national = mean + rng.normal(0.0, sd, size=(n, p))
+    regional = regional_mean + rng.normal(0.0, regional_sd, size=(n, region_size(by), p))
+    winners, shou, hirei_seats = simulate(m, hirei, national, regional, by)
+    d = m.shares.shape[0]
+    wins = np.bincount((winners + np.arange(d) * p).ravel(), minlength=d * p).reshape(d, p)
+    return shou + hirei_seats, shou, wins
+
+
+def monte_carlo(m, hirei, scenarios, mean=None, regional_mean=None, sd=2.0, regional_sd=1.0,
+                by='block', seed=0, workers=None):
+    """乱数のスイングで scenarios 通りを計算し (議席 [K × 政党], 小選挙区議席, 当選回数) を返す
+
+    mean [政党] / regional_mean [地域 × 政党] はスイングの平均 (parse_swings の戻り値)。
+    """
+    p = len(m.parties)
+    mean = np.zeros(p) if mean is None else mean
+    regional_mean = np.zeros((region_size(by), p)) if regional_mean is None else regional_mean
+    sizes = [min(CHUNK, scenarios - i) for i in range(0, scenarios, CHUNK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(m, hirei, s, n, mean, regional_mean, sd, regional_sd, by) for s, n in zip(seeds, sizes)]
+    if workers == 1 or len(jobs) == 1:
+        results = list(map(_run_chunk, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_chunk, jobs))
+    seats = np.concatenate([r[0] for r in results])
+    shou = np.concatenate([r[1] for r in results])
+    wins = sum(r[2] for r in results)
+    return seats, shou, wins
+
+
+def summarize(m, hirei_seats_actual, shou_actual, seats, shou, wins, params, total):
+    """swing.json の内容 (total: 総定数 = 比例 + 小選挙区の totalSeats)
+
+    候補者別データがない選挙区はシナリオの議席に入らないので、過半数は
+    シナリオの議席の合計ではなく総定数から求める。
+    """
+    k = seats.shape[0]
+    majority = total // 2 + 1
+    parties = []
+    for j in np.argsort(-seats.mean(axis=0), kind='stable'):
+        col = seats[:, j]
+        if col.max() == 0 and shou_actual[j] + hirei_seats_actual[j] == 0:
+            continue
+        lo = int(col.min())
+        parties.append({
+            'party': m.parties[j],
+            'partyId': party_id(m.parties[j]),
+            'actual': int(shou_actual[j] + hirei_seats_actual[j]),
+            'mean': round(float(col.mean()), 2),
+            'shouMean': round(float(shou[:, j].mean()), 2),
+            **{f'p{q}': int(v) for q, v in zip(PERCENTILES, np.percentile(col, PERCENTILES, method='nearest'))},
+            'min': lo,
+            'max': int(col.max()),
+            'majority': round(float((col >= majority).mean()), 4),
+            # 議席数 min, min+1, … のシナリオ数
+            'histogram': np.bincount(col - lo).tolist(),
+        })
+    districts = []
+    for i, (pref, num) in enumerate(m.districts):
+        probs = wins[i] / max(k, 1)
+        top = np.flatnonzero(probs)
+        districts.append({
+            'prefecture': pref,
+            'prefId': int(m.pref[i]),
+            'district': num,
+            'win': [[int(j), round(float(probs[j]), 4)] for j in top[np.argsort(-probs[top])]],
+        })
+    return {
+        'format': FORMAT,
+        'scenarios': k,
+        'params': params,
+        'totalSeats': total,
+        'majority': majority,
+        'partyNames': m.parties,
+        'parties': parties,
+        'districts': districts,
+    }
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# CLI
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def parse_swings(specs, parties, by):
+    """'政党=+2' / 'ブロック:政党=-3' / '都道府県:政党=-3' → (national [政党], regional [地域 × 政党])"""
+    national = np.zeros(len(parties))
+    regional = np.zeros((region_size(by), len(parties)))
+    for spec in specs or []:
+        target, _, value = spec.partition('=')
+        region, _, party = target.rpartition(':')
+        name = canonical_party(party)
+        if name not in parties:
+            raise SystemExit(f'unknown party: {party}')
+        if not region:
+            national[parties[name]] += float(value)
+            continue
+        rid = block_id(region) if by == 'block' else pref_id(region)
+        if rid is None:
+            raise SystemExit(f'unknown {by}: {region}')
+        regional[rid, parties[name]] += float(value)
+    return national, regional
+
+
+def _actual(m, parties, districts, blocks):
+    shou = np.zeros(len(parties), dtype=np.int64)
+    for d in districts:
+        for c in d['candidates']:
+            if c['result'] == '当':
+                shou[parties[canonical_party(c['party'])]] += 1
+    hirei = np.zeros(len(parties), dtype=np.int64)
+    for b in blocks:
+        for p in b['parties']:
+            hirei[parties[canonical_party(p['party'])]] += p['seats']
+    return shou, hirei
+
+
+def main():
+    parser = argparse.ArgumentParser(description='小選挙区・比例のスイング・シミュレーション')
+    parser.add_argument('elections', nargs='*', help='対象 (例: shugiin_2024、省略時は衆院すべて)')
+    parser.add_argument('--by', choices=REGIONS, default='block', help='地域別スイングの単位')
+    parser.add_argument('--swing', nargs='*', metavar='[地域:]政党=ポイント',
+                        help='決定的なシナリオ (モンテカルロでは平均のずれ)')
+    parser.add_argument('--scenarios', type=int, default=0, help='モンテカルロのシナリオ数')
+    parser.add_argument('--sd', type=float, default=2.0, help='全国スイングの標準偏差 (ポイント)')
+    parser.add_argument('--regional-sd', type=float, default=1.0, help='地域スイングの標準偏差 (ポイント)')
+    parser.add_argument('--workers', type=int, help='プロセス数 (既定: CPU 数)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    files = [f for f in election_files(args.elections)
+             if args.elections or os.path.basename(f).startswith('shugiin_')]
+    for path in files:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        blocks = data['hirei']['blocks']
+        total_seats = data['hirei']['totalSeats'] + data['shou']['totalSeats']
+        districts = list(load_districts(path))
+        parties = _party_columns(districts, blocks)
+        m = district_matrix(districts, parties)
+        hirei = hirei_shares(blocks, parties)
+        shou_actual, hirei_actual = _actual(m, parties, districts, blocks)
+        national, regional = parse_swings(args.swing, parties, args.by)
+        name = os.path.splitext(os.path.basename(path))[0]
+        print(f'{name}: {len(districts)} districts, {len(blocks)} blocks, {len(parties)} parties')
+        if not districts:
+            print('  (候補者別データなし: 比例代表のみ)')
+        _, _, baseline = simulate(m, hirei, np.zeros((1, len(parties))))
+        if (baseline[0] != hirei_actual).any():
+            print('  WARN 比例: スイングなしの配分が実際の議席と一致しない (ブロックの得票を確認)')
+
+        if args.scenarios:
+            seats, shou, wins = monte_carlo(m, hirei, args.scenarios, national, regional, args.sd,
+                                            args.regional_sd, args.by, args.seed, args.workers)
+            params = {'swing': args.swing or [], 'sd': args.sd, 'regionalSd': args.regional_sd,
+                      'by': args.by, 'seed': args.seed, 'districts': len(districts)}
+            summary = summarize(m, hirei_actual, shou_actual, seats, shou, wins, params, total_seats)
+            output = os.path.join(shard_dir(path), 'swing.json')
+            write_json(output, summary)
+            for p in summary['parties'][:10]:
+                print(f"  {p['party']}: {p['actual']} → 平均 {p['mean']} "
+                      f"({p['p5']}〜{p['p95']}, 過半数 {p['majority']:.1%})")
+            print(f'  → {output}')
+        else:
+            _, shou, hirei_seats = simulate(m, hirei, national[None], regional[None], args.by)
+            for j in np.argsort(-(shou[0] + hirei_seats[0]), kind='stable'):
+                before = shou_actual[j] + hirei_actual[j]
+                after = shou[0, j] + hirei_seats[0, j]
+                if before or after:
+                    print(f'  {m.parties[j]}: {before} → {after} '
+                          f'(小選挙区 {shou_actual[j]} → {shou[0, j]}, 比例 {hirei_actual[j]} → {hirei_seats[0, j]})')
+
+
+if __name__ == '__main__':
+    main()
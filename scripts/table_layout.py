@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+宣言的テーブルレイアウト
+
+ソースファイルごとに「どのシートの、どの行・列に、何が入っているか」を
+table() で宣言し、compile_layout() でセル座標に解決する。extract() は
+シートごとに宣言済みの全セルを NumPy のファンシーインデックスで一括取得し、
+テーブル単位で decode 関数を適用する (dtype 指定時は cell_decode.decode_column)。
+
+座標はすべて 0-indexed (Excel の3行目 = 2、C列 = 2)。
+
+例:
+    VOTES = {
+        'votes': table(
+            anchor=label('北海道'),          # A列で最初に「北海道」が出る行
+            rows=PREFECTURE_NAMES,          # そこから47行を順に対応付け
+            columns={'自由民主党': 3, '立憲民主党': 6},
+            decode=safe_num, dtype='int64',
+        ),
+    }
+    data = compile_layout(VOTES, wb).extract()
+    data['votes']['北海道']['自由民主党']
+"""
+import numpy as np
+
+from cell_decode import decode_column
+from label_index import normalize_label
+from workbook_session import CELL_STATS
+
+
+def label(text, col=0, nth=0):
+    """アンカー: col 列で text を含む nth 番目 (0始まり) のセルの行"""
+    return {'label': text, 'col': col, 'nth': nth}
+
+
+def where(col, text):
+    """行選択: 開始行以降で col 列に text を含む行すべて (キーはセルの文字列)"""
+    return {'where': text, 'col': col}
+
+
+def table(rows, columns, sheet=None, anchor=0, offset=0, key_col=None, decode=None, dtype=None):
+    """テーブル宣言
+
+    rows:    キーのリスト (開始行から連続する行に順に対応) / where(...) / 行数 (int)
+    columns: {列名: 列番号}
+    sheet:   シート名 (None はアクティブシート)
+    anchor:  開始行 (int) または label(...)
+    offset:  anchor からのずれ
+    key_col: 指定時は rows の各キーを開始行以降の key_col 列からラベル検索する
+    decode:  セル値の変換関数
+    dtype:   decode 後の NumPy dtype ('int64' 等)
+    """
+    return {
+        'rows': rows, 'columns': dict(columns), 'sheet': sheet, 'anchor': anchor,
+        'offset': offset, 'key_col': key_col, 'decode': decode, 'dtype': dtype,
+    }
+
+
+class LayoutError(ValueError):
+    pass
+
+
+class TableData:
+    """抽出結果。values は (行数, 列数) の配列。"""
+
+    def __init__(self, keys, columns, values):
+        self.keys = list(keys)
+        self.columns = list(columns)
+        self.values = values
+        self._index = {k: i for i, k in enumerate(self.keys)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __getitem__(self, key):
+        return dict(zip(self.columns, self.values[self._index[key]].tolist()))
+
+    def column(self, name):
+        return self.values[:, self.columns.index(name)]
+
+    def items(self):
+        for key, row in zip(self.keys, self.values.tolist()):
+            yield key, dict(zip(self.columns, row))
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def sum(self):
+        return dict(zip(self.columns, self.values.sum(axis=0).tolist()))
+
+
+def _find_label(sheet, text, col, start=0, nth=0):
+    row = sheet.labels.first(text, col=col, start=start, nth=nth)
+    if row is None:
+        raise LayoutError(f'{sheet.title}: label {text!r} (col {col}, nth {nth}) not found')
+    return row
+
+
+def _resolve_rows(sheet, spec):
+    anchor = spec['anchor']
+    if isinstance(anchor, dict):
+        start = _find_label(sheet, anchor['label'], anchor['col'], nth=anchor['nth'])
+    else:
+        start = anchor
+    start += spec['offset']
+
+    rows = spec['rows']
+    if isinstance(rows, dict):
+        hits = sheet.labels.search(rows['where'], col=rows['col'], start=start)
+        return [normalize_label(sheet.cell_value(r, c)) for r, c in hits], [r for r, _ in hits]
+    if isinstance(rows, int):
+        return list(range(rows)), list(range(start, start + rows))
+    if spec['key_col'] is not None:
+        return list(rows), [_find_label(sheet, k, spec['key_col'], start=start) for k in rows]
+    return list(rows), list(range(start, start + len(rows)))
+
+
+class CompiledLayout:
+    """ワークブックに対して解決済みのレイアウト"""
+
+    def __init__(self, layout, wb):
+        self.wb = wb
+        self.tables = {}
+        for name, spec in layout.items():
+            sheet = wb.active if spec['sheet'] is None else wb[spec['sheet']]
+            keys, row_idx = _resolve_rows(sheet, spec)
+            self.tables[name] = {
+                'sheet': sheet,
+                'keys': keys,
+                'columns': list(spec['columns']),
+                'rows': np.asarray(row_idx, dtype=np.intp),
+                'cols': np.asarray(list(spec['columns'].values()), dtype=np.intp),
+                'decode': spec['decode'],
+                'dtype': spec['dtype'],
+            }
+
+    def extract(self):
+        """宣言された全セルをシートごとに一括取得して decode"""
+        by_sheet = {}
+        for name, t in self.tables.items():
+            by_sheet.setdefault(id(t['sheet']), []).append(name)
+
+        result = {}
+        for names in by_sheet.values():
+            sheet = self.tables[names[0]]['sheet']
+            grid = sheet.array
+            rr, cc, bounds = [], [], []
+            pos = 0
+            for name in names:
+                t = self.tables[name]
+                r, c = np.meshgrid(t['rows'], t['cols'], indexing='ij')
+                rr.append(r.ravel())
+                cc.append(c.ravel())
+                bounds.append((name, pos, r.size, r.shape))
+                pos += r.size
+            rr = np.concatenate(rr) if rr else np.empty(0, dtype=np.intp)
+            cc = np.concatenate(cc) if cc else np.empty(0, dtype=np.intp)
+            CELL_STATS['cells'] += rr.size
+
+            # 範囲外の座標は空セル扱い
+            inside = (rr < grid.shape[0]) & (cc < grid.shape[1])
+            values = np.full(rr.shape, sheet.fill, dtype=object)
+            values[inside] = grid[rr[inside], cc[inside]]
+
+            for name, start, size, shape in bounds:
+                t = self.tables[name]
+                block = values[start:start + size].reshape(shape)
+                if t['decode'] is not None and t['dtype'] is not None:
+                    block = decode_column(block, t['decode'], t['dtype'])
+                elif t['decode'] is not None and block.size:
+                    block = np.frompyfunc(t['decode'], 1, 1)(block)
+                elif t['dtype'] is not None:
+                    block = block.astype(t['dtype'])
+                result[name] = TableData(t['keys'], t['columns'], block)
+        return result
+
+
+def compile_layout(layout, wb):
+    return CompiledLayout(layout, wb)
+
+
+def extract(layout, wb):
+    return compile_layout(layout, wb).extract()
@@ -0,0 +1,679 @@
+#!/usr/bin/env python3
+"""
+出力データの整合性チェック (public/data 以下の JSON)
+
+出力ルートの JSON を形式ごとに読み、次の不変条件を NumPy の配列演算で
+まとめて検査する。ファイル (全国選挙は index.json と分割ファイル一式) を
+1単位として ProcessPoolExecutor で並列に処理する。
+
+  vote-sum          政党別得票の合計 と totalVotes (ブロック・区市町村・選挙区)
+  rate              得票率 と 得票 ÷ 有効投票 から計算し直した値
+                    (都道府県別集計は有効投票数を持たないため、最多得票の政党の
+                     得票 ÷ 得票率 を分母にする)。得票率の合計は 100% 以下
+  gouku             参院選の選挙区が47都道府県を1回ずつ覆う (合区は構成県の分)
+  municipality-sum  区市町村の合計 と 都計
+  seats             議席の合計 と 定数 (ブロック・都道府県・選挙区・全体)
+  dhondt            比例代表の議席 と ドント式の配分 (dhondt.py)
+  shard             index.json と分割ファイル・全体ファイルの一致
+
+結果は severity 付きで返す。議席と定数・分割ファイルの不一致 (ビルドの誤り) は
+error、得票・得票率の食い違い (集計表の転記・按分票の端数、手入力のファイル) は
+warn。error があれば終了コード 1 (build_all.py はビルド失敗にする)。
+
+単位ごとに対象ファイルと検査コードのハッシュを .build/validation.json に記録し、
+変わっていない単位は前回の結果を使う。インクリメンタルビルドの後は変わった
+選挙の分だけ検査し直す。
+
+レポート (.build/validation-report.json):
+  {format, root, ok, summary: {units, cached, checked, errors, warnings, seconds},
+   units: [{path, checker, files, checked, findings: [{check, severity, where, actual, expected}]}],
+   unchecked: [検査対象外のファイル]}
+
+使い方:
+  python scripts/validate_outputs.py
+  python scripts/validate_outputs.py -j 4 --force --json /tmp/validation.json
+  python scripts/validate_outputs.py --strict    # warn も失敗にする
+"""
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from build_manifest import file_hash
+from dhondt import check_seats, vote_matrix
+from dimensions import BLOCK_SEATS, GOUKU, PREFECTURE_NAMES, pref_id
+from election_shards import national_totals, party_seats, shard_dir
+from json_output import iter_data_files
+from matrix_encoding import FORMAT as MATRIX_FORMAT
+from paths import REPO_ROOT, output_root
+
+FORMAT = 'validation-report/v1'
+REPORT_FILE = os.path.join(REPO_ROOT, '.build', 'validation-report.json')
+CACHE_FILE = os.path.join(REPO_ROOT, '.build', 'validation.json')
+CODE = [os.path.join(REPO_ROOT, 'scripts', f)
+        for f in ('validate_outputs.py', 'dhondt.py', 'dimensions.py', 'election_shards.py')]
+
+ERROR, WARN = 'error', 'warn'
+
+# 政党別合計と totalVotes (集計表に小政党の行がないことがあるため 2% まで)
+VOTE_SUM_TOLERANCE = 0.02
+# 区市町村の合計と都計・区市町村の totalVotes (按分票の端数)
+MUNICIPALITY_TOLERANCE = 0.001
+# 小数2桁に丸めた得票率 (ポイント)。小数1桁の手入力ファイルは RATE_TOLERANCE_1DP
+RATE_TOLERANCE = 0.011
+RATE_TOLERANCE_1DP = 0.051
+RATE_SUM_LIMIT = 100.5
+# 得票率の合計 ≒ 100 (推移の「その他」は残差、統一地方選の手入力値)
+TREND_RATE_TOLERANCE = 0.1
+SHARE_SUM_TOLERANCE = 0.5
+
+# 出力が多すぎるときに単位ごとに表示する件数 (レポート JSON には全件)
+PRINT_LIMIT = 8
+
+_NATIONAL = re.compile(r'^(?P<type>shugiin|sangiin)_(?P<year>\d{4})$')
+
+
+def _num(x):
+    x = float(x)
+    return int(x) if x.is_integer() else round(x, 4)
+
+
+class Invariants:
+    """1単位 (ファイル、または全国選挙の分割ファイル一式) の検査結果"""
+
+    def __init__(self):
+        self.checked = 0
+        self.findings = []
+
+    def _add(self, check, severity, where, actual, expected):
+        self.findings.append({'check': check, 'severity': severity, 'where': where,
+                              'actual': actual, 'expected': expected})
+
+    def compare(self, check, labels, actual, expected, tol=0.0, severity=WARN, mask=None):
+        """actual と expected が tol を超えて違う要素を記録する
+
+        labels: 軸ごとのラベル ([行] または [行, 列])。where は各軸のラベルをつないだもの
+        mask:   False の要素は検査しない
+        """
+        actual = np.atleast_1d(np.asarray(actual, dtype=np.float64))
+        expected = np.broadcast_to(np.asarray(expected, dtype=np.float64), actual.shape)
+        tol = np.broadcast_to(np.asarray(tol, dtype=np.float64), actual.shape)
+        usable = np.ones(actual.shape, dtype=bool) if mask is None else np.broadcast_to(mask, actual.shape)
+        with np.errstate(invalid='ignore'):
+            bad = usable & ~(np.abs(actual - expected) <= tol + 1e-9)
+        self.checked += int(usable.sum())
+        for idx in zip(*np.nonzero(bad)):
+            where = ' '.join(str(labels[k][i]) for k, i in enumerate(idx))
+            self._add(check, severity, where, _num(actual[idx]), _num(expected[idx]))
+        return not bad.any()
+
+    def at_most(self, check, labels, actual, limit, severity=WARN):
+        """actual <= limit"""
+        actual = np.atleast_1d(np.asarray(actual, dtype=np.float64))
+        return self.compare(check, labels, np.maximum(actual, limit), limit, severity=severity)
+
+    def require(self, check, where, ok, actual=None, expected=None, severity=ERROR):
+        self.checked += 1
+        if not ok:
+            self._add(check, severity, where, actual, expected)
+        return ok
+
+
+def _load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _table(rows, key, name, fields, columns=None):
+    """rows[i][key] の政党別の行 → (列名, {field: [行 × 政党] 配列})"""
+    columns = list(columns or dict.fromkeys(r[name] for row in rows for r in row[key]))
+    col = {c: j for j, c in enumerate(columns)}
+    out = {f: np.zeros((len(rows), len(columns))) for f in fields}
+    for i, row in enumerate(rows):
+        for r in row[key]:
+            for f in fields:
+                out[f][i, col[r[name]]] = r.get(f) or 0
+    return columns, out
+
+
+def _shares(votes, total):
+    return votes / np.maximum(total, 1)[..., None] * 100
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 全国選挙 (elections/{type}_{year}.json / index.json)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def _election_kind(path):
+    """elections/shugiin_2024.json / elections/shugiin_2024/index.json → ('shugiin', 2024)"""
+    if os.path.basename(path) == 'index.json':
+        path = os.path.dirname(path)
+    m = _NATIONAL.match(os.path.basename(shard_dir(path)))
+    return (m.group('type'), int(m.group('year'))) if m else (None, None)
+
+
+def check_hirei(data, inv, kind=None, year=None):
+    blocks = data['hirei']['blocks']
+    m = vote_matrix(blocks)
+    _, t = _table(blocks, 'parties', 'party', ('voteRate',), m.parties)
+    rates = t['voteRate']
+    total = np.array([b['totalVotes'] for b in blocks], dtype=np.float64)
+
+    inv.compare('vote-sum', [m.blocks], m.votes.sum(axis=1), total, tol=total * VOTE_SUM_TOLERANCE)
+    inv.compare('rate', [m.blocks, m.parties], rates, _shares(m.votes, total),
+                tol=RATE_TOLERANCE, mask=m.votes > 0)
+    inv.at_most('rate', [m.blocks], rates.sum(axis=1), RATE_SUM_LIMIT)
+
+    inv.compare('seats', [m.blocks], m.seats.sum(axis=1), m.total_seats, severity=ERROR)
+    inv.compare('seats', [['比例代表']], m.total_seats.sum(), data['hirei']['totalSeats'], severity=ERROR)
+    # ブロック定数は2022年の区割り改定後の値 (dimensions.BLOCK_SEATS)
+    if kind == 'shugiin' and year and year >= 2022:
+        fixed = np.array([BLOCK_SEATS.get(b, -1) for b in m.blocks])
+        inv.compare('seats', [m.blocks], m.total_seats, fixed, severity=ERROR, mask=fixed >= 0)
+
+    inv.checked += m.votes.size
+    for d in check_seats(blocks):
+        if d['party'] is None:
+            inv._add('dhondt', WARN, d['block'], None, None)
+        else:
+            inv._add('dhondt', WARN, f"{d['block']} {d['party']}", d['parsed'], d['computed'])
+
+
+def check_shou(data, inv, kind=None):
+    prefs = data['shou']['prefectures']
+    names = [p['prefecture'] for p in prefs]
+    parties, t = _table(prefs, 'partyResults', 'party', ('totalVotes', 'seats', 'voteRate'))
+    votes, seats, rates = t['totalVotes'], t['seats'], t['voteRate']
+    magnitude = np.array([p['totalDistricts'] for p in prefs], dtype=np.float64)
+
+    inv.compare('seats', [names], seats.sum(axis=1), magnitude, severity=ERROR)
+    inv.compare('seats', [['選挙区']], magnitude.sum(), data['shou']['totalSeats'], severity=ERROR)
+
+    # 有効投票数 ≒ 最多得票の政党の 得票 ÷ 得票率 (分母の丸め誤差は得票率に比例して許容)
+    top = np.argmax(np.where(rates > 0, votes, -1), axis=1)
+    rows = np.arange(len(prefs))
+    top_rate = rates[rows, top] if len(prefs) else np.zeros(0)
+    implied = np.where(top_rate > 0, votes[rows, top] / np.maximum(top_rate, 1e-9) * 100, np.nan) if len(prefs) else top_rate
+    tol = RATE_TOLERANCE + rates * 0.005 / np.maximum(top_rate, 1e-9)[:, None]
+    inv.compare('rate', [names, parties], rates, _shares(votes, implied), tol=tol,
+                mask=(votes > 0) & (rates > 0) & np.isfinite(implied)[:, None])
+    inv.at_most('rate', [names], rates.sum(axis=1), RATE_SUM_LIMIT)
+    if kind == 'sangiin':
+        check_gouku(prefs, inv)
+
+
+def check_gouku(prefs, inv):
+    """参院の選挙区 (合区を含む) が47都道府県を1回ずつ覆う"""
+    members = {gid: [pref_id(p) for p in names] for gid, _, names in GOUKU}
+    ids = [pref_id(p['prefecture']) for p in prefs]
+    covered = [pid for i in ids if i is not None for pid in members.get(i, [i])]
+    counts = np.bincount(np.array(covered, dtype=np.int64), minlength=len(PREFECTURE_NAMES) + 1)
+    inv.compare('gouku', [PREFECTURE_NAMES], counts[1:len(PREFECTURE_NAMES) + 1], 1, severity=ERROR)
+    for gid, name, _ in GOUKU:
+        inv.require('gouku', name, gid in ids, actual=False, expected=True)
+
+
+def check_election(data, inv, path):
+    kind, year = _election_kind(path)
+    check_hirei(data, inv, kind, year)
+    check_shou(data, inv, kind)
+
+
+def _districts(shard, inv, kind):
+    """分割ファイルの選挙区別候補者: 当選者数、得票率、政党別合計"""
+    pref, districts = shard['prefecture'], shard.get('districts') or []
+    candidates = [c for d in districts for c in d['candidates']]
+    if not candidates:
+        return
+    labels = [f"{pref}{d['district']}区" for d in districts]
+    which = np.repeat(np.arange(len(districts)), [len(d['candidates']) for d in districts])
+    votes = np.array([c['votes'] for c in candidates], dtype=np.float64)
+    rates = np.array([c['voteRate'] for c in candidates], dtype=np.float64)
+    won = np.array(['当' in c['result'] for c in candidates])
+
+    winners = np.bincount(which, weights=won, minlength=len(districts))
+    if kind == 'shugiin':
+        inv.compare('seats', [labels], winners, 1, severity=ERROR)
+    else:
+        inv.compare('seats', [[pref]], winners.sum(), shard['totalDistricts'], severity=ERROR)
+    district_votes = np.bincount(which, weights=votes, minlength=len(districts))
+    inv.compare('rate', [[f'{labels[i]} {c["name"]}' for i, c in zip(which, candidates)]],
+                rates, votes / np.maximum(district_votes[which], 1) * 100, tol=RATE_TOLERANCE)
+    # 政党別合計は都道府県の全選挙区がそろっているときだけ (参院は1選挙区)
+    if kind == 'shugiin' and len(districts) != shard['totalDistricts']:
+        return
+
+    parties, t = _table([shard], 'partyResults', 'party', ('totalVotes', 'seats'))
+    col = {p: j for j, p in enumerate(parties)}
+    unknown = sorted({c['party'] for c in candidates} - set(col))
+    for p in unknown:
+        inv.require('shard', f'{pref} {p}', False, actual='candidates', expected='partyResults')
+    known = np.array([c['party'] in col for c in candidates])
+    idx = np.array([col.get(c['party'], 0) for c in candidates])
+    by_party = np.bincount(idx[known], weights=votes[known], minlength=len(parties))
+    seats = np.bincount(idx[known], weights=won[known], minlength=len(parties))
+    inv.compare('vote-sum', [[f'{pref} {p}' for p in parties]], by_party, t['totalVotes'][0], tol=0.5)
+    inv.compare('seats', [[f'{pref} {p}' for p in parties]], seats, t['seats'][0], severity=ERROR)
+
+
+def _list(block, inv):
+    """比例ブロックの名簿: 当選者 (当・比当) の数と議席"""
+    parties = block['parties']
+    if not any(p.get('candidates') for p in parties):
+        return
+    elected = [sum(1 for c in p['candidates'] if c.get('result') in ('当', '比当')) for p in parties]
+    inv.compare('seats', [[f"{block['name']} {p['party']} (名簿)" for p in parties]], elected,
+                [p['seats'] for p in parties])
+
+
+def check_shards(index, inv, path):
+    """index.json と分割ファイル (shou/*.json, hirei/*.json)、全体ファイルの一致
+
+    index.json の都道府県は全体ファイルと同じ partyResults、ブロックは議席数だけなので、
+    ブロックの得票や名簿は全体ファイルと分割ファイルで照合する。都道府県のシャードは
+    変換スクリプトが候補者別得票数のファイル (shou_candidates.py) を読んだときだけあり、
+    選挙区数 (districtCount) と候補者 (_districts) を検査する。
+    """
+    kind, _ = _election_kind(path)
+    directory = os.path.dirname(path)
+    whole = directory + '.json'
+    if not inv.require('shard', os.path.basename(whole), os.path.exists(whole), actual='missing', expected='file'):
+        return
+    full = _load(whole)
+
+    national = {r['party']: r for r in index.get('national', [])}
+    expected = {r['party']: r for r in national_totals(full)}
+    for party in sorted(set(national) | set(expected)):
+        inv.require('shard', f'national {party}', national.get(party) == expected.get(party),
+                    actual=national.get(party), expected=expected.get(party))
+
+    listed = [(e['prefecture'], e['totalDistricts'], e['partyResults']) for e in index['shou']['prefectures']]
+    source = [(e['prefecture'], e['totalDistricts'], e['partyResults']) for e in full['shou']['prefectures']]
+    inv.require('shard', 'shou partyResults', listed == source, actual='index.json', expected=os.path.basename(whole))
+    listed = [(e['name'], e['seats']) for e in index['hirei']['blocks']]
+    source = [(e['name'], party_seats(e['parties'])) for e in full['hirei']['blocks']]
+    inv.require('shard', 'hirei seats', listed == source, actual='index.json', expected=os.path.basename(whole))
+    for key in ('shou', 'hirei'):
+        inv.require('shard', f'{key} totalSeats', index[key]['totalSeats'] == full[key]['totalSeats'],
+                    actual=index[key]['totalSeats'], expected=full[key]['totalSeats'])
+
+    prefectures = {p['prefecture']: p for p in full['shou']['prefectures']}
+    for pref in index['shou']['prefectures']:
+        if 'shard' not in pref:
+            continue
+        shard_path = os.path.join(directory, pref['shard'])
+        if not inv.require('shard', pref['shard'], os.path.exists(shard_path), actual='missing', expected='file'):
+            continue
+        shard = _load(shard_path)
+        source = prefectures.get(pref['prefecture'], {})
+        inv.require('shard', f"{pref['shard']} partyResults", shard['partyResults'] == source.get('partyResults'))
+        inv.require('shard', f"{pref['shard']} districtCount", len(shard.get('districts') or []) == pref['districtCount'],
+                    actual=len(shard.get('districts') or []), expected=pref['districtCount'])
+        _districts(shard, inv, kind)
+
+    blocks = {b['name']: b for b in full['hirei']['blocks']}
+    for block in index['hirei']['blocks']:
+        shard_path = os.path.join(directory, block['shard'])
+        if not inv.require('shard', block['shard'], os.path.exists(shard_path), actual='missing', expected='file'):
+            continue
+        shard = _load(shard_path)
+        summary = [{**p, 'candidates': []} for p in shard['parties']]
+        inv.require('shard', f"{block['shard']} parties", summary == blocks.get(block['name'], {}).get('parties'))
+        _list(shard, inv)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 区市町村別 (tokyo-*.json、行列形式)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def municipality_arrays(data):
+    """区市町村別の3形式 → 共通の配列
+
+    戻り値: {names, parties, votes [区市町村 × 政党], rates (なければ None),
+             totals [区市町村], partyVotes / partyRates [政党] (都計), grandTotal,
+             seats [政党] (なければ None), districts (選挙区数、なければ None)}
+    """
+    if data.get('format') == MATRIX_FORMAT:
+        munis, total = data['municipalities'], data['total']
+        return {
+            'names': munis['name'], 'parties': data['parties'],
+            'votes': np.array(data['votes'], dtype=np.float64).reshape(len(munis['name']), -1),
+            'rates': np.array(data['rateBp'], dtype=np.float64).reshape(len(munis['name']), -1) / 100,
+            'totals': np.array(munis['totalVotes'], dtype=np.float64),
+            'partyVotes': np.array(total['votes'], dtype=np.float64),
+            'partyRates': np.array(total['rateBp'], dtype=np.float64) / 100,
+            'grandTotal': total['totalVotes'],
+            'seats': np.array(total['seats'], dtype=np.float64) if 'seats' in total else None,
+            'districts': len(data['districts']),
+        }
+
+    munis, total = data['municipalities'], data['total']
+    names = [m['name'] for m in munis]
+    if data['parties'] and isinstance(data['parties'][0], dict):
+        # 比例代表 (tokyo-hirei-2024.json 等): votes: {政党: 票}、total: {政党: 票, 合計}
+        parties = [p['name'] for p in data['parties']]
+        return {
+            'names': names, 'parties': parties,
+            'votes': np.array([[m['votes'].get(p, 0) for p in parties] for m in munis], dtype=np.float64),
+            'rates': None,
+            'totals': np.array([m['total'] for m in munis], dtype=np.float64),
+            'partyVotes': np.array([total.get(p, 0) for p in parties], dtype=np.float64),
+            'partyRates': None,
+            'grandTotal': total['合計'],
+            'seats': None, 'districts': None,
+        }
+
+    parties = list(data['parties'])
+    cell = lambda row, p, f: (row.get(p) or {}).get(f) or 0  # noqa: E731
+    has_seats = any('seats' in (total.get(p) or {}) for p in parties)
+    has_district = any('district' in m for m in munis)
+    return {
+        'names': names, 'parties': parties,
+        'votes': np.array([[cell(m, p, 'votes') for p in parties] for m in munis], dtype=np.float64),
+        'rates': np.array([[cell(m, p, 'rate') for p in parties] for m in munis], dtype=np.float64),
+        'totals': np.array([m['totalVotes'] for m in munis], dtype=np.float64),
+        'partyVotes': np.array([cell(total, p, 'votes') for p in parties], dtype=np.float64),
+        'partyRates': np.array([cell(total, p, 'rate') for p in parties], dtype=np.float64),
+        'grandTotal': total['totalVotes'],
+        'seats': np.array([cell(total, p, 'seats') for p in parties], dtype=np.float64) if has_seats else None,
+        'districts': len({m['district'] for m in munis}) if has_district else None,
+    }
+
+
+def check_municipalities(data, inv, path):
+    a = municipality_arrays(data)
+    names, parties, votes, totals = a['names'], a['parties'], a['votes'], a['totals']
+    tol = np.maximum(totals * MUNICIPALITY_TOLERANCE, 1)
+    inv.compare('vote-sum', [names], votes.sum(axis=1), totals, tol=tol)
+    if a['rates'] is not None:
+        inv.compare('rate', [names, parties], a['rates'], _shares(votes, totals), tol=RATE_TOLERANCE,
+                    mask=totals[:, None] > 0)
+
+    party_votes = a['partyVotes']
+    inv.compare('municipality-sum', [[f'都計 {p}' for p in parties]], votes.sum(axis=0), party_votes,
+                tol=np.maximum(party_votes * MUNICIPALITY_TOLERANCE, 1))
+    inv.compare('municipality-sum', [['都計 totalVotes']], totals.sum(), a['grandTotal'],
+                tol=max(a['grandTotal'] * MUNICIPALITY_TOLERANCE, 1))
+    if a['partyRates'] is not None:
+        inv.compare('rate', [[f'都計 {p}' for p in parties]], a['partyRates'],
+                    party_votes / max(a['grandTotal'], 1) * 100, tol=RATE_TOLERANCE)
+    if a['seats'] is not None and a['districts'] is not None:
+        inv.compare('seats', [['都計 seats']], a['seats'].sum(), a['districts'], severity=ERROR)
+
+
+def check_constituencies(data, inv, path):
+    """小選挙区別の候補者 (tokyo-syosenkyoku.json)"""
+    cons = data['constituencies']
+    labels = [c['district'] for c in cons]
+    which = np.repeat(np.arange(len(cons)), [len(c['candidates']) for c in cons])
+    votes = np.array([x['votes'] for c in cons for x in c['candidates']], dtype=np.float64)
+    won = np.array([bool(x.get('winner')) for c in cons for x in c['candidates']])
+    totals = np.array([c['totalVotes'] for c in cons], dtype=np.float64)
+
+    inv.compare('vote-sum', [labels], np.bincount(which, weights=votes, minlength=len(cons)), totals)
+    inv.compare('seats', [labels], np.bincount(which, weights=won, minlength=len(cons)), 1, severity=ERROR)
+    has = np.array(['breakdown' in c for c in cons])
+    breakdown = np.array([sum(b['totalVotes'] for b in c.get('breakdown', [])) for c in cons], dtype=np.float64)
+    inv.compare('municipality-sum', [labels], breakdown, totals, mask=has)
+
+
+def check_region(data, inv, path):
+    """区単位の1選挙 (meguro-*.json): 候補者・政党の得票 と totalVotes"""
+    rows = data.get('candidates') or data.get('parties') or []
+    labels = [r.get('candidate') or r['party'] for r in rows]
+    votes = np.array([r['votes'] for r in rows], dtype=np.float64)
+    total = data['totalVotes']
+    inv.compare('vote-sum', [[data['region']]], votes.sum(), total)
+    inv.compare('rate', [labels], [r['voteShare'] for r in rows], votes / max(total, 1) * 100, tol=RATE_TOLERANCE)
+
+
+def check_district_votes(data, inv, path):
+    """投票区別 (ota-district-votes.json)。得票率は小数1桁"""
+    districts, parties = data['districts'], data['parties']
+    labels = [f"{data['region']} {d['id']}" for d in districts]
+    votes = np.array([[(d.get(p) or {}).get('votes', 0) for p in parties] for d in districts], dtype=np.float64)
+    rates = np.array([[(d.get(p) or {}).get('rate', 0) for p in parties] for d in districts], dtype=np.float64)
+    totals = np.array([d['totalVotes'] for d in districts], dtype=np.float64)
+    inv.compare('vote-sum', [labels], votes.sum(axis=1), totals)
+    inv.compare('rate', [labels, parties], rates, _shares(votes, totals), tol=RATE_TOLERANCE_1DP)
+    inv.require('vote-sum', f"{data['region']} totalDistricts", len(districts) == data['totalDistricts'],
+                actual=len(districts), expected=data['totalDistricts'], severity=WARN)
+
+
+def check_election_master(data, inv, path):
+    """区の選挙区別・年別 (ota-election-master.json)"""
+    for district, entry in data['data'].items():
+        for year, e in entry['years'].items():
+            for section in ('syosenkyoku', 'hirei'):
+                if section not in e:
+                    continue
+                results = e[section]['results']
+                where = f'{district} {year} {section}'
+                votes = np.array([r['votes'] for r in results], dtype=np.float64)
+                total = e[section]['totalVotes']
+                inv.compare('vote-sum', [[where]], votes.sum(), total)
+                inv.compare('rate', [[f"{where} {r['party']}" for r in results]], [r['rate'] for r in results],
+                            votes / max(total, 1) * 100, tol=RATE_TOLERANCE)
+
+
+def check_unified(data, inv, path):
+    """統一地方選 (手入力・概算値のため warn のみ): 当選者数 と 定数、得票率の合計"""
+    elections = data.get('elections') or {data.get('date', '')[:4]: data}
+    for year, e in elections.items():
+        rows = e.get('prefectures') or e.get('wards') or []
+        labels = [f"{year} {r['name']}" for r in rows]
+        inv.compare('seats', [labels], [sum(r['winner_count'].values()) for r in rows],
+                    [r['total_seats'] for r in rows])
+        inv.compare('rate', [labels], [sum(r['votes_by_party'].values()) for r in rows], 100,
+                    tol=SHARE_SUM_TOLERANCE)
+        summary = e.get('summary')
+        if summary:
+            inv.compare('seats', [[f'{year} summary total_seats']], sum(r['total_seats'] for r in rows),
+                        summary['total_seats'])
+            inv.compare('seats', [[f'{year} summary total_wards']], len(rows), summary['total_wards'])
+
+
+def check_csv_summary(data, inv, path):
+    """集計済みの区市町村別 CSV (csv-summary.json): 得票の合計・得票率、1選挙区1議席"""
+    for year, s in data['years'].items():
+        districts = list(s['districts'].values())
+        labels = [f"{year} {d['regionName']}-{d['district']}" for d in districts]
+        which = np.repeat(np.arange(len(districts)), [len(d['results']) for d in districts])
+        votes = np.array([r['votes'] for d in districts for r in d['results']], dtype=np.float64)
+        shares = np.array([r['voteShare'] for d in districts for r in d['results']], dtype=np.float64)
+        totals = np.array([d['totalVotes'] for d in districts], dtype=np.float64)
+        inv.compare('vote-sum', [labels], np.bincount(which, weights=votes, minlength=len(districts)), totals)
+        names = [f"{labels[i]} {r['candidateName']}" for i, d in enumerate(districts) for r in d['results']]
+        inv.compare('rate', [names], shares, votes / np.maximum(totals[which], 1) * 100, tol=RATE_TOLERANCE)
+        seats = sum(p['seats'] for p in s['parties'])
+        inv.compare('seats', [[f'{year} seats']], seats, len({d['district'] for d in districts}), severity=ERROR)
+
+
+def check_trends(data, inv, path):
+    """得票率の推移: 各年の系列 (「その他」を含む) の合計 ≒ 100"""
+    for key in ('shugiin_hirei', 'sangiin_hirei', 'tokyo_hirei'):
+        rows = data.get(key) or []
+        sums = [sum(v for v in r.values() if isinstance(v, (int, float))) for r in rows]
+        inv.compare('rate', [[f"{key} {r['year']}" for r in rows]], sums, 100, tol=TREND_RATE_TOLERANCE,
+                    mask=np.array([s > 0 for s in sums]))
+
+
+# 出力ルートからの相対パス → 検査関数 (最初に一致したもの)。分割ファイルは index.json の単位で検査
+CHECKERS = [
+    ('elections/*/index.json', check_shards),
+    ('elections/national_party_trends.json', check_trends),
+    ('elections/*_*.json', check_election),
+    ('*.matrix.json', check_municipalities),
+    ('tokyo-syosenkyoku.json', check_constituencies),
+    ('tokyo-*.json', check_municipalities),
+    ('meguro-*.json', check_region),
+    ('ota-district-votes.json', check_district_votes),
+    ('ota-election-master.json', check_election_master),
+    ('unified-local-elections/*.json', check_unified),
+    ('csv-summary.json', check_csv_summary),
+]
+_SHARD_FILES = ('elections/*/shou/*.json', 'elections/*/hirei/*.json')
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 実行
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def _match(rel, pattern):
+    """fnmatch と同じだが * はディレクトリをまたがない"""
+    return rel.count('/') == pattern.count('/') and fnmatch.fnmatch(rel, pattern)
+
+
+def discover(root):
+    """[(相対パス, 検査関数名, 単位に含むファイルの相対パス)], 検査対象外のファイル"""
+    rels = [os.path.relpath(p, root).replace(os.sep, '/') for p in iter_data_files(root)]
+    rels = [r for r in rels if r.endswith('.json')]
+    units, unchecked = [], []
+    for rel in rels:
+        if any(_match(rel, pat) for pat in _SHARD_FILES):
+            continue
+        checker = next((fn for pat, fn in CHECKERS if _match(rel, pat)), None)
+        if checker is None:
+            unchecked.append(rel)
+            continue
+        files = [rel]
+        if checker is check_shards:
+            prefix = os.path.dirname(rel) + '/'
+            files += [r for r in rels if r.startswith(prefix) and r != rel
+                      and any(_match(r, pat) for pat in _SHARD_FILES)]
+            files.append(os.path.dirname(rel) + '.json')
+        units.append((rel, checker.__name__, files))
+    return units, unchecked
+
+
+def _unit_hash(root, files):
+    h = hashlib.sha256()
+    for rel in files:
+        h.update(rel.encode('utf-8'))
+        h.update((file_hash(os.path.join(root, rel)) or '-').encode('ascii'))
+    return h.hexdigest()
+
+
+def run_unit(root, rel, checker):
+    """1単位を検査 (ProcessPoolExecutor の子プロセスで実行)"""
+    start = time.perf_counter()
+    inv = Invariants()
+    path = os.path.join(root, rel)
+    try:
+        globals()[checker](_load(path), inv, path)
+    except (KeyError, TypeError, ValueError) as e:
+        inv.require('format', rel, False, actual=f'{type(e).__name__}: {e}', expected=checker)
+    return {'path': rel, 'checker': checker, 'checked': inv.checked, 'findings': inv.findings,
+            'seconds': round(time.perf_counter() - start, 4)}
+
+
+def _load_cache(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_cache(cache, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+
+
+def validate(root=None, workers=None, force=False, cache_path=CACHE_FILE):
+    """出力ルートを検査してレポートを返す"""
+    root = root or output_root()
+    start = time.perf_counter()
+    units, unchecked = discover(root)
+
+    cache = {} if force else _load_cache(cache_path)
+    code = {os.path.relpath(p, REPO_ROOT): file_hash(p) for p in CODE}
+    if cache.get('code') != code or cache.get('root') != root:
+        cache = {}
+    entries = cache.get('units', {})
+
+    hashes = {rel: _unit_hash(root, files) for rel, _, files in units}
+    stale = [(rel, checker) for rel, checker, _ in units if entries.get(rel, {}).get('hash') != hashes[rel]]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(stale) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(stale))) as pool:
+            results = list(pool.map(run_unit, [root] * len(stale), *zip(*stale)))
+    else:
+        results = [run_unit(root, rel, checker) for rel, checker in stale]
+    for r in results:
+        entries[r['path']] = {'hash': hashes[r['path']], 'result': r}
+    entries = {rel: entries[rel] for rel, _, _ in units}
+    _save_cache({'code': code, 'root': root, 'units': entries}, cache_path)
+
+    out = []
+    for rel, _, files in units:
+        r = entries[rel]['result']
+        out.append({**r, 'files': len([f for f in files if os.path.exists(os.path.join(root, f))])})
+    findings = [f for u in out for f in u['findings']]
+    errors = sum(1 for f in findings if f['severity'] == ERROR)
+    return {
+        'format': FORMAT,
+        'root': root,
+        'ok': errors == 0,
+        'summary': {
+            'units': len(out),
+            'cached': len(out) - len(results),
+            'checked': sum(u['checked'] for u in out),
+            'errors': errors,
+            'warnings': len(findings) - errors,
+            'seconds': round(time.perf_counter() - start, 3),
+        },
+        'units': out,
+        'unchecked': unchecked,
+    }
+
+
+def _value(v):
+    return f'{v:,}' if isinstance(v, (int, float)) and not isinstance(v, bool) else str(v)
+
+
+def print_report(report, limit=PRINT_LIMIT):
+    s = report['summary']
+    print(f"\n--- Validation: {report['root']} ---")
+    print(f"  {s['units']} units ({s['cached']} cached), {s['checked']:,} checks, "
+          f"{s['errors']} errors, {s['warnings']} warnings in {s['seconds']:.2f} s")
+    for u in report['units']:
+        findings = sorted(u['findings'], key=lambda f: f['severity'] != ERROR)
+        for f in findings[:limit]:
+            label = 'ERROR' if f['severity'] == ERROR else 'WARN '
+            detail = '' if f['actual'] is None and f['expected'] is None else \
+                f": {_value(f['actual'])} != {_value(f['expected'])}"
+            print(f"  {label} {u['path']} [{f['check']}] {f['where']}{detail}")
+        if len(findings) > limit:
+            print(f"  ... {u['path']}: {len(findings) - limit} more")
+    print('  validation: OK' if report['ok'] else '  validation: FAILED')
+
+
+def save_report(report, path=REPORT_FILE):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='出力データの整合性チェック')
+    parser.add_argument('root', nargs='?', help='対象ディレクトリ (既定: 出力ルート)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='並列数 (既定: CPU 数)')
+    parser.add_argument('--force', action='store_true', help='前回の結果を使わずに全件検査')
+    parser.add_argument('--json', default=REPORT_FILE, help='レポート JSON の保存先')
+    parser.add_argument('--strict', action='store_true', help='warn も失敗にする')
+    args = parser.parse_args(argv)
+
+    report = validate(args.root, workers=args.jobs, force=args.force)
+    print_report(report)
+    save_report(report, args.json)
+    ok = report['ok'] and not (args.strict and report['summary']['warnings'])
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
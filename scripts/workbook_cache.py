@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+パース済みワークブックの永続キャッシュ
+
+シートの値グリッドを型別の配列 (.npz)、結合セル範囲を int32 配列 (.merged.npy) として
+ディスクに保存し、次回以降は openpyxl / xlrd のパースを省略する。
+
+値グリッドは pickle を使わない (改ざんされたキャッシュで任意コードが実行されないよう、
+読み込みは allow_pickle=False)。セルごとに型コード・整数・浮動小数を持ち、
+文字列と日時は文字列表への添字で表す。
+
+  キー:     ファイルの絶対パス + mtime + サイズ (+ キャッシュ形式のバージョン)
+  保存先:   ELECTION_CACHE_DIR (既定: <repo>/.build/workbook-cache)
+  容量上限: ELECTION_CACHE_MAX_MB (既定: 512)、超過時は古い順に削除
+  無効化:   ELECTION_WORKBOOK_CACHE=0
+
+使い方:
+  python scripts/workbook_cache.py --stats
+  python scripts/workbook_cache.py --clear
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from paths import REPO_ROOT
+
+# 保存形式を変えたら上げる (古いエントリは参照されなくなり、容量超過時に削除される)
+CACHE_VERSION = 3
+
+# セル値の型コード (.npz の kind 配列)
+NONE, STR, INT, FLOAT, BOOL, DATETIME, DATE, TIME = range(8)
+_TEMPORAL = {DATETIME: datetime.datetime, DATE: datetime.date, TIME: datetime.time}
+
+
+def cache_enabled():
+    return os.environ.get('ELECTION_WORKBOOK_CACHE', '1') != '0'
+
+
+def encode_grid(rows, fill=None):
+    """行タプルのリスト → 型別配列の dict (np.savez 用)
+
+    対応しない型のセルがあれば TypeError (呼び出し側はキャッシュしない)。
+    """
+    height, width = len(rows), max((len(r) for r in rows), default=0)
+    kind = np.zeros((height, width), dtype=np.uint8)
+    ival = np.zeros((height, width), dtype=np.int64)
+    fval = np.zeros((height, width), dtype=np.float64)
+    strings, index = [], {}
+    for i, row in enumerate(rows):
+        for j in range(width):
+            v = row[j] if j < len(row) else fill
+            if v is None:
+                continue
+            t = type(v)
+            if t is str:
+                k = STR
+            elif t is bool:
+                kind[i, j], ival[i, j] = BOOL, v
+                continue
+            elif t is int:
+                kind[i, j], ival[i, j] = INT, v
+                continue
+            elif t is float:
+                kind[i, j], fval[i, j] = FLOAT, v
+                continue
+            elif t is datetime.datetime:
+                k, v = DATETIME, v.isoformat()
+            elif t is datetime.date:
+                k, v = DATE, v.isoformat()
+            elif t is datetime.time:
+                k, v = TIME, v.isoformat()
+            else:
+                raise TypeError(f'uncacheable cell type: {t.__name__}')
+            if v not in index:
+                index[v] = len(strings)
+                strings.append(v)
+            kind[i, j], ival[i, j] = k, index[v]
+    return {'kind': kind, 'ival': ival, 'fval': fval,
+            'strings': np.array(strings, dtype=np.str_)}
+
+
+def decode_grid(kind, ival, fval, strings):
+    """encode_grid の逆。行タプルのリストを返す"""
+    grid = np.empty(kind.shape, dtype=object)
+    for k, values in ((INT, ival), (FLOAT, fval)):
+        mask = kind == k
+        if mask.any():
+            grid[mask] = values[mask].tolist()
+    mask = kind == BOOL
+    if mask.any():
+        grid[mask] = (ival[mask] != 0).tolist()
+    mask = kind == STR
+    if mask.any():
+        grid[mask] = strings[ival[mask]].tolist()
+    for k, cls in _TEMPORAL.items():
+        for i, j in zip(*np.nonzero(kind == k)):
+            grid[i, j] = cls.fromisoformat(str(strings[ival[i, j]]))
+    return [tuple(r) for r in grid.tolist()]
+
+
+class WorkbookCache:
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or os.environ.get(
+            'ELECTION_CACHE_DIR', os.path.join(REPO_ROOT, '.build', 'workbook-cache'))
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get('ELECTION_CACHE_MAX_MB', '512')) * 1024 * 1024)
+        self.max_bytes = max_bytes
+
+    def _entry_dir(self, path):
+        st = os.stat(path)
+        key = f'{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|v{CACHE_VERSION}'
+        return os.path.join(self.root, hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    @staticmethod
+    def _sheet_file(entry, sheet_name, suffix='.npz'):
+        return os.path.join(entry, hashlib.sha1(sheet_name.encode('utf-8')).hexdigest()[:16] + suffix)
+
+    @staticmethod
+    def _write_atomic(target, write):
+        # 並列ビルドで同じファイルを同時に書いても壊れないよう rename で置き換える
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    # ── メタ情報 (シート名一覧・アクティブシート) ─────────────────
+    def load_meta(self, path):
+        meta_file = os.path.join(self._entry_dir(path), 'meta.json')
+        if not os.path.exists(meta_file):
+            return None
+        os.utime(meta_file)  # LRU 用に最終利用時刻を更新
+        with open(meta_file, encoding='utf-8') as f:
+            return json.load(f)
+
+    def store_meta(self, path, meta):
+        entry = self._entry_dir(path)
+        os.makedirs(entry, exist_ok=True)
+        data = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+        self._write_atomic(os.path.join(entry, 'meta.json'), lambda f: f.write(data))
+
+    # ── シートグリッド ─────────────────────────────────────────
+    def has_sheet(self, path, sheet_name):
+        entry = self._entry_dir(path)
+        return all(os.path.exists(self._sheet_file(entry, sheet_name, suffix))
+                   for suffix in ('.npz', '.merged.npy'))
+
+    def load_sheet(self, path, sheet_name):
+        """キャッシュ済みの (行タプルのリスト, 結合セル範囲) を返す。なければ None"""
+        entry = self._entry_dir(path)
+        sheet_file = self._sheet_file(entry, sheet_name)
+        merged_file = self._sheet_file(entry, sheet_name, '.merged.npy')
+        if not (os.path.exists(sheet_file) and os.path.exists(merged_file)):
+            return None
+        try:
+            with np.load(sheet_file, allow_pickle=False) as npz:
+                rows = decode_grid(npz['kind'], npz['ival'], npz['fval'], npz['strings'])
+            merged = np.load(merged_file, allow_pickle=False)
+        except (OSError, ValueError, EOFError, KeyError, IndexError):
+            return None
+        return rows, [tuple(m) for m in merged.tolist()]
+
+    def store_sheet(self, path, sheet_name, rows, fill=None, merged=()):
+        try:
+            arrays = encode_grid(rows, fill)
+        except TypeError:
+            return
+        entry = self._entry_dir(path)
+        os.makedirs(entry, exist_ok=True)
+        merged = np.asarray(list(merged), dtype=np.int32).reshape(-1, 4)
+        self._write_atomic(self._sheet_file(entry, sheet_name, '.merged.npy'),
+                           lambda f: np.save(f, merged, allow_pickle=False))
+        self._write_atomic(self._sheet_file(entry, sheet_name),
+                           lambda f: np.savez(f, **arrays))
+        self.evict()
+
+    # ── 管理 ──────────────────────────────────────────────────
+    def entries(self):
+        """[(最終利用時刻, サイズ, ディレクトリ)]"""
+        if not os.path.isdir(self.root):
+            return []
+        result = []
+        for name in os.listdir(self.root):
+            entry = os.path.join(self.root, name)
+            if not os.path.isdir(entry):
+                continue
+            files = [os.path.join(entry, f) for f in os.listdir(entry)]
+            size = sum(os.path.getsize(f) for f in files if os.path.isfile(f))
+            mtime = max((os.path.getmtime(f) for f in files if os.path.isfile(f)),
+                        default=os.path.getmtime(entry))
+            result.append((mtime, size, entry))
+        return result
+
+    def evict(self):
+        """容量上限を超えたら最終利用時刻の古いエントリから削除"""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        while entries and total > self.max_bytes:
+            _, size, entry = entries.pop(0)
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        if os.path.isdir(self.root):
+            shutil.rmtree(self.root)
+
+    def stats(self):
+        entries = self.entries()
+        return {
+            'root': self.root,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'maxBytes': self.max_bytes,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='パース済みワークブックキャッシュの管理')
+    parser.add_argument('--clear', action='store_true', help='キャッシュを全削除')
+    parser.add_argument('--stats', action='store_true', help='件数・サイズを表示')
+    args = parser.parse_args()
+
+    cache = WorkbookCache()
+    if args.clear:
+        cache.clear()
+        print(f'Cleared: {cache.root}')
+    if args.stats or not args.clear:
+        s = cache.stats()
+        print(f"{s['root']}: {s['entries']} workbooks, "
+              f"{s['bytes'] / 1024:.1f} KB / {s['maxBytes'] / 1024 / 1024:.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Excel ワークブック共有セッション
+
+各ソースファイルを一度だけ開き、シートを値のグリッドとして実体化して
+すべての extractor で共有する。
+
+  .xlsx  openpyxl read_only (ストリーミング) で読み込み
+  .xls   xlrd で読み込み (shift_jis)
+
+パース結果は workbook_cache.py のディスクキャッシュに保存され、
+ファイルが変わっていなければ次回以降はパースを省略する。
+ファイルごとのパース時間を記録し、report() で出力する。
+"""
+import os
+import posixpath
+import re
+import time
+import zipfile
+from xml.etree import ElementTree
+
+import numpy as np
+import openpyxl
+import xlrd
+from openpyxl.utils.cell import range_boundaries
+
+from label_index import LabelIndex
+from workbook_cache import WorkbookCache, cache_enabled
+
+_MERGE_CELL = re.compile(rb'<mergeCell ref="([A-Z]+[0-9]+:[A-Z]+[0-9]+)"')
+
+# .xlsx (OOXML) のシート名 → シート XML の解決に使う名前空間
+_NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# 参照したセル数 (profiling.py がステージごとの差分を取る)
+CELL_STATS = {'cells': 0}
+
+
+class Cell:
+    """openpyxl 互換の最小セル (value のみ)"""
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class Sheet:
+    """実体化済みシート。行は 0-indexed のタプルで保持する。
+
+    openpyxl 互換: cell(row, column) / iter_rows() / max_row / max_column (1-indexed)
+    xlrd 互換:     cell_value(r, c) / row_values(r) / nrows / ncols (0-indexed)
+    array:         NumPy object 配列 (table_layout の一括取得用)
+    merged:        結合セル範囲 [(r0, c0, r1, c1)] (0-indexed、両端を含む)
+    labels:        LabelIndex (label_index.py)
+    """
+
+    def __init__(self, title, rows, fill=None, merged=()):
+        self.title = title
+        self.merged = [tuple(m) for m in merged]
+        width = max((len(r) for r in rows), default=0)
+        self.rows = [tuple(r) + (fill,) * (width - len(r)) for r in rows]
+        self.fill = fill
+        self.nrows = len(self.rows)
+        self.ncols = width
+        self._array = None
+        self._labels = None
+
+    @property
+    def labels(self):
+        if self._labels is None:
+            CELL_STATS['cells'] += self.nrows * self.ncols
+            self._labels = LabelIndex(self)
+        return self._labels
+
+    @property
+    def array(self):
+        if self._array is None:
+            grid = np.empty((self.nrows, self.ncols), dtype=object)
+            for i, row in enumerate(self.rows):
+                grid[i, :] = row
+            self._array = grid
+        return self._array
+
+    @property
+    def max_row(self):
+        return self.nrows
+
+    @property
+    def max_column(self):
+        return self.ncols
+
+    def cell_value(self, r, c):
+        CELL_STATS['cells'] += 1
+        if 0 <= r < self.nrows and 0 <= c < self.ncols:
+            return self.rows[r][c]
+        return self.fill
+
+    def row_values(self, r):
+        CELL_STATS['cells'] += self.ncols
+        return list(self.rows[r])
+
+    def cell(self, row, column):
+        return Cell(self.cell_value(row - 1, column - 1))
+
+    def iter_rows(self, min_row=1, max_row=None, min_col=1, max_col=None, values_only=True):
+        if not values_only:
+            raise ValueError('Sheet.iter_rows() only supports values_only=True')
+        # openpyxl 同様、範囲外の行・列は空セルで埋める
+        max_row = self.nrows if max_row is None else max_row
+        max_col = self.ncols if max_col is None else max_col
+        width = max_col - min_col + 1
+        CELL_STATS['cells'] += max(0, max_row - min_row + 1) * width
+        for r in range(min_row - 1, max_row):
+            row = self.rows[r][min_col - 1:max_col] if r < self.nrows else ()
+            if len(row) < width:
+                row = row + (self.fill,) * (width - len(row))
+            yield row
+
+
+class Workbook:
+    """セッション内で共有されるワークブック。シートは初回アクセス時に実体化する。
+
+    キャッシュにあるシートはファイルを開かずに読み込む。
+    """
+
+    def __init__(self, session, path):
+        self.session = session
+        self.path = path
+        self.is_xls = path.lower().endswith('.xls')
+        self._book = None
+        self._sheets = {}
+        self._sheet_xml = None
+        self._meta = session.cache.load_meta(path) if session.cache else None
+
+    def _open(self):
+        if self._book is None:
+            start = time.perf_counter()
+            if self.is_xls:
+                # formatting_info=True で結合セル情報も読む
+                self._book = xlrd.open_workbook(self.path, encoding_override='shift_jis',
+                                                formatting_info=True)
+                names = self._book.sheet_names()
+                active = names[0]
+            else:
+                self._book = openpyxl.load_workbook(self.path, read_only=True, data_only=True)
+                names = self._book.sheetnames
+                active = self._book.active.title
+            self.session._add_time(self.path, time.perf_counter() - start, parsed=True)
+            self._meta = {'sheetnames': names, 'active': active}
+            if self.session.cache:
+                self.session.cache.store_meta(self.path, self._meta)
+        return self._book
+
+    def _parse_sheet(self, name):
+        book = self._open()
+        start = time.perf_counter()
+        if self.is_xls:
+            sh = book.sheet_by_name(name)
+            rows, fill = [sh.row_values(r) for r in range(sh.nrows)], ''
+            merged = [(rlo, clo, rhi - 1, chi - 1) for rlo, rhi, clo, chi in sh.merged_cells]
+        else:
+            ws = book[name]
+            # dimension タグが不正なファイルでも全行を読むため
+            ws.reset_dimensions()
+            rows, fill = list(ws.iter_rows(values_only=True)), None
+            merged = self._xlsx_merged(name)
+        self.session._add_time(self.path, time.perf_counter() - start, parsed=True)
+        if self.session.cache:
+            self.session.cache.store_sheet(self.path, name, rows, fill, merged)
+        return Sheet(name, rows, fill=fill, merged=merged)
+
+    def _xlsx_sheet_paths(self):
+        """シート名 → zip 内のシート XML パス (xl/workbook.xml と その .rels から解決)"""
+        if self._sheet_xml is None:
+            with zipfile.ZipFile(self.path) as zf:
+                book = ElementTree.fromstring(zf.read('xl/workbook.xml'))
+                rels = ElementTree.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+            targets = {r.get('Id'): r.get('Target') for r in rels.iter(f'{_NS_PKG_REL}Relationship')}
+            paths = {}
+            for sheet in book.iter(f'{_NS_MAIN}sheet'):
+                target = targets.get(sheet.get(f'{_NS_REL}id'))
+                if target:
+                    # Target は xl/ からの相対パス ('/xl/...' の絶対パスもある)
+                    paths[sheet.get('name')] = (target.lstrip('/') if target.startswith('/')
+                                                else posixpath.normpath(posixpath.join('xl', target)))
+            self._sheet_xml = paths
+        return self._sheet_xml
+
+    def _xlsx_merged(self, name):
+        """read_only モードでは merged_cells が読まれないため、シート XML を zip から直接読む"""
+        path = self._xlsx_sheet_paths().get(name)
+        if path is None:
+            return []
+        with zipfile.ZipFile(self.path) as zf:
+            xml = zf.read(path)
+        merged = []
+        for ref in _MERGE_CELL.findall(xml):
+            min_col, min_row, max_col, max_row = range_boundaries(ref.decode('ascii'))
+            merged.append((min_row - 1, min_col - 1, max_row - 1, max_col - 1))
+        return merged
+
+    def stream_rows(self, name, max_row=None):
+        """シートの行を先頭から1行ずつ返す (実体化・キャッシュ保存しない)
+
+        小選挙区の候補者別得票数 (shou_candidates.py) のような大きな表を、
+        全行をメモリに持たずに読むため。
+        実体化済み・キャッシュ済みのシートはその行を返す。
+        """
+        if name in self._sheets or (self.session.cache and self.session.cache.has_sheet(self.path, name)):
+            sheet = self[name]
+            yield from sheet.iter_rows(max_row=sheet.nrows if max_row is None else min(max_row, sheet.nrows))
+            return
+        book = self._open()
+        if self.is_xls:
+            sh = book.sheet_by_name(name)
+            for r in range(sh.nrows if max_row is None else min(max_row, sh.nrows)):
+                CELL_STATS['cells'] += sh.ncols
+                yield tuple(sh.row_values(r))
+        else:
+            ws = book[name]
+            ws.reset_dimensions()
+            for row in ws.iter_rows(max_row=max_row, values_only=True):
+                CELL_STATS['cells'] += len(row)
+                yield row
+
+    @property
+    def sheetnames(self):
+        if self._meta is None:
+            self._open()
+        return self._meta['sheetnames']
+
+    @property
+    def active(self):
+        if self._meta is None:
+            self._open()
+        return self[self._meta['active']]
+
+    def sheet_by_index(self, index):
+        return self[self.sheetnames[index]]
+
+    def __getitem__(self, name):
+        if name not in self._sheets:
+            sheet = None
+            if self.session.cache:
+                start = time.perf_counter()
+                cached = self.session.cache.load_sheet(self.path, name)
+                if cached is not None:
+                    rows, merged = cached
+                    sheet = Sheet(name, rows, fill='' if self.is_xls else None, merged=merged)
+                    self.session._add_time(self.path, time.perf_counter() - start)
+            if sheet is None:
+                if name not in self.sheetnames:
+                    raise KeyError(f'Worksheet {name} does not exist.')
+                sheet = self._parse_sheet(name)
+            self._sheets[name] = sheet
+        return self._sheets[name]
+
+    def close(self):
+        if self._book is not None and not self.is_xls:
+            self._book.close()
+
+
+class WorkbookSession:
+    """ファイルパス → Workbook のキャッシュ。同じファイルは一度しか開かない。"""
+
+    def __init__(self, base=None, cache=None):
+        self.base = base
+        if cache is None and cache_enabled():
+            cache = WorkbookCache()
+        self.cache = cache or None
+        self._books = {}
+        self.timings = {}
+        self._parsed = set()
+
+    def resolve(self, path):
+        if self.base and not os.path.isabs(path):
+            path = os.path.join(self.base, path)
+        return os.path.abspath(path)
+
+    def open(self, path):
+        path = self.resolve(path)
+        if path not in self._books:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f'No such file: {path}')
+            self._books[path] = Workbook(self, path)
+        return self._books[path]
+
+    def sheet(self, path, name=None):
+        """シートを取得 (name 省略時はアクティブシート)"""
+        wb = self.open(path)
+        return wb.active if name is None else wb[name]
+
+    def _add_time(self, path, seconds, parsed=False):
+        self.timings[path] = self.timings.get(path, 0.0) + seconds
+        if parsed:
+            self._parsed.add(path)
+
+    def report(self):
+        """ファイルごとのパース時間を出力"""
+        if not self.timings:
+            return
+        print('\n--- Workbook parse time ---')
+        for path, seconds in sorted(self.timings.items(), key=lambda x: -x[1]):
+            source = 'parsed' if path in self._parsed else 'cached'
+            print(f'  {seconds * 1000:8.1f} ms  {source}  {os.path.basename(path)}')
+
+    def close(self):
+        for wb in self._books.values():
+            wb.close()
+        self._books.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        self.report()
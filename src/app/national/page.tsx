@@ -1,6 +1,6 @@
 'use client';
 
-import { useEffect, useState } from 'react';
+import { useCallback, useEffect, useState } from 'react';
 import { AppShell } from '@/components/app-shell';
 import { Header } from '@/components/layout/header';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
@@ -10,14 +10,22 @@ import { NationalHireiView } from '@/components/election/NationalHireiView';
 import { NationalShouView } from '@/components/election/NationalShouView';
 import { VoteRateTrendChart } from '@/components/election/VoteRateTrendChart';
 import { Calendar, Building, ListOrdered, TrendingUp } from 'lucide-react';
-import type { NationalElectionData } from '@/types/national-election';
+import { loadElectionOverview, loadHireiBlock } from '@/lib/election-shards';
+import type { ElectionOverview, HireiBlockOverview } from '@/types/national-election';
 
+// scripts/party_trends.py が選挙ごとの JSON から生成
 interface NationalTrendData {
   shugiin_hirei: Array<Record<string, string | number>>;
   sangiin_hirei: Array<Record<string, string | number>>;
+  shugiin_seats?: Array<Record<string, string | number>>;
+  sangiin_seats?: Array<Record<string, string | number>>;
 }
 
-const TREND_PARTIES = ['自由民主党', '立憲民主党', '公明党', '日本共産党', '日本維新の会', '国民民主党', 'れいわ新選組', '参政党'];
+const TREND_PARTIES = ['自由民主党', '立憲民主党', '中道改革連合', '公明党', '日本共産党', '日本維新の会', '国民民主党', 'れいわ新選組', '参政党'];
+
+function trendYears(rows: Array<Record<string, string | number>>): string {
+  return rows.map((d) => String(d.year)).join('・');
+}
 
 type ElectionType = 'shugiin' | 'sangiin';
 
@@ -46,7 +54,7 @@ const ELECTION_DATES: Record<string, string> = {
 function NationalContent() {
   const [electionType, setElectionType] = useState<ElectionType>('shugiin');
   const [year, setYear] = useState('2026');
-  const [data, setData] = useState<NationalElectionData | null>(null);
+  const [data, setData] = useState<ElectionOverview | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(false);
   const [trendData, setTrendData] = useState<NationalTrendData | null>(null);
@@ -75,11 +83,8 @@ function NationalContent() {
     if (!isValidCombination) return;
     setLoading(true);
     setError(false);
-    fetch(`/data/elections/${electionType}_${year}.json`)
-      .then((res) => {
-        if (!res.ok) throw new Error('Not found');
-        return res.json();
-      })
+    // 概要 (index.json) を先に読み、比例ブロックの得票・名簿はビューが後から読む
+    loadElectionOverview(electionType, year)
       .then((jsonData) => {
         setData(jsonData);
         setLoading(false);
@@ -91,6 +96,11 @@ function NationalContent() {
       });
   }, [electionType, year, isValidCombination]);
 
+  const loadBlock = useCallback(
+    (block: HireiBlockOverview) => loadHireiBlock(electionType, year, block),
+    [electionType, year]
+  );
+
   const isSangiin = electionType === 'sangiin';
   const dateKey = `${electionType}_${year}`;
   const districtLabel = isSangiin ? '選挙区' : '小選挙区';
@@ -202,6 +212,7 @@ function NationalContent() {
             <NationalHireiView
               blocks={data.hirei.blocks}
               totalSeats={data.hirei.totalSeats}
+              loadBlock={loadBlock}
             />
           </TabsContent>
         </Tabs>
@@ -213,13 +224,13 @@ function NationalContent() {
           <div className="flex items-center gap-2">
             <TrendingUp className="h-5 w-5 text-primary" />
             <h2 className="text-base font-semibold">比例代表 得票率推移</h2>
-            <Badge variant="outline" className="text-xs">過去3回分</Badge>
+            <Badge variant="outline" className="text-xs">衆院{trendData.shugiin_hirei.length}回・参院{trendData.sangiin_hirei.length}回</Badge>
           </div>
 
           <div className="grid grid-cols-1 xl:grid-cols-2 gap-4">
             <Card>
               <CardHeader className="pb-2">
-                <CardTitle className="text-sm font-medium">衆院比例 得票率推移（2017・2021・2024年）</CardTitle>
+                <CardTitle className="text-sm font-medium">衆院比例 得票率推移（{trendYears(trendData.shugiin_hirei)}年）</CardTitle>
               </CardHeader>
               <CardContent>
                 <VoteRateTrendChart
@@ -234,7 +245,7 @@ function NationalContent() {
 
             <Card>
               <CardHeader className="pb-2">
-                <CardTitle className="text-sm font-medium">参院比例 得票率推移（2019・2022・2025年）</CardTitle>
+                <CardTitle className="text-sm font-medium">参院比例 得票率推移（{trendYears(trendData.sangiin_hirei)}年）</CardTitle>
               </CardHeader>
               <CardContent>
                 <VoteRateTrendChart
@@ -37,6 +37,7 @@ import {
 } from 'recharts';
 import { getPartyColor } from '@/constants/parties';
 import { formatNumber, formatPercent } from '@/lib/utils';
+import { readMunicipalityResults } from '@/lib/municipality-matrix';
 import { Vote, Users, TrendingUp, TrendingDown, MapPin, Search, Trophy, ArrowUpDown } from 'lucide-react';
 
 type ElectionYear = '2024' | '2026';
@@ -194,8 +195,8 @@ function TokyoContent() {
           ? '/data/tokyo-hirei-all.json'
           : '/data/tokyo-hirei-2024.json';
         const syosenkyokuFile = selectedYear === '2026'
-          ? '/data/tokyo-syosenkyoku-2026.json'
-          : '/data/tokyo-syosenkyoku-2024.json';
+          ? '/data/tokyo-syosenkyoku-2026.matrix.json'
+          : '/data/tokyo-syosenkyoku-2024.matrix.json';
         const syosenkyokuCandidateFile = '/data/tokyo-syosenkyoku.json';
 
         const [hireiRes, syosenkyokuRes, candidateRes, rankingHireiRes, rankingShouRes] = await Promise.all([
@@ -213,7 +214,7 @@ function TokyoContent() {
 
         if (syosenkyokuRes.ok) {
           const syosenkyokuJson = await syosenkyokuRes.json();
-          setSyosenkyokuData(syosenkyokuJson);
+          setSyosenkyokuData(readMunicipalityResults(syosenkyokuJson));
         }
 
         if (candidateRes && candidateRes.ok) {
@@ -25,16 +25,18 @@ import {
 import { getPartyColor } from '@/constants/parties';
 import { formatNumber, formatPercent } from '@/lib/utils';
 import { ChevronRight, ChevronLeft, ArrowUpDown } from 'lucide-react';
-import type { HireiBlock, HireiPartyBlock, HireiCandidate } from '@/types/national-election';
+import type { HireiBlock, HireiBlockOverview, HireiCandidate } from '@/types/national-election';
 
 interface NationalHireiViewProps {
-  blocks: HireiBlock[];
+  blocks: HireiBlockOverview[];
   totalSeats: number;
+  /** 政党別得票・名簿候補者を含むブロック詳細の読み込み */
+  loadBlock: (block: HireiBlockOverview) => Promise<HireiBlock>;
 }
 
 type SortKey = 'rank' | 'name' | 'sekihairitsu' | 'votes' | 'result';
 
-export function NationalHireiView({ blocks, totalSeats }: NationalHireiViewProps) {
+export function NationalHireiView({ blocks, totalSeats, loadBlock }: NationalHireiViewProps) {
   const isSingleBlock = blocks.length === 1;
   const [selectedBlock, setSelectedBlock] = useState<string | null>(
     isSingleBlock ? blocks[0].name : null
@@ -42,6 +44,7 @@ export function NationalHireiView({ blocks, totalSeats }: NationalHireiViewProps
   const [selectedParty, setSelectedParty] = useState<string | null>(null);
   const [sortKey, setSortKey] = useState<SortKey>('rank');
   const [sortAsc, setSortAsc] = useState(true);
+  const [detailedBlocks, setDetailedBlocks] = useState<Record<string, HireiBlock>>({});
 
   // blocks が変わったらリセット (選挙種別切り替え対応)
   useEffect(() => {
@@ -51,12 +54,26 @@ export function NationalHireiView({ blocks, totalSeats }: NationalHireiViewProps
       setSelectedBlock(null);
     }
     setSelectedParty(null);
+    setDetailedBlocks({});
   }, [blocks, isSingleBlock]);
 
-  const currentBlock = useMemo(
-    () => blocks.find((b) => b.name === selectedBlock) || null,
-    [blocks, selectedBlock]
-  );
+  // 選択したブロックの詳細だけを読み込む
+  useEffect(() => {
+    if (!selectedBlock || detailedBlocks[selectedBlock]) return;
+    const block = blocks.find((b) => b.name === selectedBlock);
+    if (!block) return;
+    let cancelled = false;
+    loadBlock(block)
+      .then((detail) => {
+        if (!cancelled) setDetailedBlocks((prev) => ({ ...prev, [block.name]: detail }));
+      })
+      .catch(console.error);
+    return () => {
+      cancelled = true;
+    };
+  }, [blocks, selectedBlock, loadBlock, detailedBlocks]);
+
+  const currentBlock = (selectedBlock && detailedBlocks[selectedBlock]) || null;
 
   const currentPartyBlock = useMemo(
     () => currentBlock?.parties.find((p) => p.party === selectedParty) || null,
@@ -88,18 +105,12 @@ export function NationalHireiView({ blocks, totalSeats }: NationalHireiViewProps
 
   // ブロック別サマリーチャート
   const blockSummaryData = useMemo(() => {
-    return blocks.map((block) => {
-      const entry: Record<string, string | number> = { name: block.name, totalSeats: block.totalSeats };
-      block.parties.forEach((p) => {
-        entry[p.party] = p.seats;
-      });
-      return entry;
-    });
+    return blocks.map((block) => ({ name: block.name, totalSeats: block.totalSeats, ...block.seats }));
   }, [blocks]);
 
   const allParties = useMemo(() => {
     const parties = new Set<string>();
-    blocks.forEach((b) => b.parties.forEach((p) => parties.add(p.party)));
+    blocks.forEach((b) => Object.keys(b.seats).forEach((party) => parties.add(party)));
     return Array.from(parties);
   }, [blocks]);
 
@@ -172,16 +183,15 @@ export function NationalHireiView({ blocks, totalSeats }: NationalHireiViewProps
                   総投票数: {formatNumber(block.totalVotes)}
                 </div>
                 <div className="flex flex-wrap gap-1">
-                  {block.parties
-                    .filter((p) => p.seats > 0)
-                    .sort((a, b) => b.seats - a.seats)
-                    .map((p) => (
+                  {Object.entries(block.seats)
+                    .sort(([, a], [, b]) => b - a)
+                    .map(([party, seats]) => (
                       <Badge
-                        key={p.party}
-                        style={{ backgroundColor: getPartyColor(p.party), color: '#fff' }}
+                        key={party}
+                        style={{ backgroundColor: getPartyColor(party), color: '#fff' }}
                         className="text-xs"
                       >
-                        {p.party.length > 4 ? p.party.slice(0, 4) + '…' : p.party} {p.seats}
+                        {party.length > 4 ? party.slice(0, 4) + '…' : party} {seats}
                       </Badge>
                     ))}
                 </div>
@@ -193,8 +203,17 @@ export function NationalHireiView({ blocks, totalSeats }: NationalHireiViewProps
     );
   }
 
+  // ブロック詳細の読み込み中
+  if (!currentBlock) {
+    return (
+      <div className="flex items-center justify-center h-64">
+        <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-primary" />
+      </div>
+    );
+  }
+
   // ブロック選択 → 政党別結果表示
-  if (!selectedParty && currentBlock) {
+  if (!selectedParty) {
     return (
       <div className="space-y-6">
         {!isSingleBlock && (
@@ -285,7 +304,7 @@ export function NationalHireiView({ blocks, totalSeats }: NationalHireiViewProps
   }
 
   // 候補者リスト表示
-  if (currentPartyBlock && currentBlock) {
+  if (currentPartyBlock) {
     return (
       <div className="space-y-6">
         <div className="flex items-center gap-2 flex-wrap">
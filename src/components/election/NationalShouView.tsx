@@ -30,10 +30,10 @@ import {
 } from 'recharts';
 import { getPartyColor } from '@/constants/parties';
 import { formatNumber, formatPercent } from '@/lib/utils';
-import type { ShouPrefectureSummary } from '@/types/national-election';
+import type { ShouPrefectureOverview } from '@/types/national-election';
 
 interface NationalShouViewProps {
-  prefectures: ShouPrefectureSummary[];
+  prefectures: ShouPrefectureOverview[];
   totalSeats: number;
 }
 
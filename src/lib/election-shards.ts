@@ -0,0 +1,95 @@
+/**
+ * 全国選挙データの分割出力 (scripts/election_shards.py) の読み込み
+ *
+ * elections/{type}_{year}/index.json が概要 (都道府県別の政党得票・議席、ブロック・
+ * 政党別の議席数)、hirei/{blockId}.json がブロックごとの詳細 (得票・名簿)。
+ * 分割出力がない場合は全体ファイル elections/{type}_{year}.json から作る。
+ */
+import type {
+  ElectionOverview,
+  HireiBlock,
+  HireiBlockOverview,
+  NationalElectionData,
+} from '@/types/national-election';
+
+const shardCache = new Map<string, Promise<unknown>>();
+
+function fetchJson<T>(url: string): Promise<T> {
+  let cached = shardCache.get(url);
+  if (!cached) {
+    cached = fetch(url).then((res) => {
+      if (!res.ok) throw new Error(`Not found: ${url}`);
+      return res.json();
+    });
+    // 失敗した読み込みはキャッシュしない
+    cached.catch(() => shardCache.delete(url));
+    shardCache.set(url, cached);
+  }
+  return cached as Promise<T>;
+}
+
+function shardBase(electionType: string, year: string): string {
+  return `/data/elections/${electionType}_${year}`;
+}
+
+function loadElection(electionType: string, year: string): Promise<NationalElectionData> {
+  return fetchJson<NationalElectionData>(`${shardBase(electionType, year)}.json`);
+}
+
+function seatMap(rows: { party: string; seats: number }[]): Record<string, number> {
+  return Object.fromEntries(rows.filter((r) => r.seats > 0).map((r) => [r.party, r.seats]));
+}
+
+/**
+ * 全体ファイル → 概要 (index.json と同じ形)
+ */
+function toOverview(data: NationalElectionData): ElectionOverview {
+  return {
+    year: data.year,
+    electionDate: data.electionDate,
+    hirei: {
+      totalSeats: data.hirei.totalSeats,
+      blocks: data.hirei.blocks.map((b) => ({
+        name: b.name,
+        totalSeats: b.totalSeats,
+        totalVotes: b.totalVotes,
+        seats: seatMap(b.parties),
+      })),
+    },
+    shou: {
+      totalSeats: data.shou.totalSeats,
+      prefectures: data.shou.prefectures,
+    },
+  };
+}
+
+/**
+ * 概要 (index.json)。分割出力がなければ全体ファイルから作る
+ */
+export async function loadElectionOverview(
+  electionType: string,
+  year: string
+): Promise<ElectionOverview> {
+  try {
+    return await fetchJson<ElectionOverview>(`${shardBase(electionType, year)}/index.json`);
+  } catch {
+    return toOverview(await loadElection(electionType, year));
+  }
+}
+
+/**
+ * 比例ブロックの詳細 (政党別得票・名簿候補者)
+ */
+export async function loadHireiBlock(
+  electionType: string,
+  year: string,
+  block: HireiBlockOverview
+): Promise<HireiBlock> {
+  if (block.shard) {
+    return fetchJson<HireiBlock>(`${shardBase(electionType, year)}/${block.shard}`);
+  }
+  const data = await loadElection(electionType, year);
+  const detail = data.hirei.blocks.find((b) => b.name === block.name);
+  if (!detail) throw new Error(`Unknown block: ${block.name}`);
+  return detail;
+}
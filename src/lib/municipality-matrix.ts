@@ -0,0 +1,110 @@
+/**
+ * 区市町村別結果の行列形式 (scripts/matrix_encoding.py) の読み込み
+ *
+ * 行列形式は政党名・選挙区・区分を一度だけ持ち、得票数と得票率 (ベーシスポイント)
+ * を [区市町村][政党] の整数配列で持つ。ページは従来の区市町村ごとのオブジェクト
+ * 形式を前提にしているため、読み込み時に変換する。
+ */
+
+export const MUNICIPALITY_MATRIX_FORMAT = 'municipality-matrix/v1';
+
+export interface MunicipalityMatrix {
+  format: typeof MUNICIPALITY_MATRIX_FORMAT;
+  electionType: string;
+  electionDate: string;
+  parties: string[];
+  partyIds?: (number | null)[];
+  districts: string[];
+  types: string[];
+  municipalities: {
+    name: string[];
+    district: number[];
+    type: number[];
+    totalVotes: number[];
+  };
+  votes: number[][];
+  rateBp: number[][];
+  total: {
+    totalVotes: number;
+    votes: number[];
+    rateBp: number[];
+    seats: number[];
+  };
+}
+
+export interface MunicipalityPartyCell {
+  votes: number;
+  rate: number;
+  seats?: number;
+}
+
+export interface MunicipalityRow {
+  name: string;
+  district: string;
+  type: string;
+  totalVotes: number;
+  [partyName: string]: string | number | MunicipalityPartyCell;
+}
+
+export interface MunicipalityResults {
+  electionType: string;
+  electionDate: string;
+  parties: string[];
+  total: {
+    totalVotes: number;
+    [partyName: string]: number | MunicipalityPartyCell;
+  };
+  municipalities: MunicipalityRow[];
+}
+
+export function isMunicipalityMatrix(json: unknown): json is MunicipalityMatrix {
+  return (
+    typeof json === 'object' &&
+    json !== null &&
+    (json as { format?: unknown }).format === MUNICIPALITY_MATRIX_FORMAT
+  );
+}
+
+/**
+ * 行列形式 → 区市町村ごとのオブジェクト形式
+ */
+export function decodeMunicipalityMatrix(matrix: MunicipalityMatrix): MunicipalityResults {
+  const { parties, districts, types, municipalities: cols } = matrix;
+
+  const municipalities = cols.name.map((name, i) => {
+    const row: MunicipalityRow = {
+      name,
+      district: districts[cols.district[i]],
+      type: types[cols.type[i]],
+      totalVotes: cols.totalVotes[i],
+    };
+    parties.forEach((party, j) => {
+      row[party] = { votes: matrix.votes[i][j], rate: matrix.rateBp[i][j] / 100 };
+    });
+    return row;
+  });
+
+  const total: MunicipalityResults['total'] = { totalVotes: matrix.total.totalVotes };
+  parties.forEach((party, j) => {
+    total[party] = {
+      votes: matrix.total.votes[j],
+      rate: matrix.total.rateBp[j] / 100,
+      seats: matrix.total.seats[j],
+    };
+  });
+
+  return {
+    electionType: matrix.electionType,
+    electionDate: matrix.electionDate,
+    parties,
+    total,
+    municipalities,
+  };
+}
+
+/**
+ * 行列形式・従来形式のどちらでも従来形式で返す
+ */
+export function readMunicipalityResults(json: unknown): MunicipalityResults {
+  return isMunicipalityMatrix(json) ? decodeMunicipalityMatrix(json) : (json as MunicipalityResults);
+}
@@ -69,6 +69,67 @@ export interface NationalElectionData {
   shou: {
     totalSeats: number;
     prefectures: ShouPrefectureSummary[];
-    districts: ShouDistrict[];
+    districts: ShouDistrict[];  // 全体ファイルでは空。候補者別得票数のファイルがあれば都道府県シャード（shou/{prefId}.json）に入る
   };
 }
+
+/** 政党別の全国合計（分割出力の index.json） */
+export interface NationalPartyTotal {
+  party: string;
+  partyId: number | null;
+  hireiVotes: number;
+  hireiSeats: number;
+  shouVotes: number;
+  shouSeats: number;
+  seats: number;
+}
+
+/** 比例ブロックの概要（得票・名簿は HireiBlock） */
+export interface HireiBlockOverview {
+  name: string;
+  totalSeats: number;
+  totalVotes: number;
+  seats: Record<string, number>;  // 政党名 → 獲得議席（議席のある政党のみ）
+  shard?: string;                 // 分割ファイル（hirei/{blockId}.json）
+}
+
+/** 都道府県の概要（政党別の得票・議席は全体ファイルと同じ） */
+export interface ShouPrefectureOverview extends ShouPrefectureSummary {
+  shard?: string;                 // 分割ファイル（shou/{prefId}.json）
+  districtCount?: number;         // 分割ファイルの選挙区数
+}
+
+/** 全国選挙の概要（初回表示用、比例ブロックは議席数のみ） */
+export interface ElectionOverview {
+  year: number;
+  electionDate: string;
+  hirei: {
+    totalSeats: number;
+    blocks: HireiBlockOverview[];
+  };
+  shou: {
+    totalSeats: number;
+    prefectures: ShouPrefectureOverview[];
+  };
+}
+
+/** 分割出力の概要（elections/{type}_{year}/index.json、scripts/election_shards.py が出力） */
+export interface ElectionShardIndex extends ElectionOverview {
+  format: 'election-shards/v2';
+  national: NationalPartyTotal[];
+}
+
+/** 次元レジストリ（elections/dimensions.json、scripts/dimensions.py が出力） */
+export interface ElectionDimensions {
+  format: 'dimensions/v1';
+  prefectures: { id: number; name: string; blockId: number }[];
+  sangiinDistricts: { id: number; name: string; prefIds: number[] }[];
+  blocks: { id: number; name: string; prefIds: number[] }[];
+  parties: {
+    id: number;
+    name: string;
+    shortName: string;
+    aliases: string[];
+    predecessorIds: number[];
+  }[];
+}
@@ -0,0 +1,20 @@
+import os
+
+from build_all import discover_converters, run_converter
+from dimensions import write_dimensions
+
+
+def test_converters_write_into_empty_output_root(tmp_path, monkeypatch):
+    root = tmp_path / 'data'
+    monkeypatch.setenv('ELECTION_OUTPUT_ROOT', str(root))
+    monkeypatch.setenv('ELECTION_WORKBOOK_CACHE', '0')
+    converters = discover_converters()
+
+    for name in ('convert_csv_summary', 'convert_sangiin_2022'):
+        result = run_converter(name, converters[name])
+        assert result['ok'], result['log']
+    write_dimensions()
+
+    assert os.path.exists(root / 'csv-summary.json')
+    assert os.path.exists(root / 'elections' / 'sangiin_2022' / 'index.json')
+    assert os.path.exists(root / 'elections' / 'dimensions.json')
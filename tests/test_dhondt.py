@@ -0,0 +1,57 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from dhondt import allocate, check_seats, vote_matrix
+from paths import REPO_ROOT
+
+ELECTIONS = os.path.join(REPO_ROOT, 'public', 'data', 'elections')
+
+
+def test_allocate_textbook():
+    # 商: 1000 800 500 400 333 300 266 | 250 …
+    assert allocate([1000, 800, 300], 7).tolist() == [3, 3, 1]
+
+
+def test_allocate_batch_matches_rows():
+    votes = np.array([[1000, 800, 300], [10, 0, 5], [0, 0, 0]])
+    seats = np.array([7, 2, 3])
+    out = allocate(votes, seats)
+    assert out.tolist() == [allocate(v, s).tolist() for v, s in zip(votes, seats)]
+    # 得票のない政党・行には配分しない
+    assert out[1].tolist() == [2, 0, 0]
+    assert out[2].tolist() == [0, 0, 0]
+
+
+def test_caps_pass_seats_to_next_quotient():
+    assert allocate([1000, 800, 300], 7, caps=[2, 10, 10]).tolist() == [2, 4, 1]
+    # 全政党が上限に達すれば定数を満たさない
+    assert allocate([1000, 800], 5, caps=[1, 1]).tolist() == [1, 1]
+
+
+def test_ties_break_by_column_and_are_flagged():
+    seats, ties = allocate([100, 100, 10], 1, return_ties=True)
+    assert seats.tolist() == [1, 0, 0]
+    assert bool(ties)
+    seats, ties = allocate([[100, 100], [100, 99]], 1, return_ties=True)
+    assert ties.tolist() == [True, False]
+
+
+@pytest.mark.parametrize('name', ['sangiin_2022', 'sangiin_2025'])
+def test_published_seats(name):
+    with open(os.path.join(ELECTIONS, f'{name}.json'), encoding='utf-8') as f:
+        blocks = json.load(f)['hirei']['blocks']
+    m = vote_matrix(blocks)
+    assert (allocate(m.votes, m.total_seats) == m.seats).all()
+    assert check_seats(blocks) == []
+
+
+def test_check_seats_reports_differences():
+    blocks = [{'name': '東北', 'totalSeats': 2, 'parties': [
+        {'party': '甲', 'votes': 300, 'seats': 1}, {'party': '乙', 'votes': 100, 'seats': 1}]}]
+    assert check_seats(blocks) == [
+        {'block': '東北', 'party': '甲', 'votes': 300, 'parsed': 1, 'computed': 2},
+        {'block': '東北', 'party': '乙', 'votes': 100, 'parsed': 1, 'computed': 0},
+    ]
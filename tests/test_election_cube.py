@@ -0,0 +1,74 @@
+import numpy as np
+
+from election_cube import rollup
+
+# 全国 ← 都道府県 A, B ← 区市町村 a1, a2 (A), b1 (B)
+NATION, A, B, A1, A2, B1 = range(6)
+DEPTH = np.array([0, 1, 1, 2, 2, 2])
+PARENT = [-1, NATION, NATION, A, A, B]
+
+
+def _cube(data):
+    """data: {(地域, 選挙): [政党0, 政党1]} → votes, seats, direct (種別1つ、選挙2回)"""
+    votes = np.full((1, 2, len(DEPTH), 2), np.nan)
+    for (g, e), row in data.items():
+        votes[0, :, g, e] = row
+    seats = np.where(np.isnan(votes), np.nan, 1.0)
+    direct = ~np.isnan(votes).all(axis=1)
+    parents = np.repeat(np.array(PARENT)[:, None], 2, axis=1)
+    return votes, seats, direct, parents
+
+
+def test_rollup_sums_children_level_by_level():
+    votes, seats, direct, parents = _cube({
+        (A1, 0): [10, 1], (A2, 0): [20, 2], (B1, 0): [5, 5],
+    })
+    filled = rollup(votes, seats, direct, parents, DEPTH)
+
+    assert votes[0, :, A, 0].tolist() == [30, 3]
+    assert votes[0, :, B, 0].tolist() == [5, 5]
+    assert votes[0, :, NATION, 0].tolist() == [35, 8]
+    assert seats[0, :, NATION, 0].tolist() == [3, 3]
+    assert filled[0, :, 0].tolist() == [True, True, True, False, False, False]
+    # 2回目の選挙はデータがないので何も埋めない
+    assert np.isnan(votes[..., 1]).all()
+    assert not filled[..., 1].any()
+
+
+def test_rollup_skips_parents_with_missing_children():
+    votes, seats, direct, parents = _cube({
+        (A1, 1): [10, 1], (B1, 1): [5, 5],
+    })
+    filled = rollup(votes, seats, direct, parents, DEPTH)
+
+    # a2 がない A は部分和にせず、A がない全国も埋めない
+    assert np.isnan(votes[0, :, A, 1]).all()
+    assert np.isnan(votes[0, :, NATION, 1]).all()
+    assert votes[0, :, B, 1].tolist() == [5, 5]
+    assert filled[0, :, 1].tolist() == [False, False, True, False, False, False]
+
+
+def test_rollup_keeps_direct_values():
+    votes, seats, direct, parents = _cube({
+        (A1, 0): [10, 1], (A2, 0): [20, 2], (B1, 0): [5, 5], (B, 0): [7, 7],
+    })
+    filled = rollup(votes, seats, direct, parents, DEPTH)
+
+    # 元のデータがある B はそのまま、全国は A (子の合計) と B (元のデータ) の合計
+    assert votes[0, :, B, 0].tolist() == [7, 7]
+    assert not filled[0, B, 0]
+    assert votes[0, :, NATION, 0].tolist() == [37, 10]
+
+
+def test_rollup_uses_per_election_parents():
+    votes, seats, direct, parents = _cube({
+        (A1, 0): [10, 1], (A2, 0): [20, 2], (B1, 0): [5, 5],
+        (A1, 1): [10, 1], (A2, 1): [20, 2], (B1, 1): [5, 5],
+    })
+    # 2回目の選挙では a2 が B に属する (区割りの変更)
+    parents[A2, 1] = B
+    rollup(votes, seats, direct, parents, DEPTH)
+
+    assert votes[0, :, A, 1].tolist() == [10, 1]
+    assert votes[0, :, B, 1].tolist() == [25, 7]
+    assert votes[0, :, NATION, 0].tolist() == votes[0, :, NATION, 1].tolist()
@@ -0,0 +1,111 @@
+import json
+
+from election_shards import write_shards
+from hirei_revival import DistrictResults, compute_revival
+from shou_candidates import iter_sheet_districts
+
+
+def _district(*candidates):
+    return {'prefecture': '宮城県', 'district': 1, 'candidates': [
+        {'name': name, 'party': party, 'votes': votes, 'result': result, 'isDualCandidate': True}
+        for name, party, votes, result in candidates
+    ]}
+
+
+def _entry(party, rank, name, dual=True, block='東北', result=None):
+    return {'block': block, 'party': party, 'rank': rank, 'name': name, 'age': 50, 'dual': dual,
+            'result': result}
+
+
+def _results(*districts):
+    results = DistrictResults()
+    for _ in results.tap(districts):
+        pass
+    return results
+
+
+def _candidates(blocks, party):
+    return {c['name']: c for p in blocks[0]['parties'] if p['party'] == party for c in p['candidates']}
+
+
+def test_revival_by_rank_then_sekihairitsu():
+    results = _results(
+        _district(('乙', '自由民主党', 100, '当'), ('甲', '立憲民主党', 50, '落')),
+        _district(('丙', '自由民主党', 90, '落'), ('丁', '立憲民主党', 100, '当')),
+        _district(('戊', '自由民主党', 80, '落'), ('己', '立憲民主党', 100, '当')),
+        _district(('庚', '自由民主党', 5, '落'), ('辛', '立憲民主党', 100, '当')),
+    )
+    entries = [
+        _entry('自由民主党', 1, '名簿一', dual=False),
+        _entry('自由民主党', 2, '乙'),
+        _entry('自由民主党', 2, '戊'),
+        _entry('自由民主党', 2, '丙'),
+        _entry('自由民主党', 2, '庚'),
+        _entry('自由民主党', 3, '名簿二', dual=False),
+    ]
+    blocks = [{'name': '東北', 'totalSeats': 3, 'parties': [{'party': '自由民主党', 'seats': 3}]}]
+
+    out, report = compute_revival(blocks, entries, results)
+    listed = _candidates(out, '自由民主党')
+
+    # 小選挙区の当選者は名簿から除き、同順位は惜敗率 (丙 90% > 戊 80%) の順
+    assert '乙' not in listed
+    assert [c['name'] for c in out[0]['parties'][0]['candidates']] == ['名簿一', '丙', '戊', '庚', '名簿二']
+    assert listed['名簿一']['result'] == '当'
+    assert listed['丙']['result'] == '比当'
+    assert listed['丙']['sekihairitsu'] == 90.0
+    assert listed['戊']['result'] == '比当'
+    # 供託金没収点 (有効投票の1/10) 未満は比例で当選しない
+    assert listed['庚']['result'] == '落'
+    assert listed['名簿二']['result'] == '落'
+    assert report['districtWinners'] == 1
+    assert report['forfeited'] == 1
+    assert report['revived'] == 2
+    assert report['mismatches'] == []
+
+
+def test_unregistered_parties_keep_their_own_seats():
+    entries = [_entry('無名党甲', 1, '甲', dual=False), _entry('無名党乙', 1, '乙', dual=False)]
+    blocks = [{'name': '東北', 'totalSeats': 2, 'parties': [
+        {'party': '無名党甲', 'seats': 1}, {'party': '無名党乙', 'seats': 1}]}]
+
+    out, report = compute_revival(blocks, entries, _results())
+
+    assert [[c['name'] for c in p['candidates']] for p in out[0]['parties']] == [['甲'], ['乙']]
+    assert report['elected'] == 2
+    assert report['mismatches'] == []
+
+
+def test_disagreement_with_parsed_result():
+    entries = [_entry('自由民主党', 1, '甲', dual=False, result='落'),
+               _entry('自由民主党', 2, '乙', dual=False, result='当')]
+    blocks = [{'name': '東北', 'totalSeats': 1, 'parties': [{'party': '自由民主党', 'seats': 1}]}]
+
+    _, report = compute_revival(blocks, entries, _results())
+
+    assert {(d['name'], d['computed']) for d in report['disagreements']} == {('甲', True), ('乙', False)}
+
+
+def test_write_shards_revives_from_streamed_candidates(tmp_path):
+    rows = [
+        ['選挙区', '候補者名', '年齢', '党派', '得票数', '当落', '重複'],
+        ['宮城県'],
+        ['1区', '甲', 50, '自由民主党', 100, '当', '○'],
+        [None, '乙', 45, '立憲民主党', 80, '', '○'],
+    ]
+    data = {
+        'hirei': {'totalSeats': 1, 'blocks': [{'name': '東北', 'totalSeats': 1, 'totalVotes': 100, 'parties': [
+            {'party': '自由民主党', 'votes': 60, 'seats': 0}, {'party': '立憲民主党', 'votes': 40, 'seats': 1}]}]},
+        'shou': {'totalSeats': 1, 'districts': [],
+                 'prefectures': [{'prefecture': '宮城県', 'totalDistricts': 1, 'partyResults': []}]},
+    }
+    entries = [_entry('自由民主党', 1, '甲'), _entry('立憲民主党', 1, '乙')]
+
+    stats = write_shards(data, str(tmp_path / 'shugiin_2024.json'), iter_sheet_districts(rows), entries)
+    with open(tmp_path / 'shugiin_2024' / 'hirei' / '2.json', encoding='utf-8') as f:
+        block = json.load(f)
+
+    assert block['parties'][0]['candidates'] == []  # 小選挙区の当選者は名簿から除く
+    revived = block['parties'][1]['candidates'][0]
+    assert (revived['name'], revived['result'], revived['sekihairitsu']) == ('乙', '比当', 80.0)
+    assert stats['revival']['mismatches'] == []
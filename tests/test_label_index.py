@@ -0,0 +1,68 @@
+from label_index import LabelIndex, PatternMatcher, normalize_label
+from workbook_session import Sheet
+
+
+def test_normalize_label():
+    assert normalize_label('　北 関東 ') == '北関東'
+    assert normalize_label('ＡＢＣ１２３') == 'ABC123'
+    assert normalize_label(None) == ''
+    assert normalize_label(12) == '12'
+
+
+def test_matcher_prefers_declaration_order():
+    m = PatternMatcher(['民主党', '立憲民主党', '国民民主党'])
+    # 「立憲民主党」には「民主党」も含まれるが、宣言順が早い方を返す
+    assert m.best('立憲民主党') == '民主党'
+    assert m.findall('立憲民主党・国民民主党') == ['民主党', '立憲民主党', '国民民主党']
+    assert m.best('自由民主党') == '民主党'
+    assert m.best('公明党') is None
+    assert m.best(None) is None
+
+
+def test_matcher_overlapping_patterns_and_normalization():
+    m = PatternMatcher(['北関東', '関東', '東京'])
+    assert m.findall('南関東') == ['関東']
+    assert m.findall('北 関東') == ['北関東', '関東']
+    assert m.findall('東京都') == ['東京']
+    # 失敗遷移: 'he' を読んだ後の 'hers' / 'she' (古典的な例)
+    m = PatternMatcher(['he', 'she', 'his', 'hers'], normalize=False)
+    assert m.findall('ushers') == ['he', 'she', 'hers']
+
+
+def _sheet():
+    rows = [
+        ['比例代表', None, None, None],
+        ['ブロック', '自由民主党', None, '計'],
+        ['北　海道', 10, 20, 30],
+        ['東北', 1, 2, 3],
+        ['北海道', 4, 5, 9],
+    ]
+    # 1行目の「比例代表」は A1:D1、「自由民主党」は B2:C2 の結合セル
+    return Sheet('Table 1', rows, merged=[(0, 0, 0, 3), (1, 1, 1, 2)])
+
+
+def test_find_is_exact_and_filters_by_column_and_start():
+    idx = LabelIndex(_sheet())
+    assert idx.find('北海道') == [(2, 0), (4, 0)]
+    assert idx.find('北海道', start=3) == [(4, 0)]
+    assert idx.find('北海道', col=1) == []
+    assert idx.find('海道') == []
+
+
+def test_search_and_first():
+    idx = LabelIndex(_sheet())
+    assert idx.search('北') == [(2, 0), (3, 0), (4, 0)]
+    assert idx.search('北', start=3, col=0) == [(3, 0), (4, 0)]
+    assert idx.first('民主') == 1
+    assert idx.first('北海道', nth=1) == 4
+    assert idx.first('北海道', nth=2) is None
+
+
+def test_merged_cells_resolve_to_origin():
+    idx = LabelIndex(_sheet())
+    assert idx.label_at(1, 2) == '自由民主党'
+    assert idx.merged_origin(1, 2) == (1, 1)
+    assert idx.label_at(0, 3) == '比例代表'
+    assert idx.merged_origin(3, 1) == (3, 1)
+    # アンカーは左上セルのみ
+    assert idx.find('自由民主党') == [(1, 1)]
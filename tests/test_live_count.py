@@ -0,0 +1,77 @@
+import pytest
+
+from live_count import LiveCount
+
+
+def _shou(muni, candidate, party, votes, pref='宮城県', district='1区'):
+    return {'tier': 'shou', 'prefecture': pref, 'district': district, 'municipality': muni,
+            'candidate': candidate, 'party': party, 'votes': votes}
+
+
+def _hirei(muni, party, votes, pref='宮城県'):
+    return {'tier': 'hirei', 'prefecture': pref, 'district': '', 'municipality': muni, 'candidate': '',
+            'party': party, 'votes': votes}
+
+
+def _party(rows, party):
+    return next(r for r in rows if r['party'] == party)
+
+
+def test_apply_adds_only_the_delta_of_cumulative_rows():
+    live = LiveCount(2026)
+    live.apply([_shou('仙台市青葉区', '甲', '自由民主党', 100), _shou('仙台市青葉区', '乙', '立憲民主党', 80)])
+    prefs, blocks, changed = live.apply([_shou('仙台市青葉区', '甲', '自由民主党', 100),
+                                         _shou('仙台市青葉区', '乙', '立憲民主党', 150)])
+
+    assert (prefs, blocks, changed) == ({'宮城県'}, set(), 1)
+    assert dict(live.districts[('宮城県', 1)]) == {'甲': 100, '乙': 150}
+    assert dict(live.pref_votes['宮城県']) == {'自由民主党': 100, '立憲民主党': 150}
+    assert live.winners[('宮城県', 1)] == '乙'
+    assert _party(live.prefectures['宮城県']['partyResults'], '立憲民主党')['seats'] == 1
+    assert live.updates == 2
+
+
+def test_apply_repeated_snapshot_changes_nothing():
+    live = LiveCount(2026)
+    rows = [_shou('仙台市青葉区', '甲', '自由民主党', 100), _hirei('仙台市青葉区', '自由民主党', 90)]
+    live.apply(rows)
+
+    assert live.apply(rows) == (set(), set(), 0)
+    assert live.updates == 1
+
+
+def test_apply_sums_municipalities_into_district_and_block():
+    live = LiveCount(2026)
+    live.apply([_shou('仙台市青葉区', '甲', '自由民主党', 100), _shou('仙台市宮城野区', '甲', '自由民主党', 50),
+                _hirei('仙台市青葉区', '自由民主党', 90), _hirei('青森市', '立憲民主党', 60, pref='青森県')])
+
+    assert live.districts[('宮城県', 1)]['甲'] == 150
+    block = live.blocks['東北']
+    assert block['totalVotes'] == 150
+    assert sum(p['seats'] for p in block['parties']) == 12
+    assert {m['name'] for m in block['municipalities']} == {'仙台市青葉区', '青森市'}
+
+
+def test_apply_rejects_invalid_file_without_changes():
+    live = LiveCount(2026)
+    live.apply([_shou('仙台市青葉区', '甲', '自由民主党', 100)])
+
+    with pytest.raises(ValueError):
+        live.apply([_shou('仙台市青葉区', '甲', '自由民主党', 200), _shou('仙台市青葉区', '甲', '立憲民主党', 10)])
+    assert live.districts[('宮城県', 1)]['甲'] == 100
+    assert live.updates == 1
+
+
+def test_data_keeps_unreported_base_regions():
+    base = {'electionDate': '2026-02-08',
+            'shou': {'prefectures': [{'prefecture': '宮城県', 'totalDistricts': 5},
+                                     {'prefecture': '青森県', 'totalDistricts': 3}]},
+            'hirei': {'blocks': []}}
+    live = LiveCount(2026, base=base)
+    live.apply([_shou('仙台市青葉区', '甲', '自由民主党', 100)])
+    data = live.data()
+
+    assert [p['prefecture'] for p in data['shou']['prefectures']] == ['青森県', '宮城県']
+    assert data['shou']['totalSeats'] == 8
+    assert len(data['hirei']['blocks']) == 11
+    assert [d['district'] for d in data['shou']['districts']] == [1]
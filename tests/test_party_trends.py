@@ -0,0 +1,33 @@
+import json
+import shutil
+
+from party_trends import _merge, build_trends
+from paths import output_path
+
+SECTIONS = ('shugiin_hirei', 'sangiin_hirei', 'shugiin_seats', 'sangiin_seats')
+
+
+def test_published_years_do_not_drift(tmp_path):
+    published = output_path('elections', 'national_party_trends.json')
+    output = tmp_path / 'national_party_trends.json'
+    shutil.copy(published, output)
+    with open(published, encoding='utf-8') as f:
+        before = json.load(f)
+
+    build_trends(force=True, output=str(output), cache_path=str(tmp_path / 'cache.json'))
+    with open(output, encoding='utf-8') as f:
+        after = json.load(f)
+
+    for section in SECTIONS:
+        rows = {r['year']: r for r in after[section]}
+        for row in before.get(section, []):
+            assert rows.get(row['year']) == row, (section, row['year'])
+
+
+def test_approximate_year_keeps_existing_row():
+    existing = [{'year': '2017', '自由民主党': 33.28}]
+    computed = [{'year': '2017', '自由民主党': 33.27}, {'year': '2024', '自由民主党': 26.73}]
+
+    assert _merge(existing, computed, approximate={'2017'}) == [existing[0], computed[1]]
+    assert _merge([], computed, approximate={'2017'}) == computed
+    assert _merge(existing, computed) == computed
@@ -0,0 +1,85 @@
+import json
+
+import openpyxl
+
+from election_shards import write_shards
+from shou_candidates import iter_sheet_districts, stream_shou_districts
+from workbook_session import WorkbookSession
+
+HEADER = ['選挙区', '候補者名', '年齢', '党派', '得票数', '得票率', '当落', '重複']
+
+
+def _rows():
+    return [
+        ['小選挙区 候補者別得票数'],
+        HEADER,
+        ['宮城県'],
+        ['宮城県第1区', '甲', 50, '自由民主党', 300, None, '当', ''],
+        [None, '乙', 45, '立憲民主党', 100, None, '', '○'],
+        [None, '計', None, None, 400],
+        ['2区', '丙', 60, '立憲民主党', 200, 66.67, '当', '○'],
+        [None, '丁', 40, '日本共産党', 100, 33.33, '', ''],
+        ['青森県'],
+        ['1区', '戊', 55, '自由民主党', 500, None, '当', ''],
+    ]
+
+
+def _election():
+    return {
+        'year': 2024, 'electionDate': '2024-10-27',
+        'hirei': {'totalSeats': 0, 'blocks': []},
+        'shou': {'totalSeats': 3, 'districts': [], 'prefectures': [
+            {'prefecture': '青森県', 'totalDistricts': 1, 'partyResults': []},
+            {'prefecture': '宮城県', 'totalDistricts': 2, 'partyResults': []},
+        ]},
+    }
+
+
+def test_iter_sheet_districts_groups_candidates_by_district():
+    districts = list(iter_sheet_districts(_rows()))
+
+    assert [(d['prefecture'], d['district']) for d in districts] == [('宮城県', 1), ('宮城県', 2), ('青森県', 1)]
+    first = districts[0]['candidates']
+    assert [(c['name'], c['votes'], c['voteRate'], c['result'], c['isDualCandidate']) for c in first] == [
+        ('甲', 300, 75.0, '当', False),
+        ('乙', 100, 25.0, '落', True),
+    ]
+    assert districts[1]['candidates'][0]['voteRate'] == 66.67
+
+
+def test_non_candidate_tables_are_skipped():
+    rows = [['比例代表 名簿'], ['党派', '名簿順位', '候補者名', '得票数'], ['自由民主党', 1, '甲', 100]]
+
+    assert list(iter_sheet_districts(rows)) == []
+
+
+def test_stream_shou_districts_reads_workbook(tmp_path, monkeypatch):
+    monkeypatch.setenv('ELECTION_WORKBOOK_CACHE', '0')
+    path = tmp_path / 'candidates.xlsx'
+    wb = openpyxl.Workbook()
+    wb.active.title = 'Table 1'
+    for row in _rows():
+        wb.active.append(row)
+    wb.create_sheet('Table 2').append(['都道府県別 当選人数'])
+    wb.save(path)
+
+    with WorkbookSession() as session:
+        districts = list(stream_shou_districts(session.open(str(path))))
+
+    assert len(districts) == 3
+    assert sum(len(d['candidates']) for d in districts) == 5
+
+
+def test_write_shards_writes_prefecture_shards(tmp_path):
+    path = str(tmp_path / 'shugiin_2024.json')
+    stats = write_shards(_election(), path, iter_sheet_districts(_rows()))
+
+    assert (stats['districts'], stats['candidates']) == (3, 5)
+    with open(tmp_path / 'shugiin_2024' / 'index.json', encoding='utf-8') as f:
+        index = json.load(f)
+    entries = {p['prefecture']: p for p in index['shou']['prefectures']}
+    assert entries['宮城県']['shard'] == 'shou/4.json'
+    assert entries['宮城県']['districtCount'] == 2
+    with open(tmp_path / 'shugiin_2024' / 'shou' / '4.json', encoding='utf-8') as f:
+        shard = json.load(f)
+    assert [d['district'] for d in shard['districts']] == [1, 2]
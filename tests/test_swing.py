@@ -0,0 +1,42 @@
+import numpy as np
+
+from swing import _party_columns, district_matrix, hirei_shares, simulate, summarize
+
+
+def _blocks(listed=None):
+    parties = [{'party': '自由民主党', 'votes': 500, 'seats': 4},
+               {'party': '国民民主党', 'votes': 500, 'seats': 2}]
+    if listed is not None:
+        parties[1]['candidates'] = [{'name': n} for n in listed]
+    return [{'name': '東北', 'totalSeats': 6, 'totalVotes': 1000, 'parties': parties}]
+
+
+def _zero_swing(blocks):
+    parties = _party_columns([], blocks)
+    m = district_matrix([], parties)
+    _, _, seats = simulate(m, hirei_shares(blocks, parties), np.zeros((1, len(parties))))
+    return m, seats[0]
+
+
+def test_zero_swing_keeps_seats_lost_to_an_exhausted_list():
+    # ドント式では 3:3 だが、国民民主党は名簿が尽きて2議席
+    _, seats = _zero_swing(_blocks())
+
+    assert seats.tolist() == [4, 2]
+
+
+def test_list_length_caps_seats_under_swing():
+    blocks = _blocks(listed=['甲', '乙'])
+    parties = _party_columns([], blocks)
+    m = district_matrix([], parties)
+    _, _, seats = simulate(m, hirei_shares(blocks, parties), np.array([[-20.0, 20.0]]))
+
+    assert seats[0].tolist() == [4, 2]
+
+
+def test_majority_uses_total_seats_of_both_tiers():
+    m, seats = _zero_swing(_blocks())
+    out = summarize(m, seats, np.zeros(2, dtype=np.int64), seats[None], np.zeros((1, 2), dtype=np.int64),
+                    np.zeros((0, 2), dtype=np.int64), {}, total=10)
+
+    assert (out['totalSeats'], out['majority']) == (10, 6)
@@ -0,0 +1,67 @@
+import json
+
+from election_shards import write_shards
+from json_output import write_json
+from shou_candidates import iter_sheet_districts
+from validate_outputs import validate
+
+ROWS = [
+    ['選挙区', '候補者名', '年齢', '党派', '得票数', '当落', '重複'],
+    ['宮城県'],
+    ['1区', '甲', 50, '自由民主党', 300, '当', ''],
+    [None, '乙', 45, '立憲民主党', 100, '', ''],
+    ['2区', '丙', 60, '立憲民主党', 200, '当', ''],
+    [None, '丁', 40, '自由民主党', 100, '', ''],
+]
+
+
+def _election():
+    return {
+        'year': 2017, 'electionDate': '2017-10-22',
+        'hirei': {'totalSeats': 2, 'blocks': [{'name': '東北', 'totalSeats': 2, 'totalVotes': 1000, 'parties': [
+            {'party': '自由民主党', 'block': '東北', 'votes': 600, 'voteRate': 60.0, 'seats': 1, 'candidates': []},
+            {'party': '立憲民主党', 'block': '東北', 'votes': 400, 'voteRate': 40.0, 'seats': 1, 'candidates': []},
+        ]}]},
+        'shou': {'totalSeats': 2, 'districts': [], 'prefectures': [{
+            'prefecture': '宮城県', 'totalDistricts': 2, 'partyResults': [
+                {'party': '自由民主党', 'totalVotes': 400, 'voteRate': 57.14, 'seats': 1},
+                {'party': '立憲民主党', 'totalVotes': 300, 'voteRate': 42.86, 'seats': 1},
+            ]}]},
+    }
+
+
+def _build(root):
+    path = str(root / 'elections' / 'shugiin_2017.json')
+    data = _election()
+    write_json(path, data)
+    write_shards(data, path, iter_sheet_districts(ROWS))
+    return root / 'elections' / 'shugiin_2017'
+
+
+def _validate(root, tmp_path):
+    return validate(str(root), workers=1, force=True, cache_path=str(tmp_path / 'cache.json'))
+
+
+def test_validate_fixture_root_with_district_shards(tmp_path):
+    root = tmp_path / 'data'
+    _build(root)
+
+    report = _validate(root, tmp_path)
+
+    assert report['ok'], report
+    assert report['summary']['units'] == 2
+    assert report['summary']['warnings'] == 0
+
+
+def test_validate_reports_broken_district_shard(tmp_path):
+    root = tmp_path / 'data'
+    shard = _build(root) / 'shou' / '4.json'
+    with open(shard, encoding='utf-8') as f:
+        data = json.load(f)
+    data['districts'][0]['candidates'][1]['result'] = '当'
+    write_json(str(shard), data)
+
+    report = _validate(root, tmp_path)
+
+    assert not report['ok']
+    assert {'宮城県1区', '宮城県 立憲民主党'} <= {f['where'] for u in report['units'] for f in u['findings']}